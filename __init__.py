@@ -3,7 +3,7 @@
 """
 
 from .constant import *
-from .core.graphdata import GraphData
+from .core.graphdata import GraphData, ColumnarGraphData
 from .core.nodedata import NodeDataTree
 
 from .core.node import ChimaeraNode
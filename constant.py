@@ -1,4 +1,5 @@
 from __future__ import annotations
+import os, sys
 from enum import Enum
 import typing as T
 
@@ -38,5 +39,18 @@ OUTPUT_NAME = "out"
 # main path for this module
 ROOT_PATH = Path(__file__).parent
 
+def _userCacheDir()->Path:
+	"""per-user directory for files chimaera regenerates as needed -
+	installed package directory may be read-only"""
+	if sys.platform == "win32":
+		base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~/AppData/Local")
+	elif sys.platform == "darwin":
+		base = os.path.expanduser("~/Library/Caches")
+	else:
+		base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+	return Path(base) / "chimaera"
+
+USER_CACHE_PATH = _userCacheDir()
+
 if __name__ == '__main__':
 	print(NodeRefModes["Single"])
@@ -4,12 +4,11 @@ from weakref import WeakSet
 import typing as T
 
 from tree.lib.sequence import flatten
-from tree import FailToFind
 from tree.lib.uid import getReadableUid, toUid
 from tree.lib.object import Serialisable, SerialiseVisitor
 from .nodedata import NodeDataHolder, NodeDataTree
 from chimaera.constant import NodeDataKeys, DataUse
-from .graphdata import GraphData
+from .graphdata import GraphData, ColumnarGraphData
 from .node import ChimaeraNode
 from collections import defaultdict
 
@@ -52,6 +51,10 @@ class ChimaeraGraph(nx.MultiDiGraph, Serialisable):
 	# redefine on child classes to control what nodes can be added to those graphs
 	nodeClassCatalogue : ClassCatalogue = baseChimaeraCatalogue
 
+	# all live graphs, to migrate their nodes when catalogue classes reload -
+	# any catalogue reloading classes passes its event to these graphs
+	liveGraphs : WeakSet[ChimaeraGraph] = WeakSet()
+
 	# tree containing all trees known
 
 	def __init__(self, name:str="newGraph"):
@@ -61,8 +64,24 @@ class ChimaeraGraph(nx.MultiDiGraph, Serialisable):
 		self.execComponent = GraphExecutionComponent(self)
 		self.deltaTracker = GraphDeltaTracker()
 
-		# single map to store all of nodes' actual data
-		self.dataStore : dict[str, dict[DataUse, GraphData]] = defaultdict(dict)
+		# single map to store all of nodes' actual data, keyed by node uid
+		self.dataStore : dict[str, dict[DataUse, (GraphData, ColumnarGraphData)]] = defaultdict(dict)
+
+		# { node uid : node }, kept from graph deltas
+		self.uidNodeIndex : dict[str, ChimaeraNode] = {}
+		self.signalComponent.deltaAdded.connect(self._onDeltaAddedIndexUids)
+
+		# index of nodes by class, kept from graph deltas
+		self.classNodeMap : dict[type, set[ChimaeraNode]] = defaultdict(set)
+		self.signalComponent.deltaAdded.connect(self._onDeltaAddedIndexClasses)
+
+		# { node : tree parent node or None }, cleared from tree edge deltas
+		self._treeParentMap : dict[ChimaeraNode, (ChimaeraNode, None)] = {}
+		# nodes whose outgoing tree edges changed, for ordered child lists
+		self._treeChildrenChanged : set[ChimaeraNode] = set()
+		self.signalComponent.deltaAdded.connect(self._onDeltaAddedClearTreeParents)
+
+		ChimaeraGraph.liveGraphs.add(self)
 
 	def uidNodeMap(self)->dict[str, ChimaeraNode]:
 		return {i.uid : i for i in self}
@@ -74,20 +93,27 @@ class ChimaeraGraph(nx.MultiDiGraph, Serialisable):
 		return list(sorted(self.nameNodeMap().keys()))
 
 	def node(self, fromId:(NodeDataTree, str, ChimaeraNode))->ChimaeraNode:
-		"""retrieve a node"""
+		"""retrieve a node
+		id map is kept from deltas - inside a transaction none arrive,
+		so graph is scanned instead"""
 		uid = fromId if isinstance(fromId, str) else fromId.uid
-		return self.uidNodeMap().get(uid) or self.nameNodeMap().get(fromId)
+		result = self.uidNodeIndex.get(uid)
+		if self.signalComponent.transactionDepth:
+			if result is not None and result not in self:
+				result = None
+			if result is None:
+				result = self.uidNodeMap().get(uid)
+		return result or self.nameNodeMap().get(fromId)
 
 	def _getCreateNodeTargetCls(self, inArg:(T.Type[ChimaeraNode], str))->T.Type[ChimaeraNode]:
-		"""look up class by string name if necessary"""
+		"""look up class by string name if necessary -
+		short or qualified names are accepted"""
 		if isinstance(inArg, str):
-			result = self.nodeClassCatalogue.nameClassMap().get(inArg, FailToFind)
-			if result is FailToFind:
-
+			try:
+				return self.nodeClassCatalogue.classForName(inArg)
+			except KeyError:
 				raise ValueError(f"node class {inArg} not found in catalogue; \nValid are {list(sorted(self.nodeClassCatalogue.nameClassMap().keys()))}")
-		else:
-			result = inArg
-		return result
+		return inArg
 
 	def createNode(self, nodeCls:(T.Type[ChimaeraNode], str)=ChimaeraNode, name:str="newNode", add=True, uid=None):
 		"""creates new node and params
@@ -180,12 +206,12 @@ class ChimaeraGraph(nx.MultiDiGraph, Serialisable):
 
 	# getting node data - unsure of what to defer to node here
 
-	def nodeData(self, node:(str, ChimaeraNode), use:DataUse=DataUse.Flow)->GraphData:
+	def nodeData(self, node:(str, ChimaeraNode), use:DataUse=DataUse.Flow)->(GraphData, ColumnarGraphData):
 		"""returns the data for the given use for this node"""
 		return self.dataStore[toUid(node)][use]
 
 	def setNodeData(self, node:(str, ChimaeraNode),
-	                data:GraphData,
+	                data:(GraphData, ColumnarGraphData),
 	                use:DataUse=DataUse.Flow,):
 		"""sets the data for the given use for this node"""
 		self.dataStore[toUid(node)][use] = data
@@ -194,12 +220,37 @@ class ChimaeraGraph(nx.MultiDiGraph, Serialisable):
 		"""return a node's data for a given DataUse"""
 		return node.outputDataForUse(use)
 
-	def incomingDataForUse(self, node:ChimaeraNode, use:DataUse)->GraphData:
-		"""gathers all incoming data from input nodes for given use"""
+	def incomingDataForUse(self, node:ChimaeraNode, use:DataUse)->(GraphData, ColumnarGraphData):
+		"""gathers all incoming data from input nodes for given use
+		large or columnar flow data is combined into columns, see
+		ColumnarGraphData.combineFlow() - params stay as live trees"""
 		inTies = self.nodeInputMap(node)[use]
 		outputData = [self.nodeOutputDataForUse(inputNode, inputUse) for inputUse, inputNode in inTies.items()]
+		if use == DataUse.Flow:
+			return ColumnarGraphData.combineFlow(outputData)
 		return GraphData.combine(outputData)
 
+	def treeParent(self, node:ChimaeraNode)->(ChimaeraNode, None):
+		"""return source node of node's Tree-use input, or None
+		result is cached until that node's tree edges change -
+		inside a transaction no deltas arrive, so cache is skipped"""
+		inTransaction = self.signalComponent.transactionDepth
+		if not inTransaction:
+			try:
+				return self._treeParentMap[node]
+			except KeyError:
+				pass
+		if node not in self:
+			return None
+		result = None
+		for sourceNode, keyMap in self.pred[node].items():
+			if DataUse.Tree in keyMap:
+				result = sourceNode
+				break
+		if not inTransaction:
+			self._treeParentMap[node] = result
+		return result
+
 	def sourceNodesForUse(self, node:ChimaeraNode, use:DataUse)->set[ChimaeraNode]:
 		return set(self.nodeInputMap(node)[use].values())
 
@@ -227,7 +278,7 @@ class ChimaeraGraph(nx.MultiDiGraph, Serialisable):
 		return refNode
 
 		subgraph = self.subgraph(nodesToReference)
-		subgraphData = GraphData.fromChimaeraSubgraph(subgraph)
+		subgraphData = ColumnarGraphData.fromChimaeraSubgraph(subgraph)
 
 
 	def nodeValid(self, node)->bool:
@@ -238,6 +289,78 @@ class ChimaeraGraph(nx.MultiDiGraph, Serialisable):
 		"""fires when direct params changed on node -
 		won't work on references"""
 
+	def _onDeltaAddedIndexUids(self, delta:(GraphNodeDelta, GraphEdgeDelta)):
+		if not isinstance(delta, GraphNodeDelta):
+			return
+		for node in delta.removed:
+			self.uidNodeIndex.pop(node.uid, None)
+		for node in delta.added:
+			self.uidNodeIndex[node.uid] = node
+
+	def _onDeltaAddedIndexClasses(self, delta:(GraphNodeDelta, GraphEdgeDelta)):
+		if not isinstance(delta, GraphNodeDelta):
+			return
+		for node in delta.removed:
+			self.classNodeMap[type(node)].discard(node)
+		for node in delta.added:
+			self.classNodeMap[type(node)].add(node)
+
+	def _onDeltaAddedClearTreeParents(self, delta:(GraphNodeDelta, GraphEdgeDelta)):
+		if isinstance(delta, GraphNodeDelta):
+			for node in delta.removed:
+				self._treeParentMap.pop(node, None)
+				self._treeChildrenChanged.discard(node)
+			return
+		for edges in (delta.added, delta.removed):
+			for edge in edges:
+				if edge[2] == DataUse.Tree:
+					self._treeParentMap.pop(edge[1], None)
+					self._treeChildrenChanged.add(edge[0])
+					# child and all below it have a new address
+					invalidateAddress = getattr(edge[1], "_invalidateAddress", None)
+					if invalidateAddress is not None:
+						invalidateAddress()
+
+	def takeTreeChildrenChanged(self, node:ChimaeraNode)->bool:
+		"""return True if node's tree child edges changed since this was
+		last called for it - inside a transaction no deltas arrive,
+		so this is always True"""
+		if self.signalComponent.transactionDepth:
+			return True
+		if node in self._treeChildrenChanged:
+			self._treeChildrenChanged.discard(node)
+			return True
+		return False
+
+	# class reloading
+	@classmethod
+	def onCatalogueClassesReloaded(cls, event:ClassCatalogue.ReloadEvent):
+		"""pass reload event to every live graph -
+		called by ClassCatalogue.reloadClasses()"""
+		for graph in tuple(cls.liveGraphs):
+			graph.onNodeClassesReloaded(event)
+
+	def onNodeClassesReloaded(self, event:ClassCatalogue.ReloadEvent):
+		"""swap class of live nodes to their reloaded versions in place,
+		then conform their params and mark them dirty
+		nodes of other classes are not touched"""
+		migrated : list[ChimaeraNode] = []
+		self.signalComponent.pauseDeltaGathering()
+		for oldClass, newClass in zip(event.oldClasses, event.newClasses):
+			if newClass is None or newClass is oldClass:
+				continue
+			nodes = self.classNodeMap.pop(oldClass, ())
+			for node in nodes:
+				node.__class__ = newClass
+				node.conformParams()
+			self.classNodeMap[newClass].update(nodes)
+			migrated.extend(nodes)
+		self.signalComponent.unPauseDeltaGathering(emitStoredDeltas=True)
+
+		for node in migrated:
+			self.execComponent.setDirty(node)
+		return migrated
+
 	# creation methods
 	@classmethod
 	def create(cls, graphName:str)->ChimaeraGraph:
@@ -245,8 +368,8 @@ class ChimaeraGraph(nx.MultiDiGraph, Serialisable):
 
 	# data storage
 	def serialise(self)->dict:
-		"""return a dict of all data in the graph"""
-		baseData = self.dataStore
+		"""return a dict of all data in the graph, keyed by node uid"""
+		baseData = dict(self.dataStore)
 
 		return baseData
 
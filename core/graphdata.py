@@ -1,10 +1,16 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+import array
 import typing as T
 
 import networkx as nx
 
+try:
+	import numpy as np
+except ImportError:
+	np = None
+
 from tree import FailToFind
 from tree.lib.sequence import flatten
 from tree.lib.uid import toUid
@@ -38,12 +44,18 @@ class GraphData:
 
 
 	def __post_init__(self):
-		"""build a map of {treeUid : tree} from nodeDatas
+		self.nodeDatas = self.nodeDatas or []
+		self._uidTreeMap : dict[str, NodeDataTree] = None
+
+	@property
+	def uidTreeMap(self)->dict[str, NodeDataTree]:
+		"""map of {treeUid : tree} from nodeDatas, built on first access
 		if the same uid is used for multiple data uses, this will be insufficient -
 		should GraphData know about DataUse for each tree?
 		"""
-		self.nodeDatas = self.nodeDatas or []
-		self.uidTreeMap = {toUid(nodeData): nodeData for nodeData in self.nodeDatas}
+		if self._uidTreeMap is None:
+			self._uidTreeMap = {toUid(nodeData): nodeData for nodeData in self.nodeDatas}
+		return self._uidTreeMap
 
 
 	def __getitem__(self, item:(str, ChimaeraNode, NodeDataTree))->NodeDataTree:
@@ -76,9 +88,226 @@ class GraphData:
 		#print("combine", tuple(graphDatas), graphDatas)
 		for i in graphDatas:
 			#print("i", i)
-			if isinstance(i, GraphData):
+			if isinstance(i, (GraphData, ColumnarGraphData)):
 				datas.extend([i.copy() for i in i.nodeDatas])
 				edges.update(i.edges)
 			elif isinstance(i, NodeDataTree):
 				datas.append(i.copy())
 		return cls(datas, set(edges))
+
+
+def _intArray(values:T.Iterable[int]=()):
+	if np is not None:
+		return np.fromiter(values, dtype="int64")
+	return array.array("q", values)
+
+def _extendIntArray(target, values:T.Iterable[int]):
+	"""return target with values appended - numpy arrays can't grow in place"""
+	if np is not None:
+		return np.concatenate((target, np.fromiter(values, dtype="int64")))
+	target.extend(values)
+	return target
+
+def _flattenTree(tree:NodeDataTree)->T.Iterator[tuple[tuple[str, ...], object]]:
+	"""yield (branch address, value) for every branch below tree"""
+	toVisit = [((), tree)]
+	while toVisit:
+		address, branch = toVisit.pop()
+		for child in branch.branches:
+			childAddress = address + (child.name, )
+			yield childAddress, child.value
+			toVisit.append((childAddress, child))
+
+
+class ColumnarGraphData:
+	"""columnar alternative to GraphData, for subgraphs of many nodes
+
+	node uids are interned to int ids by position, edges are held as
+	two int arrays of those ids, and params as one column per branch
+	address, holding each node's value or FailToFind where that node
+	has no such branch
+
+	tree-based nodeDatas and uid edges are only built when asked for,
+	so transforms written against GraphData still work on this
+	"""
+
+	# flow data of fewer nodes than this is kept as tree GraphData
+	minNodes = 1000
+
+	def __init__(self, uids:T.Sequence[str]=(),
+	             columns:dict[tuple[str, ...], list]=None,
+	             edgeSources:T.Iterable[int]=(), edgeDests:T.Iterable[int]=(),
+	             rootNames:T.Sequence[str]=None):
+		self.uids : list[str] = list(uids)
+		self.uidIdMap : dict[str, int] = {uid : i for i, uid in enumerate(self.uids)}
+		self.columns : dict[tuple[str, ...], list] = columns or {}
+		self.edgeSources = _intArray(edgeSources)
+		self.edgeDests = _intArray(edgeDests)
+		self.rootNames : list[str] = list(rootNames or ["root"] * len(self.uids))
+
+		self._nodeDatas : list[NodeDataTree] = None
+		self._edges : set[tuple[str, str]] = None
+
+	def __len__(self):
+		return len(self.uids)
+
+	# region building
+	@classmethod
+	def fromTrees(cls, trees:T.Sequence[NodeDataTree],
+	              edges:T.Iterable[tuple[str, str]]=())->ColumnarGraphData:
+		"""flatten param trees into columns"""
+		uids = [toUid(i) for i in trees]
+		columns : dict[tuple[str, ...], list] = {}
+		for index, tree in enumerate(trees):
+			for address, value in _flattenTree(tree):
+				column = columns.get(address)
+				if column is None:
+					column = columns[address] = [FailToFind] * len(trees)
+				column[index] = value
+		result = cls(uids, columns, rootNames=[i.name for i in trees])
+		result.addUidEdges(edges)
+		return result
+
+	@classmethod
+	def fromGraphData(cls, graphData:GraphData)->ColumnarGraphData:
+		return cls.fromTrees(graphData.nodeDatas, graphData.edges)
+
+	@classmethod
+	def fromChimaeraSubgraph(cls, subgraph:nx.Graph)->ColumnarGraphData:
+		nodes = list(subgraph)
+		result = cls.fromTrees([i.baseParams for i in nodes])
+		idMap = {node : i for i, node in enumerate(nodes)}
+		result.edgeSources = _intArray(idMap[i[0]] for i in subgraph.edges)
+		result.edgeDests = _intArray(idMap[i[1]] for i in subgraph.edges)
+		return result
+
+	def internUid(self, uid:str)->int:
+		"""return int id for uid, adding an empty node if it is new"""
+		result = self.uidIdMap.get(uid)
+		if result is None:
+			result = self.uidIdMap[uid] = len(self.uids)
+			self.uids.append(uid)
+			self.rootNames.append("root")
+			for column in self.columns.values():
+				column.append(FailToFind)
+			self._nodeDatas = None
+		return result
+
+	def addUidEdges(self, edges:T.Iterable[tuple[str, str]]):
+		edges = list(edges)
+		if not edges:
+			return
+		sources = [self.internUid(i[0]) for i in edges]
+		dests = [self.internUid(i[1]) for i in edges]
+		self.edgeSources = _extendIntArray(self.edgeSources, sources)
+		self.edgeDests = _extendIntArray(self.edgeDests, dests)
+		self._edges = None
+	# endregion
+
+	# region columns
+	def column(self, address:(str, tuple[str, ...]))->list:
+		"""values of one param across all nodes, FailToFind where missing"""
+		if isinstance(address, str):
+			address = (address, )
+		return self.columns[address]
+
+	def numericColumn(self, address:(str, tuple[str, ...]), dtype="float64"):
+		"""column as numpy array - raises if numpy is missing,
+		or any node lacks the param"""
+		return np.asarray(self.column(address), dtype=dtype)
+
+	def setColumn(self, address:(str, tuple[str, ...]), values:T.Sequence):
+		if isinstance(address, str):
+			address = (address, )
+		if len(values) != len(self.uids):
+			raise ValueError(f"column length {len(values)} does not match {len(self.uids)} nodes")
+		self.columns[address] = list(values)
+		self._nodeDatas = None
+	# endregion
+
+	# region tree-based interface
+	@property
+	def nodeDatas(self)->list[NodeDataTree]:
+		"""param trees rebuilt from columns on first access"""
+		if self._nodeDatas is None:
+			self._nodeDatas = [self._buildTree(i) for i in range(len(self.uids))]
+		return self._nodeDatas
+
+	def _buildTree(self, index:int)->NodeDataTree:
+		tree = NodeDataTree(name=self.rootNames[index], treeUid=self.uids[index])
+		tree.lookupCreate = True
+		# shorter addresses first, so parents are made before children
+		for address in sorted(self.columns, key=len):
+			value = self.columns[address][index]
+			if value is FailToFind:
+				continue
+			branch = tree
+			for name in address:
+				branch = branch(name, create=True)
+			branch.value = value
+		return tree
+
+	@property
+	def edges(self)->set[tuple[str, str]]:
+		if self._edges is None:
+			self._edges = {(self.uids[a], self.uids[b])
+			               for a, b in zip(self.edgeSources, self.edgeDests)}
+		return self._edges
+
+	@property
+	def uidTreeMap(self)->dict[str, NodeDataTree]:
+		return dict(zip(self.uids, self.nodeDatas))
+
+	def __getitem__(self, item:(str, ChimaeraNode, NodeDataTree))->NodeDataTree:
+		return self.nodeDatas[self.uidIdMap[toUid(item)]]
+
+	def get(self, key:(str, ChimaeraNode, NodeDataTree), default=None)->NodeDataTree:
+		index = self.uidIdMap.get(toUid(key))
+		return default if index is None else self.nodeDatas[index]
+
+	def toGraphData(self)->GraphData:
+		return GraphData(list(self.nodeDatas), set(self.edges))
+	# endregion
+
+	@classmethod
+	def combineFlow(cls, *graphDatas:T.Sequence[(ColumnarGraphData, GraphData, NodeDataTree)])->(GraphData, ColumnarGraphData):
+		"""combine flow data passed between nodes - columns only pay off
+		for big subgraphs, so small tree inputs stay tree GraphData
+		if any input is already columnar, or inputs hold minNodes or more,
+		result is columnar"""
+		graphDatas = list(flatten(graphDatas))
+		nNodes = 0
+		for i in graphDatas:
+			if isinstance(i, cls):
+				return cls.combine(graphDatas)
+			nNodes += len(i.nodeDatas) if isinstance(i, GraphData) else 1
+		if nNodes >= cls.minNodes:
+			return cls.combine(graphDatas)
+		return GraphData.combine(graphDatas)
+
+	@classmethod
+	def combine(cls, *graphDatas:T.Sequence[(ColumnarGraphData, GraphData, NodeDataTree)])->ColumnarGraphData:
+		"""join inputs into one columnar object, without building trees
+		for columnar inputs - nodes with the same uid are merged"""
+		result = cls()
+		sources, dests = [], []
+		for i in flatten(graphDatas):
+			if isinstance(i, NodeDataTree):
+				i = cls.fromTrees([i])
+			elif isinstance(i, GraphData):
+				i = cls.fromGraphData(i)
+			idMap = [result.internUid(uid) for uid in i.uids]
+			for address, column in i.columns.items():
+				resultColumn = result.columns.get(address)
+				if resultColumn is None:
+					resultColumn = result.columns[address] = [FailToFind] * len(result.uids)
+				for index, value in zip(idMap, column):
+					if value is not FailToFind:
+						resultColumn[index] = value
+			for index, rootName in zip(idMap, i.rootNames):
+				result.rootNames[index] = rootName
+			sources.extend(idMap[a] for a in i.edgeSources)
+			dests.extend(idMap[b] for b in i.edgeDests)
+		result.edgeSources = _intArray(sources)
+		result.edgeDests = _intArray(dests)
+		return result
@@ -17,7 +17,7 @@ from tree import Signal
 
 
 
-from .graphdata import GraphData
+from .graphdata import GraphData, ColumnarGraphData
 from .nodedata import NodeDataHolder, NodeDataTree
 from chimaera.constant import NodeDataKeys, DataUse
 
@@ -103,6 +103,21 @@ class ChimaeraNode(DataFacade, #PostInitMixin
 	# 	"""run any post init code after subclassed inits are complete"""
 	# 	pass
 
+	def conformParams(self):
+		"""add any branches from this class's default params that are
+		missing from live params - existing values are kept
+		run after a node's class has changed, as on reload"""
+		defaultParams = self.defaultParamTree(self.baseParams.nodeName)
+
+		def _conformBranch(liveBranch:NodeDataTree, defaultBranch:NodeDataTree):
+			for defaultChild in defaultBranch.branches:
+				liveChild = liveBranch.getBranch(defaultChild.name)
+				if liveChild is None:
+					liveBranch(defaultChild.name).value = defaultChild.value
+					liveChild = liveBranch.getBranch(defaultChild.name)
+				_conformBranch(liveChild, defaultChild)
+		_conformBranch(self.baseParams, defaultParams)
+
 	def setGraph(self, graph:ChimaeraGraph):
 		self._graph = graph
 		if not self in graph:
@@ -206,19 +221,25 @@ class ChimaeraNode(DataFacade, #PostInitMixin
 		overrideData = overrideData or self.baseParams
 		return dataToOverride
 
-	def transform(self, inputGraphData: GraphData) -> GraphData:
+	def transform(self, inputGraphData:(GraphData, ColumnarGraphData)) -> (GraphData, ColumnarGraphData):
 		"""default implementation of transform does not process wider
 		graph structure at all, just runs transformData() on each
-		node params tree in turn"""
+		node params tree in turn
+		base transformData() changes nothing, so unless it is overridden
+		data passes straight through - columnar data is only expanded
+		to trees when a transform needs them"""
+		if type(self).transformData is ChimaeraNode.transformData:
+			return inputGraphData
 		outputDatas = []
 		for dataTree in inputGraphData.nodeDatas:
 			dataTree = self.transformData(dataTree)
 			outputDatas.append(dataTree)
-		# regenerate new graph data object
+		# regenerate new graph data object - by default edges are not modified
+		if isinstance(inputGraphData, ColumnarGraphData):
+			return ColumnarGraphData.fromTrees(outputDatas, inputGraphData.edges)
 		newGraphData = GraphData.combine(outputDatas)
-		# by default edges are not modified
 		newGraphData.edges = inputGraphData.edges
-		return inputGraphData
+		return newGraphData
 
 	def transformData(self, inputData: NodeDataTree) -> NodeDataTree:
 		"""defines any transform that this node may do on params when used
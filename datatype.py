@@ -24,15 +24,23 @@ knownTypes = {}
 
 @dataclass(frozen=True)
 class DataType(ExEnum):
-	"""string key constants used widely"""
+	"""string key constants used widely
+	numeric types give a numpy dtype name and array.array type code,
+	used for typed buffers and vectorised evaluation"""
 	name : str
 	colour : tuple = (128, 128, 128)
+	dtype : str = None
+	typeCode : str = None
+
+	@property
+	def isNumeric(self)->bool:
+		return self.dtype is not None
 
 	# def __post_init__(self):
 	# 	knownTypes[self.name] = self
 
 
 
-Int = DataType("Int", colour=(255, 0, 0))
-Float = DataType("Float", colour=(0, 255, 0))
+Int = DataType("Int", colour=(255, 0, 0), dtype="int64", typeCode="q")
+Float = DataType("Float", colour=(0, 255, 0), dtype="float64", typeCode="d")
 String = DataType("String", colour=(0, 0, 255))
\ No newline at end of file
@@ -10,14 +10,14 @@ and always, always will be
 
 import typing as T
 
-from tree import TreeInterface, TreeType
-from tree.lib.sequence import firstOrNone
+from tree import Tree, TreeInterface, TreeType
 
 from .constant import NodeDataKeys, DataUse
 from chimaera.core.nodedata import NodeDataTree
 from chimaera.core.node import ChimaeraNode
 #if T.TYPE_CHECKING:
 from chimaera.core.graph import ChimaeraGraph
+from chimaera.lib.delta import GraphTransaction
 
 TreeType = T.TypeVar("TreeType", bound="GraphTree") # type of the current class
 
@@ -62,8 +62,23 @@ class GraphTree(TreeInterface, ChimaeraNode):
 			from chimaera.core.graph import ChimaeraGraph
 			graph = ChimaeraGraph()
 
+		# child branches in order - edges in graph are still the source of truth,
+		# list is synced from them when graph reports tree edges changed
+		self._treeChildren : list[GraphTree] = []
+		# { child : index in _treeChildren }, rebuilt on lookup after changes
+		self._treeChildIndexMap : dict[GraphTree, int] = None
+
+		# cached address from root, with the parent and root it was built under
+		self._addressCache : tuple[str, ...] = None
+		self._addressParent : GraphTree = None
+		self._addressRoot : GraphTree = None
+		# { address : branch } for all branches looked up below this one as root
+		self._addressIndex : dict[tuple[str, ...], GraphTree] = {}
+
 		nodeParams = nodeParams or self.defaultParamTree(name, uid=treeUid)
 		ChimaeraNode.__init__(self, graph, nodeParams)
+		# renames through setParam() or name descriptor skip _setName()
+		self.paramsChanged.connect(self._onParamsChangedCheckName)
 
 		self.setGraph(graph)
 
@@ -71,6 +86,60 @@ class GraphTree(TreeInterface, ChimaeraNode):
 
 		TreeInterface.__init__(self, name, value)
 
+	# region conversion
+	@classmethod
+	def fromTree(cls, tree:Tree, graph:ChimaeraGraph=None)->GraphTree:
+		"""create graph tree nodes matching a plain tree, keeping names,
+		values, properties, branch order and uids
+		all nodes and edges are added in a single transaction, so graph
+		emits one delta for the whole tree"""
+		graph = graph if graph is not None else ChimaeraGraph()
+		with GraphTransaction(graph):
+			rootNode = cls._nodeFromTreeBranch(tree, graph)
+			treeEdges = []
+			toVisit = [(tree, rootNode)]
+			while toVisit:
+				branch, node = toVisit.pop()
+				for index, childBranch in enumerate(branch.branches):
+					childNode = cls._nodeFromTreeBranch(childBranch, graph)
+					node._insertTreeChild(childNode)
+					treeEdges.append((node, childNode, DataUse.Tree,
+					                  {"fromUse" : DataUse.Tree, "toUse" : DataUse.Tree,
+					                   "index" : index}))
+					toVisit.append((childBranch, childNode))
+			graph.add_edges_from(treeEdges)
+		return rootNode
+
+	@classmethod
+	def _nodeFromTreeBranch(cls, branch:Tree, graph:ChimaeraGraph)->GraphTree:
+		"""single unconnected node from plain tree branch"""
+		node = cls.create(branch.name, uid=branch.uid, graph=graph)
+		if branch.value is not None:
+			node._setValue(branch.value)
+		if branch.properties:
+			node.setParam(NodeDataKeys.treeProperties, dict(branch.properties))
+		return node
+
+	def toTree(self, treeCls:T.Type[Tree]=Tree)->Tree:
+		"""return plain tree copy of this branch and all below it,
+		keeping names, values, properties, branch order and uids"""
+		def _copyBranch(node:GraphTree)->Tree:
+			branch = treeCls(name=node.name, value=node.value, treeUid=node.uid)
+			if node.properties:
+				branch.properties.update(node.properties)
+			return branch
+
+		rootTree = _copyBranch(self)
+		toVisit = [(self, rootTree)]
+		while toVisit:
+			node, branch = toVisit.pop()
+			for childNode in node._treeChildList():
+				childBranch = _copyBranch(childNode)
+				branch.addChild(childBranch)
+				toVisit.append((childNode, childBranch))
+		return rootTree
+	# endregion
+
 	def graph(self)->ChimaeraGraph:
 		"""too complicated making this an inherited property (when
 		we need to use the graph to determine inheritance) -
@@ -90,6 +159,7 @@ class GraphTree(TreeInterface, ChimaeraNode):
 	def _setName(self, name:str):
 		"""set node's name on internal Params data"""
 		self.setParam(NodeDataKeys.nodeName, name)
+		self._invalidateAddress()
 
 	@property
 	def _value(self):
@@ -109,7 +179,7 @@ class GraphTree(TreeInterface, ChimaeraNode):
 
 	@property
 	def _parent(self)->TreeType:
-		return firstOrNone(self.graph().sourceNodesForUse(self, DataUse.Tree))
+		return self.graph().treeParent(self)
 
 	@_parent.setter
 	def _parent(self, parent:GraphTree):
@@ -127,41 +197,80 @@ class GraphTree(TreeInterface, ChimaeraNode):
 			if oldParent is not None:
 				# remove existing edge
 				graph.remove_edge(oldParent, childNode, key=DataUse.Tree)
-		# add new edge
+				oldParent._removeTreeChild(childNode)
+		# add to child list before edge, so a sync from edge's delta
+		# finds child already placed
+		parentNode._insertTreeChild(childNode, newIndex)
 		graph.connectNodes(parentNode, childNode,
 		                   fromUse=DataUse.Tree, toUse=DataUse.Tree,
 		                   index=newIndex)
-
+		childNode._invalidateAddress()
+
+	def _insertTreeChild(self, childNode:GraphTree, index:int=-1):
+		"""negative or out-of-range index appends"""
+		if index is None or index < 0 or index >= len(self._treeChildren):
+			if self._treeChildIndexMap is not None:
+				self._treeChildIndexMap[childNode] = len(self._treeChildren)
+			self._treeChildren.append(childNode)
+		else:
+			self._treeChildren.insert(index, childNode)
+			self._treeChildIndexMap = None
+
+	def _removeTreeChild(self, childNode:GraphTree):
+		try:
+			self._treeChildren.remove(childNode)
+		except ValueError:
+			return
+		self._treeChildIndexMap = None
+
+	def _syncTreeChildren(self):
+		"""match ordered child list to tree edges in graph -
+		children that lost their edge are dropped, children with edges
+		added directly to graph (connectNodes, undo, deserialising) are
+		inserted at index stored on their edge"""
+		graph = self.graph()
+		edgeMap = {}
+		if self in graph:
+			edgeMap = {child : keyMap[DataUse.Tree]
+			           for child, keyMap in graph.succ[self].items()
+			           if DataUse.Tree in keyMap}
+		children = [i for i in self._treeChildren if i in edgeMap]
+		known = set(children)
+		if len(children) == len(self._treeChildren) and len(known) == len(edgeMap):
+			return
+		self._treeChildren[:] = children
+		self._treeChildIndexMap = None
+		newIndexMap = {}
+		for child in edgeMap:
+			if child not in known:
+				index = edgeMap[child].get("index")
+				newIndexMap[child] = -1 if index is None else index
+		# explicit indices first, in order, then appended ones
+		for child in sorted(newIndexMap, key=lambda i: (newIndexMap[i] < 0, newIndexMap[i])):
+			self._insertTreeChild(child, newIndexMap[child])
+
+	def _treeChildList(self)->list[GraphTree]:
+		"""return ordered child list, synced first if graph reports
+		this node's tree edges changed"""
+		if self.graph().takeTreeChildrenChanged(self):
+			self._syncTreeChildren()
+		return self._treeChildren
 
 	@property
 	def branchMap(self)-> dict[str, TreeType]:
-		"""collect child nodes from graph"""
-		#nodes = self.graph().destNodesForUse(self, DataUse.Tree)
-		nodes = self.graph().nodeOutputsFromUse(self, fromUse=DataUse.Tree, includeToUse=False)
-		# sort by edge indices
-		sortedNodes = []
-		edges = self.graph().edges
-		for i in nodes:
-			index = self.graph().edges[self, i, DataUse.Tree]["index"]
-			sortedNodes.insert(index, i)
-		return {i.name : i for i in sortedNodes}
-
+		"""collect child nodes in order"""
+		return {i.name : i for i in self._treeChildList()}
 
 	def _ownIndex(self) ->int:
-		if self.parent:
-			return self.graph().edges[self.parent, self, DataUse.Tree]["index"]
+		parent = self.parent
+		if parent:
+			children = parent._treeChildList()
+			if parent._treeChildIndexMap is None:
+				parent._treeChildIndexMap = {child : i for i, child in enumerate(children)}
+			return parent._treeChildIndexMap[self]
 		return 0
 
 
-	def _fixUpIndices(self):
-		"""plaster method to ensure indices on edges are valid
-		might instead store indices on nodes, not sure it makes much difference"""
-		outEdges = self.graph().out_edges(self, key=DataUse.Tree, data=True )
-		indexPool = sorted(outEdges, key="index")
-		for i, val in enumerate(indexPool):
-			val["index"] = i
-
-
 	def _addChild(self, newBranch:GraphTree, index:int) ->TreeType:
 		"""add node to graph if necessary
 		then connect nodes"""
@@ -181,7 +290,101 @@ class GraphTree(TreeInterface, ChimaeraNode):
 
 	def _remove(self, branch:GraphTree):
 		"""break edge between this node and branch"""
-		edge = self.graph().remove_edge(self, branch, DataUse.Tree)
+		self.graph().remove_edge(self, branch, DataUse.Tree)
+		self._removeTreeChild(branch)
+		branch._invalidateAddress()
+
+	# region address caching
+	def cachedAddress(self)->tuple[str, ...]:
+		"""tuple of branch names from root to this branch, root excluded
+		kept until this branch or one above it is renamed or reparented -
+		graph clears it from tree edge deltas, so edges changed directly
+		in graph are caught too"""
+		parent = self._parent
+		if self._addressCache is None or self._addressParent is not parent:
+			self._addressParent = parent
+			if parent is None:
+				self._addressCache = ()
+				self._addressRoot = self
+			else:
+				self._addressCache = parent.cachedAddress() + (self.name, )
+				self._addressRoot = parent._addressRoot
+		return self._addressCache
+
+	def _invalidateAddress(self):
+		"""clear cached addresses of this branch and all below it,
+		removing them from their root's index"""
+		toClear = [self]
+		while toClear:
+			branch = toClear.pop()
+			toClear.extend(branch._treeChildList())
+			if branch._addressCache is None:
+				continue
+			index = branch._addressRoot._addressIndex
+			if index.get(branch._addressCache) is branch:
+				del index[branch._addressCache]
+			branch._addressCache = None
+
+	def _onParamsChangedCheckName(self, *args, **kwargs):
+		"""invalidate cached addresses if this branch's name no longer
+		matches the one they were built with"""
+		if self._addressCache and self._addressCache[-1] != self.name:
+			self._invalidateAddress()
+
+	def _indexedAddress(self, address:tuple)->(tuple[str, ...], None):
+		"""flatten tree call arguments to a tuple of names, or None
+		if they hold anything but strings"""
+		result = []
+		for token in address:
+			if isinstance(token, str):
+				result.extend(token.split(self.separatorChar))
+			elif isinstance(token, (tuple, list)) and all(isinstance(i, str) for i in token):
+				result.extend(token)
+			else:
+				return None
+		return tuple(result)
+
+	def __call__(self, *address, **kwargs):
+		"""existing branches are found through address index -
+		anything not found, or any creation, is left to tree interface"""
+		names = self._indexedAddress(address)
+		if names:
+			branch = self.branchAtAddress(names)
+			if branch is not None:
+				return branch
+		return super(GraphTree, self).__call__(*address, **kwargs)
+
+	def getBranch(self, key, *args, **kwargs):
+		names = self._indexedAddress((key, ))
+		if names:
+			branch = self.branchAtAddress(names)
+			if branch is not None:
+				return branch
+		return super(GraphTree, self).getBranch(key, *args, **kwargs)
+
+	def branchAtAddress(self, address:(str, T.Sequence[str]))->(GraphTree, None):
+		"""return branch at address relative to this one, or None
+		found branches are indexed on the root - an index entry is only
+		trusted if the branch's cached address still matches"""
+		if isinstance(address, str):
+			address = address.split(self.separatorChar)
+		fullAddress = self.cachedAddress() + tuple(address)
+		root = self._addressRoot
+		branch = root._addressIndex.get(fullAddress)
+		if branch is not None:
+			if branch.cachedAddress() == fullAddress and branch._addressRoot is root:
+				return branch
+
+		# walk down branches, indexing each one found
+		branch = self
+		for name in address:
+			branch = branch.branchMap.get(name)
+			if branch is None:
+				root._addressIndex.pop(fullAddress, None)
+				return None
+			root._addressIndex[branch.cachedAddress()] = branch
+		return branch
+	# endregion
 
 	@property
 	def properties(self) ->dict:
@@ -4,16 +4,19 @@ from __future__ import annotations
 eventually handling hot-reload as well"""
 
 import importlib, importlib.util, importlib.machinery, \
-		os, sys, pkgutil, inspect, pprint, types, builtins
+		os, sys, pkgutil, inspect, pprint, types, builtins, traceback, hashlib
 import typing as T
 from collections import namedtuple
+from collections.abc import Mapping
 
 from tree.lib.path import PurePath, Path
 from tree.lib.python import safeLoadModule
 from tree import Signal
 
 from chimaera.core.node import ChimaeraNode
-from chimaera.constant import ROOT_PATH
+from chimaera.constant import ROOT_PATH, USER_CACHE_PATH
+from chimaera.lib.manifest import CatalogueManifest, ManifestClassEntry, moduleFilesInPackagePath, \
+	scanSourceFiles, candidateClasses, qualifiedClassName
 
 def import_file(full_name, path):
 	"""Import a python module from a path. 3.4+ only.
@@ -82,12 +85,54 @@ def modulesInPackagePath(packagePath, rootPackageName="chimaera", includeParent=
 	return results
 
 
+class ManifestClassMap(Mapping):
+	"""read-only { class name : class } map over a catalogue's manifest -
+	a class's module is only imported when that class is first looked up
+	keyFn gives the name of already loaded classes, matching
+	keys of nameEntryMap"""
+
+	def __init__(self, catalogue:ClassCatalogue, nameEntryMap:dict[str, ManifestClassEntry],
+	             keyFn:T.Callable[[type], str]=lambda x : x.__name__):
+		self.catalogue = catalogue
+		self.nameEntryMap = nameEntryMap
+		self.loaded = {keyFn(i) : i for i in catalogue.classModuleMap}
+
+	def __getitem__(self, name:str)->type:
+		result = self.loaded.get(name)
+		if result is None:
+			result = self.catalogue.loadManifestClass(self.nameEntryMap[name])
+			self.loaded[name] = result
+		return result
+
+	def __contains__(self, name):
+		return name in self.loaded or name in self.nameEntryMap
+
+	def __iter__(self):
+		return iter(self.loaded.keys() | self.nameEntryMap.keys())
+
+	def __len__(self):
+		return len(self.loaded.keys() | self.nameEntryMap.keys())
+
+
 class ClassCatalogue(object):
 	"""object with logic for iterating over a set of packages
 	and gathering all valid classesToReload defined in them
 	maybe a bit specific for a generic object but it's fine
 
 	also defines logic for reloading individual known classesToReload
+
+	if manifestPath is given, found classes are saved there - while no
+	scanned file has changed, later sessions read names from the manifest
+	and import modules only when their classes are asked for
+	when files do change, only those files are parsed, and only those
+	that may define catalogue classes are imported
+
+	with a manifest, classes are registered once imported - gathering
+	emits a RegisterEvent for those loaded so far, and each class loaded
+	later emits its own, so listeners see the same full set of classes
+	whether manifest was current or not
+	manifest only finds classes defined by class statements, see
+	chimaera.lib.manifest - register dynamic classes explicitly
 	"""
 	# tuples of matching length holding old and new class objects,
 	# and new module objects
@@ -99,38 +144,185 @@ class ClassCatalogue(object):
 
 	def __init__(self, classPackagePaths:T.List[T.Union[Path, str]], baseClasses:set[type],
 				 parentPackageNames:list[str],
-				 register=False):
+				 register=False,
+				 manifestPath:T.Union[Path, str]=None):
 		self.initialised = False
 		self.classModuleMap = {}
+		self.manifestPath = manifestPath
+		self.manifest : CatalogueManifest = None
 		self.scanPackagePaths = list(map(Path, classPackagePaths))
 		self.parentPackageNames = parentPackageNames
 		self.scanBaseClasses = baseClasses
 		self.classesChanged = Signal(name="classesRegistered")
 		self.classesReloaded = Signal(name="classesReloaded")
 
+		# lookup maps, built on demand and cleared when classes are
+		# registered or reloaded - not when a manifest class is imported,
+		# manifest maps already list it
+		self._nameClassMap : T.Mapping[str, type] = None
+		self._qualifiedClassMap : T.Mapping[str, type] = None
+		self.classesReloaded.connect(self._onClassesChanged)
+
 		if register:
 			self.registerClasses(baseClasses)
 
 	@property
 	def classes(self)->T.Set[type]:
-		"""return set of known classes"""
+		"""return set of all known classes - with a manifest, this imports
+		any modules not yet loaded, use nameClassMap() to look up lazily"""
+		if self.manifest is not None:
+			self.loadManifestClasses()
+		return set(self.classModuleMap.keys())
+
+	def loadedClasses(self)->T.Set[type]:
+		"""return set of classes already imported"""
 		return set(self.classModuleMap.keys())
 
-	def nameClassMap(self)->dict[str, type]:
+	def _onClassesChanged(self, *args, **kwargs):
+		self._nameClassMap = None
+		self._qualifiedClassMap = None
+
+	def nameClassMap(self)->T.Mapping[str, type]:
 		"""dict of { class name, class object } for nodes
 		likely better processing needed here for namespaces, custom
-		systems to extract names from type objects etc"""
-		return {i.__name__ : i for i in  self.classes}
+		systems to extract names from type objects etc
+		with a manifest, classes not yet imported are loaded on lookup
+		map is cached until catalogue classes change - do not modify it"""
+		if self._nameClassMap is None:
+			if self.manifest is None:
+				self._nameClassMap = {i.__name__ : i for i in self.classes}
+			else:
+				self._nameClassMap = ManifestClassMap(self, self.manifest.nameEntryMap())
+		return self._nameClassMap
+
+	def qualifiedClassMap(self)->T.Mapping[str, type]:
+		"""dict of { "module.ClassName" : class object } - use where
+		short class names may clash between packages
+		cached the same as nameClassMap()"""
+		if self._qualifiedClassMap is None:
+			if self.manifest is None:
+				self._qualifiedClassMap = {qualifiedClassName(i) : i for i in self.classes}
+			else:
+				self._qualifiedClassMap = ManifestClassMap(
+					self,
+					{f"{i.module}.{i.name}" : i for i in self.manifest.classEntries()},
+					keyFn=qualifiedClassName)
+		return self._qualifiedClassMap
+
+	def classForName(self, name:str)->type:
+		"""return class for short or qualified name
+		raises KeyError if not found"""
+		try:
+			return self.nameClassMap()[name]
+		except KeyError:
+			pass
+		return self.qualifiedClassMap()[name]
+
+	def scanModuleFiles(self)->list[tuple[str, str]]:
+		"""(module name, file path) for all modules under scan paths,
+		without importing them"""
+		result = []
+		for path, parentName in zip(self.scanPackagePaths, self.parentPackageNames):
+			result.extend(moduleFilesInPackagePath(path, parentName))
+		return result
 
 	def gatherClasses(self, force=False):
 		"""iterate over class package paths,
 		gather valid subclasses, add them to class package map
-		this naturally has to load all modules
+		without a manifest this naturally has to load all modules -
+		with a manifest, only new or changed modules are loaded here
 		"""
 		# guard against recursion
 		if self.initialised and not force:
 			return
 		self.initialised = True
+		if self.manifestPath is None:
+			self._importGatherClasses()
+			self._emitGathered()
+			return
+
+		self.manifest = CatalogueManifest.load(self.manifestPath)
+		moduleFiles = self.scanModuleFiles()
+		changed, removed = self.manifest.staleFiles(moduleFiles)
+		if force:
+			changed = moduleFiles
+		for filePath in removed:
+			self.manifest.removeFileEntry(filePath)
+		if changed:
+			self.updateManifestFiles(changed)
+		# also saves mtimes refreshed while checking files
+		if self.manifest.modified:
+			self.manifest.save()
+		self._emitGathered()
+
+	def _emitGathered(self):
+		self._onClassesChanged()
+		classes = list(self.classModuleMap.keys())
+		self.classesChanged(self.RegisterEvent(
+			classes, [self.classModuleMap[i] for i in classes]))
+
+	def updateManifestFiles(self, moduleFiles:T.Sequence[tuple[str, str]]):
+		"""statically parse given (module name, path) files, then import and
+		validate only those modules that may define catalogue classes
+		modules that fail to import are left out of manifest, so they are
+		retried next time"""
+		scannedFiles = scanSourceFiles(moduleFiles)
+		scannedPaths = {i.path for i in scannedFiles}
+		knownNames = {i.__name__ for i in self.scanBaseClasses}
+		for filePath, fileEntry in self.manifest.files.items():
+			if filePath not in scannedPaths:
+				knownNames.update(i.name for i in fileEntry.classes)
+		candidates = candidateClasses(scannedFiles, knownNames)
+
+		for scanned in scannedFiles:
+			fileCandidates = candidates.get(scanned.path)
+			if not fileCandidates:
+				self.manifest.setScannedFileEntry(scanned, ())
+				continue
+			try:
+				module = importlib.import_module(scanned.module)
+			except Exception:
+				print("failed to import {} for class catalogue".format(scanned.module))
+				traceback.print_exc()
+				self.manifest.removeFileEntry(scanned.path)
+				continue
+			classEntries = []
+			for entry in fileCandidates:
+				testClass = getattr(module, entry.name, None)
+				if not isinstance(testClass, type) or not self.checkValidClass(testClass, module):
+					continue
+				self.classModuleMap[testClass] = module
+				classEntries.append(ManifestClassEntry.fromClass(testClass))
+			self.manifest.setScannedFileEntry(scanned, classEntries)
+
+	def loadManifestClass(self, entry:ManifestClassEntry)->type:
+		"""import the module for a manifest entry and register its class
+		raises KeyError if the module no longer defines a valid class
+		of that name"""
+		module = importlib.import_module(entry.module)
+		testClass = getattr(module, entry.name, None)
+		if not isinstance(testClass, type) or not self.checkValidClass(testClass, module):
+			raise KeyError(f"class {entry.name} in catalogue manifest not found in {module}; manifest is out of date")
+		if testClass not in self.classModuleMap:
+			self.classModuleMap[testClass] = module
+			self.classesChanged(self.RegisterEvent([testClass], [module]))
+		return testClass
+
+	def loadManifestClasses(self):
+		"""import every class in manifest not yet loaded"""
+		loadedNames = {qualifiedClassName(i) for i in self.classModuleMap}
+		for entry in self.manifest.classEntries():
+			if f"{entry.module}.{entry.name}" in loadedNames:
+				continue
+			try:
+				self.loadManifestClass(entry)
+			except Exception:
+				print("failed to load {}.{} from catalogue manifest".format(
+					entry.module, entry.name))
+				traceback.print_exc()
+
+	def _importGatherClasses(self):
+		"""import every module under scan paths and gather classes from them"""
 		for path, parentName in zip(self.scanPackagePaths, self.parentPackageNames):
 			rootPath = Path(path)
 			results = modulesInPackagePath(rootPath, parentName, loadModules=True)
@@ -195,6 +387,7 @@ class ClassCatalogue(object):
 			registeredClasses.append(testClass)
 			registeredModules.append(mod)
 		# emit signal
+		self._onClassesChanged()
 		self.classesChanged(self.RegisterEvent(
 			registeredClasses, registeredModules))
 
@@ -202,7 +395,9 @@ class ClassCatalogue(object):
 		"""reload the modules holding a set of classesToReload, then reimport them
 		this may lead to some classesToReload in catalogue being out of date,
 		but accessing them via the catalogue means that is actually
-		ok"""
+		ok
+		nodes of reloaded classes in every live graph are migrated
+		to the new classes"""
 		# check only known classesToReload are passed
 		unknownClasses = set(classesToReload).difference(set(self.classModuleMap.keys()))
 		if unknownClasses:
@@ -228,14 +423,25 @@ class ClassCatalogue(object):
 		validClasses = set(newClassModuleMap.keys())
 		for oldClass in classesToReload:
 			newClass = self.getMatchingReloadedClass(oldClass, validClasses)
+			if newClass is None: # class removed from its module
+				continue
 			newModule = newClassModuleMap[newClass]
 			oldClasses.append(oldClass)
 			newClasses.append(newClass)
 			newModules.append(newModule)
 
+		# catalogue now serves new classes
+		for oldClass, newClass, newModule in zip(oldClasses, newClasses, newModules):
+			self.classModuleMap.pop(oldClass, None)
+			self.classModuleMap[newClass] = newModule
+
 		event = self.ReloadEvent(oldClasses,
 								 newClasses,
 								 newModules)
+		# live nodes may come from any catalogue, so all graphs are told -
+		# imported here, graph module imports this one
+		from chimaera.core.graph import ChimaeraGraph
+		ChimaeraGraph.onCatalogueClassesReloaded(event)
 		self.classesReloaded(event)
 
 
@@ -255,6 +461,11 @@ class ClassCatalogue(object):
 	def display(self):
 		print(self.displayStr())
 
+# manifest lives in user cache, not in package - installs may be read-only
+# named per install path, so separate installs don't overwrite each other
+baseManifestPath = USER_CACHE_PATH / "catalogue-{}.json".format(
+	hashlib.sha1(str(ROOT_PATH).encode()).hexdigest()[:12])
 baseChimaeraCatalogue = ClassCatalogue([ROOT_PATH],
                                        baseClasses={ChimaeraNode},
-                                       parentPackageNames=["chimaera"])
+                                       parentPackageNames=["chimaera"],
+                                       manifestPath=baseManifestPath)
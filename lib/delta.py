@@ -27,7 +27,6 @@ class GraphNodeDelta(DeltaAtom):
 
 	def doDelta(self, target:ChimaeraGraph):
 		target.signalComponent.pauseDeltaGathering()
-		print("node doDelta")
 		if self.added:
 			target.add_nodes_from(self.added)
 		if self.removed:
@@ -77,7 +76,6 @@ class GraphEdgeDelta(DeltaAtom):
 
 	def doDelta(self, target:ChimaeraGraph):
 		target.signalComponent.pauseDeltaGathering()
-		print("edge doDelta")
 		if self.added:
 			target.add_edges_from(self.added)
 		if self.removed:
@@ -97,6 +95,59 @@ class GraphDeltaTracker(DeltaTracker):
 	pass
 
 
+class GraphDeltaQueue:
+	"""gathers node and edge deltas as they arrive, merging them into
+	one net delta of each kind -
+	element added then removed cancels out, as does one removed
+	then added back
+	lets a consumer take many small deltas at once, at its own pace"""
+
+	def __init__(self):
+		self.nodesAdded : set[ChimaeraNode] = set()
+		self.nodesRemoved : set[ChimaeraNode] = set()
+		self.edgesAdded : set[tuple] = set()
+		self.edgesRemoved : set[tuple] = set()
+
+	def push(self, delta:(GraphNodeDelta, GraphEdgeDelta)):
+		if isinstance(delta, GraphNodeDelta):
+			added, removed = self.nodesAdded, self.nodesRemoved
+		else:
+			added, removed = self.edgesAdded, self.edgesRemoved
+		for i in delta.removed:
+			if i in added:
+				added.discard(i)
+			else:
+				removed.add(i)
+		for i in delta.added:
+			if i in removed:
+				removed.discard(i)
+			else:
+				added.add(i)
+
+	def __bool__(self):
+		return bool(self.nodesAdded or self.nodesRemoved
+		            or self.edgesAdded or self.edgesRemoved)
+
+	def clear(self):
+		self.nodesAdded = set()
+		self.nodesRemoved = set()
+		self.edgesAdded = set()
+		self.edgesRemoved = set()
+
+	def take(self)->list[(GraphNodeDelta, GraphEdgeDelta)]:
+		"""return net deltas gathered so far, node delta first,
+		and clear queue"""
+		result = []
+		if self.nodesAdded or self.nodesRemoved:
+			result.append(GraphNodeDelta(added=self.nodesAdded,
+			                             removed=self.nodesRemoved))
+		if self.edgesAdded or self.edgesRemoved:
+			result.append(GraphEdgeDelta(added=self.edgesAdded,
+			                             removed=self.edgesRemoved))
+		self.clear()
+		return result
+
+
 class GraphSignalContext:
 	"""weird intermediate object returned from
 	'with graph.signals.mute()'
@@ -134,6 +185,10 @@ class GraphDeltaSignalComponent:
 	def __init__(self, graph:Graph):
 		self.graph = graph
 		self.pausedDeltaGathering = False
+		self._pauseDepth = 0 # pauses may nest, only outermost unpause emits
+		# while any transaction is open, graph functions run unwrapped -
+		# outermost transaction emits one delta for all changes
+		self.transactionDepth = 0
 		#self.pauseAndGathering = False
 		self.storedDeltas = {"node" : [],
 		                     "edge" : []}
@@ -158,11 +213,15 @@ class GraphDeltaSignalComponent:
 		                     "edge" : []}
 
 	def pauseDeltaGathering(self):
+		self._pauseDepth += 1
 		self.pausedDeltaGathering = True
 		#return GraphSignalContext(self, muteSignals=True)
 
 	def unPauseDeltaGathering(self, emitStoredDeltas=True):
 		#print("unpausing delta gathering")
+		self._pauseDepth = max(0, self._pauseDepth - 1)
+		if self._pauseDepth:
+			return
 		self.pausedDeltaGathering = False
 		if emitStoredDeltas:
 			# combine deltas
@@ -224,6 +283,8 @@ class GraphDeltaSignalComponent:
 		# print("wrapGraphFn", graphInstance, instanceFn)
 		def wrapperFn(*args, **kwargs):
 			# print("wrapper", args, kwargs)
+			if self.transactionDepth: # delta found when transaction ends
+				return instanceFn(*args, **kwargs)
 
 			baseNodeSet = self.gatherNodeSet(graphInstance)
 			baseEdgeSet = self.gatherEdgeSet(graphInstance)
@@ -251,25 +312,36 @@ class GraphDeltaSignalComponent:
 class GraphTransaction:
 	"""get node state either side of block - then extract deltas
 	might be a better option to compare serialised state of nodes and edges -
-	more sensitive to deep state changes"""
+	more sensitive to deep state changes
+
+	graph functions inside the block skip their own delta checks,
+	so node and edge sets are only compared once, when the outermost
+	transaction exits - emitting at most one node and one edge delta
+	"""
 	def __init__(self, graph:ChimaeraGraph):
-		print("graph transaction init")
 		self.graph = graph
 		self.baseNodeSet : set[ChimaeraNode] = set()
 		self.baseEdgeSet : set[tuple] = set()
 
 	def __enter__(self):
-		self.baseNodeSet = self.graph.signalComponent.gatherNodeSet(self.graph)
-		self.baseEdgeSet = self.graph.signalComponent.gatherEdgeSet(self.graph)
-		self.graph.signalComponent.pauseDeltaGathering()
+		component = self.graph.signalComponent
+		if not component.transactionDepth:
+			self.baseNodeSet = component.gatherNodeSet(self.graph)
+			self.baseEdgeSet = component.gatherEdgeSet(self.graph)
+		component.transactionDepth += 1
+		component.pauseDeltaGathering()
+		return self
 
 	def __exit__(self, exc_type, exc_val, exc_tb):
-		if exc_type is not None:
-			raise exc_type
-
-		newNodeSet = self.graph.signalComponent.gatherNodeSet(self.graph)
-		newEdgeSet = self.graph.signalComponent.gatherEdgeSet(self.graph)
-
-
-		self.graph.signalComponent.unPauseDeltaGathering()
+		component = self.graph.signalComponent
+		component.transactionDepth -= 1
+		# graph may be partly changed even on error, emit deltas anyway
+		if not component.transactionDepth:
+			newNodeSet = component.gatherNodeSet(self.graph)
+			newEdgeSet = component.gatherEdgeSet(self.graph)
+			for delta in (component.deltaFromNodeSets(self.baseNodeSet, newNodeSet),
+			              component.deltaFromEdgeSets(self.baseEdgeSet, newEdgeSet)):
+				if delta:
+					component.emitDelta(delta)
+		component.unPauseDeltaGathering()
 
@@ -7,12 +7,14 @@ from collections import defaultdict
 if T.TYPE_CHECKING:
 	from chimaera.core.graph import ChimaeraGraph
 	from chimaera.core.node import ChimaeraNode
+	from chimaera.plugtree import PlugTree
+	from chimaera.plugnode import PlugNode
 	from chimaera.lib.delta import GraphNodeDelta, GraphEdgeDelta, GraphDeltaSignalComponent, GraphDeltaTracker
 
 from tree import Signal
 
 from chimaera.constant import GraphEvalModes
-from chimaera import GraphData, DataUse
+from chimaera import GraphData, ColumnarGraphData, DataUse
 
 toUid = lambda x: x if isinstance(x, str) else x.uid
 
@@ -53,15 +55,22 @@ class GraphExecutionComponent:
 		self.graph = graph
 		self.evalMode = GraphEvalModes.Active
 
+		# keyed by node uid
 		self.dirtyMap : dict[str, bool] = defaultdict(lambda : True)
 
 		# state flags
 		self.executingQueue = False
 		self._executingNode : ChimaeraNode = None # node currently being evaluated
 		self.graphMutatedDuringExec = False
+		self.pullingPlugs = 0 # plug values set during plug eval don't dirty
+		self.cancelRequested = False # stop evalNodes before its next node
 
 		# state signals
 		self.executingNodeChanged = Signal()
+		# emitted with full list of nodes to evaluate, when queue is (re)built
+		self.evalQueueChanged = Signal()
+		# emitted with each node once evalNodes is done with it
+		self.nodeEvaluated = Signal()
 
 
 	def isDirty(self, node:(str, ChimaeraNode)):
@@ -78,6 +87,122 @@ class GraphExecutionComponent:
 
 
 
+	# region plug-level dirtiness
+	def onPlugValueChanged(self, plug:PlugTree):
+		if self.pullingPlugs:
+			return
+		self.setPlugDirty(plug)
+
+	def setPlugDirty(self, plug:PlugTree, dirty=True):
+		"""mark plug dirty, following only plugs it affects -
+		an input plug dirties the outputs of its node that depend on it,
+		an output plug dirties the input plugs connected to it,
+		and so on downstream
+		other nodes connected to output plugs are dirtied whole"""
+		toVisit = [plug]
+		visited = set()
+		while toVisit:
+			current = toVisit.pop()
+			if current in visited:
+				continue
+			visited.add(current)
+			self.dirtyMap[toUid(current)] = dirty
+
+			plugNode = current.plugNode()
+			if plugNode is None:
+				continue
+			if current.isInput():
+				self.dirtyMap[toUid(plugNode)] = dirty
+				toVisit.extend(plugNode.affectedOutputs(current))
+				continue
+			for destNode in self.graph.nodeOutputsFromUse(current, DataUse.Flow,
+			                                               includeToUse=False):
+				if hasattr(destNode, "plugNode"):
+					toVisit.append(destNode)
+				else:
+					self.setDirty(destNode, dirty)
+
+	def evalPlug(self, outputPlug:PlugTree):
+		"""pull value of a single output plug - upstream output plugs feeding
+		its affecting inputs are evaluated first, only if dirty"""
+		if not self.isDirty(outputPlug):
+			return
+		plugNode = outputPlug.plugNode()
+		self.pullingPlugs += 1
+		try:
+			for inputPlug in plugNode.affectingInputs(outputPlug):
+				for sourcePlug in self.graph.sourceNodesForUse(inputPlug, DataUse.Flow):
+					if hasattr(sourcePlug, "plugNode") and sourcePlug.isOutput():
+						self.evalPlug(sourcePlug)
+					inputPlug.value = sourcePlug.value
+				# compact plug elements connected without graph edges
+				for sourcePlug, sourceIndex in inputPlug.elementSourcePlugs().values():
+					if hasattr(sourcePlug, "plugNode") and sourcePlug.isOutput():
+						self.evalPlug(sourcePlug)
+				inputPlug.pullElementSources()
+				self.setDirty(inputPlug, False, allFuture=False)
+			self.setExecutingNode(plugNode)
+			plugNode.computePlug(outputPlug)
+			self.setDirty(outputPlug, False, allFuture=False)
+		finally:
+			self.pullingPlugs -= 1
+			self.setExecutingNode(None)
+
+	def plugNodeGenerations(self, nodesToEval:T.Iterable[PlugNode])->list[list[PlugNode]]:
+		"""return generations of plug nodes to evaluate, including all
+		plug nodes upstream through plug connections
+		plug edges join plugs rather than their nodes, so graph's own
+		topological order can't be used here"""
+		dependGraph = nx.DiGraph()
+		toVisit = list(nodesToEval)
+		while toVisit:
+			node = toVisit.pop()
+			if node in dependGraph:
+				continue
+			dependGraph.add_node(node)
+			for inputPlug in node.inPlug.branches:
+				sourcePlugs = list(self.graph.sourceNodesForUse(inputPlug, DataUse.Flow))
+				sourcePlugs.extend(i[0] for i in inputPlug.elementSourcePlugs().values())
+				for sourcePlug in sourcePlugs:
+					sourceNode = sourcePlug.plugNode() if hasattr(sourcePlug, "plugNode") else None
+					if sourceNode is None:
+						continue
+					dependGraph.add_edge(sourceNode, node)
+					toVisit.append(sourceNode)
+		return [list(i) for i in nx.topological_generations(dependGraph)]
+
+	def evalPlugNodes(self, nodesToEval:T.Iterable[PlugNode]):
+		"""evaluate dirty plug nodes and everything they draw from -
+		in each generation, dirty nodes of classes supporting batch execution
+		are evaluated together in one vectorised call, others plug by plug"""
+		for generation in self.plugNodeGenerations(nodesToEval):
+			classNodeMap : dict[type, list[PlugNode]] = defaultdict(list)
+			for node in generation:
+				if any(self.isDirty(i) for i in node.outPlug.branches):
+					classNodeMap[type(node)].append(node)
+			for nodeCls, nodes in classNodeMap.items():
+				if nodeCls.supportsBatchExecute:
+					self.evalPlugNodeBatch(nodeCls, nodes)
+					continue
+				for node in nodes:
+					for outputPlug in node.outPlug.branches:
+						self.evalPlug(outputPlug)
+
+	def evalPlugNodeBatch(self, nodeCls:T.Type[PlugNode], nodes:list[PlugNode]):
+		"""run executeBatch() once for all given nodes of a single class"""
+		self.pullingPlugs += 1
+		try:
+			inputColumns = nodeCls.gatherInputColumns(nodes)
+			outputColumns = nodeCls.executeBatch(nodes, inputColumns)
+			nodeCls.applyOutputColumns(nodes, outputColumns)
+		finally:
+			self.pullingPlugs -= 1
+		for node in nodes:
+			for plug in node.inPlug.branches + node.outPlug.branches:
+				self.setDirty(plug, False, allFuture=False)
+			self.setDirty(node, False, allFuture=False)
+	# endregion
+
 	@property
 	def executingNode(self)->(ChimaeraNode, None):
 		return self._executingNode
@@ -90,13 +215,29 @@ class GraphExecutionComponent:
 		"""evaluate a single node
 		first gather flow data of all preceding nodes, combine data into GraphData object,
 		then pass to node
-		does not check for dirtyness"""
-		# combine trees from input plugs
+		does not check for dirtyness
+		plug nodes are evaluated plug by plug through evalPlugNodes(),
+		following plug dirtiness and plugAffects - plugs themselves are
+		evaluated through their plug node"""
+		from chimaera.plugnode import PlugNode
+		from chimaera.plugtree import PlugTree
+		if isinstance(node, PlugNode):
+			self.evalPlugNodes([node])
+			# only this node - downstream plugs keep their own dirty state
+			if markClean:
+				self.setDirty(node, False, allFuture=False)
+			return
+		if isinstance(node, PlugTree):
+			if node.isOutput() and node.plugNode() is not None:
+				self.evalPlug(node)
+			return
+
+		# combine input data - large inputs are held as columns
 		graphDatas = []
-		for inputNode in self.graph.nodeInputMap(node)[DataUse.Flow]:
+		for inputNode in self.graph.nodeInputMap(node)[DataUse.Flow].values():
 			inputData = self.graph.nodeData(inputNode, DataUse.Flow)
 			graphDatas.append(inputData)
-		combinedData = GraphData.combine(*graphDatas)
+		combinedData = ColumnarGraphData.combineFlow(*graphDatas)
 
 		# eval node
 		resultData = node.execute(combinedData)
@@ -131,39 +272,55 @@ class GraphExecutionComponent:
 		return result
 
 
-	def evalNodes(self, nodesToEval:set[ChimaeraNode]):
+	def cancelEval(self):
+		"""stop running evalNodes once current node finishes -
+		may be called from another thread
+		does nothing if no evaluation is running"""
+		if self.executingQueue:
+			self.cancelRequested = True
+
+	def evalNodes(self, nodesToEval:set[ChimaeraNode])->bool:
 		"""main entry function - pass a load of nodes, sit back, watch magic happen
+		returns False if cancelled before queue finished - cancellation is
+		only checked between nodes, never during one
 		"""
 		# get initial queue
 		queue = self.nodeQueueToEvalNodes(nodesToEval)
+		self.evalQueueChanged.emit(list(queue))
+		# only cancels made during this run count
+		self.cancelRequested = False
 		self.executingQueue = True
 		self.graphMutatedDuringExec = False
-		while queue:
-			# get next node to eval
-			node = queue.pop(0)
-			self.setExecutingNode(node)
-			if not self.isDirty(node): # skip if clean
-				continue
-
-			# eval node
-			self.evalNode(node)
-
-			# check for graph mutation
-			if self.graphMutatedDuringExec:
-				self.graphMutatedDuringExec = False
-
-				""" look up new queue in new graph structure -
-				if renewed uids are consistent, any regenerated nodes
-				will still be marked as dirty / clean,
-				so will be skipped if nothing more to be done
-				"""
-				# no complex checking for destination eval nodes yet -
-				# if they get regenerated too, this will miss them
-				queue = self.nodeQueueToEvalNodes(nodesToEval)
-
-		# clear executing queue
-		self.executingQueue = False
-		self.setExecutingNode(None)
+		try:
+			while queue:
+				if self.cancelRequested:
+					return False
+				# get next node to eval
+				node = queue.pop(0)
+				self.setExecutingNode(node)
+				if self.isDirty(node): # skip if clean
+					self.evalNode(node)
+				self.nodeEvaluated.emit(node)
+
+				# check for graph mutation
+				if self.graphMutatedDuringExec:
+					self.graphMutatedDuringExec = False
+
+					""" look up new queue in new graph structure -
+					if renewed uids are consistent, any regenerated nodes
+					will still be marked as dirty / clean,
+					so will be skipped if nothing more to be done
+					"""
+					# no complex checking for destination eval nodes yet -
+					# if they get regenerated too, this will miss them
+					queue = self.nodeQueueToEvalNodes(nodesToEval)
+					self.evalQueueChanged.emit(list(queue))
+			return True
+		finally:
+			# clear executing queue, even if a node raised
+			self.cancelRequested = False
+			self.executingQueue = False
+			self.setExecutingNode(None)
 
 
 
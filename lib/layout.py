@@ -0,0 +1,443 @@
+from __future__ import annotations
+"""automatic graph layout on plain data
+
+nodes are ints 0 to n-1, edges are (source, dest) pairs, and sizes are
+(width, height) per node - nothing here touches graph or qt objects,
+so a layout can be run on a worker thread from a snapshot
+
+layeredLayout() is a sugiyama-style layout - break cycles, assign
+layers by longest path, route long edges through dummy nodes, reduce
+crossings with barycentre sweeps, then place layers left to right
+forceRelax() refines any positions with a force-directed pass, vectorised
+over numpy when available
+"""
+
+import math
+import typing as T
+
+try:
+	import numpy as np
+except ImportError:
+	np = None
+
+edgeListType = T.Sequence[T.Tuple[int, int]]
+
+
+# region layering
+def breakCycles(n:int, edges:edgeListType)->list[tuple[int, int]]:
+	"""return edges with every back edge of a depth-first search
+	reversed, so result is acyclic - self loops are dropped"""
+	adjacency = [[] for i in range(n)]
+	for src, dst in edges:
+		if src != dst:
+			adjacency[src].append(dst)
+	# 0 unvisited, 1 on stack, 2 done
+	state = [0] * n
+	backEdges = set()
+	for root in range(n):
+		if state[root]:
+			continue
+		state[root] = 1
+		stack = [(root, iter(adjacency[root]))]
+		while stack:
+			node, children = stack[-1]
+			for child in children:
+				if state[child] == 1:
+					backEdges.add((node, child))
+				elif state[child] == 0:
+					state[child] = 1
+					stack.append((child, iter(adjacency[child])))
+					break
+			else:
+				state[node] = 2
+				stack.pop()
+	return [(dst, src) if (src, dst) in backEdges else (src, dst)
+	        for src, dst in edges if src != dst]
+
+def assignLayers(n:int, edges:edgeListType)->list[int]:
+	"""longest-path layering of an acyclic graph - every edge points to
+	a higher layer
+	longest path puts every source in layer 0, so afterwards nodes with
+	more outgoing than incoming edges are pulled along towards their
+	successors, shortening long edges (and so dummy nodes)"""
+	successors = [[] for i in range(n)]
+	predecessors = [[] for i in range(n)]
+	inDegree = [0] * n
+	for src, dst in edges:
+		successors[src].append(dst)
+		predecessors[dst].append(src)
+		inDegree[dst] += 1
+	layers = [0] * n
+	topoOrder = []
+	queue = [i for i in range(n) if not inDegree[i]]
+	while queue:
+		node = queue.pop()
+		topoOrder.append(node)
+		for child in successors[node]:
+			layers[child] = max(layers[child], layers[node] + 1)
+			inDegree[child] -= 1
+			if not inDegree[child]:
+				queue.append(child)
+	for node in reversed(topoOrder):
+		if len(successors[node]) > len(predecessors[node]):
+			layers[node] = min(layers[i] for i in successors[node]) - 1
+	return layers
+
+def insertDummies(layers:list[int], edges:edgeListType)->tuple[list[int], list[tuple[int, int]]]:
+	"""split edges spanning more than one layer into chains through
+	dummy nodes, numbered after real nodes
+	return (layers including dummies, edges between adjacent layers)"""
+	layers = list(layers)
+	result = []
+	for src, dst in edges:
+		prev = src
+		for layer in range(layers[src] + 1, layers[dst]):
+			dummy = len(layers)
+			layers.append(layer)
+			result.append((prev, dummy))
+			prev = dummy
+		result.append((prev, dst))
+	return layers, result
+# endregion
+
+# region crossing minimisation
+def _countInversions(values:list[int], size:int)->int:
+	"""number of out-of-order pairs in values, all in range(size) -
+	counted with a fenwick tree of values seen so far"""
+	tree = [0] * (size + 1)
+	count = 0
+	for seen, value in enumerate(values):
+		# number seen so far that are <= value
+		i = value + 1
+		notGreater = 0
+		while i:
+			notGreater += tree[i]
+			i &= i - 1
+		count += seen - notGreater
+		i = value + 1
+		while i <= size:
+			tree[i] += 1
+			i += i & -i
+	return count
+
+def _countInversionsArray(values:np.ndarray)->int:
+	"""number of out-of-order pairs in non-negative int values -
+	bottom-up merge sort, each pass merging all block pairs at once"""
+	values = np.asarray(values, dtype=np.int64)
+	m = len(values)
+	if m < 2:
+		return 0
+	# offset values by block pair, so one sorted array holds every pair apart
+	big = int(values.max()) + 1
+	index = np.arange(m)
+	count = 0
+	width = 1
+	while width < m:
+		pairId = index // (2 * width)
+		isRight = (index // width) % 2 == 1
+		keys = pairId * big + values
+		leftKeys = keys[~isRight]
+		rightKeys = keys[isRight]
+		leftEnd = np.searchsorted(leftKeys, (pairId[isRight] + 1) * big, side="left")
+		notGreater = np.searchsorted(leftKeys, rightKeys, side="right")
+		count += int((leftEnd - notGreater).sum())
+		values = np.sort(keys) - pairId * big
+		width *= 2
+	return count
+
+def _countCrossingsArray(pos:np.ndarray, layers:np.ndarray,
+                         src:np.ndarray, dst:np.ndarray)->int:
+	"""countCrossings over arrays of node position in layer,
+	node layer and edge ends"""
+	if not len(src):
+		return 0
+	srcPos, dstPos, srcLayer = pos[src], pos[dst], layers[src]
+	order = np.lexsort((dstPos, srcPos, srcLayer))
+	return _countInversionsArray(
+		srcLayer[order] * (int(dstPos.max()) + 1) + dstPos[order])
+
+def countCrossings(layerLists:list[list[int]], edges:edgeListType)->int:
+	"""total edge crossings between adjacent layers"""
+	position = {}
+	layerOf = {}
+	for layerIndex, layer in enumerate(layerLists):
+		for i, node in enumerate(layer):
+			position[node] = i
+			layerOf[node] = layerIndex
+	layerEdges = [[] for i in layerLists]
+	for src, dst in edges:
+		layerEdges[layerOf[src]].append((position[src], position[dst]))
+	total = 0
+	for layerIndex, pairs in enumerate(layerEdges[:-1]):
+		pairs.sort()
+		total += _countInversions([i[1] for i in pairs],
+		                          len(layerLists[layerIndex + 1]))
+	return total
+
+def orderLayers(layers:list[int], edges:edgeListType, sweeps:int=8)->list[list[int]]:
+	"""order nodes within each layer to reduce crossings -
+	alternate down and up sweeps, each sorting a layer by the mean position
+	of its neighbours in the layer before, keeping the best ordering seen"""
+	if np is not None:
+		return _orderLayersArray(layers, edges, sweeps)
+	nLayers = max(layers) + 1 if layers else 0
+	layerLists = [[] for i in range(nLayers)]
+	for node, layer in enumerate(layers):
+		layerLists[layer].append(node)
+	predecessors = [[] for i in layers]
+	successors = [[] for i in layers]
+	for src, dst in edges:
+		successors[src].append(dst)
+		predecessors[dst].append(src)
+
+	best = [list(i) for i in layerLists]
+	bestCrossings = countCrossings(best, edges)
+	for sweep in range(sweeps):
+		if not bestCrossings:
+			break
+		down = not sweep % 2
+		indices = range(1, nLayers) if down else range(nLayers - 2, -1, -1)
+		neighbourMap = predecessors if down else successors
+		for layerIndex in indices:
+			fixed = layerLists[layerIndex - 1 if down else layerIndex + 1]
+			fixedPos = {node : i for i, node in enumerate(fixed)}
+			layer = layerLists[layerIndex]
+			keys = {}
+			for i, node in enumerate(layer):
+				neighbours = neighbourMap[node]
+				if neighbours:
+					keys[node] = sum(fixedPos[j] for j in neighbours) / len(neighbours)
+				else: # no neighbours, hold place
+					keys[node] = i
+			layer.sort(key=keys.__getitem__)
+		crossings = countCrossings(layerLists, edges)
+		if crossings < bestCrossings:
+			bestCrossings = crossings
+			best = [list(i) for i in layerLists]
+	return best
+
+def _orderLayersArray(layers:list[int], edges:edgeListType, sweeps:int)->list[list[int]]:
+	"""same as orderLayers, each layer sorted with a few array operations"""
+	layerArr = np.asarray(layers, dtype=np.int64)
+	nLayers = int(layerArr.max()) + 1 if len(layerArr) else 0
+	edgeArr = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+	src, dst = edgeArr[:, 0], edgeArr[:, 1]
+
+	def groupBy(keys:np.ndarray)->tuple[np.ndarray, np.ndarray]:
+		"""return (indices sorted by key, start of each key in them)"""
+		order = np.argsort(keys, kind="stable")
+		return order, np.searchsorted(keys[order], np.arange(nLayers + 1))
+
+	nodeOrder, nodeBounds = groupBy(layerArr)
+	layerNodes = [nodeOrder[nodeBounds[i]:nodeBounds[i + 1]] for i in range(nLayers)]
+	pos = np.empty(len(layerArr), dtype=np.int64)
+	for nodes in layerNodes:
+		pos[nodes] = np.arange(len(nodes))
+	inOrder, inBounds = groupBy(layerArr[dst])
+	outOrder, outBounds = groupBy(layerArr[src])
+
+	best = [i.copy() for i in layerNodes]
+	bestCrossings = _countCrossingsArray(pos, layerArr, src, dst)
+	for sweep in range(sweeps):
+		if not bestCrossings:
+			break
+		down = not sweep % 2
+		indices = range(1, nLayers) if down else range(nLayers - 2, -1, -1)
+		for layerIndex in indices:
+			if down:
+				ids = inOrder[inBounds[layerIndex]:inBounds[layerIndex + 1]]
+				own, other = dst[ids], src[ids]
+			else:
+				ids = outOrder[outBounds[layerIndex]:outBounds[layerIndex + 1]]
+				own, other = src[ids], dst[ids]
+			nodes = layerNodes[layerIndex]
+			slots = pos[own]
+			sums = np.bincount(slots, weights=pos[other], minlength=len(nodes))
+			counts = np.bincount(slots, minlength=len(nodes))
+			# no neighbours, hold place
+			keys = np.where(counts > 0, sums / np.maximum(counts, 1), np.arange(len(nodes)))
+			nodes = nodes[np.argsort(keys, kind="stable")]
+			layerNodes[layerIndex] = nodes
+			pos[nodes] = np.arange(len(nodes))
+		crossings = _countCrossingsArray(pos, layerArr, src, dst)
+		if crossings < bestCrossings:
+			bestCrossings = crossings
+			best = [i.copy() for i in layerNodes]
+	return [i.tolist() for i in best]
+# endregion
+
+def layeredLayout(n:int, edges:edgeListType, sizes:T.Sequence[tuple[float, float]],
+                  layerSpacing:float=75.0, nodeSpacing:float=30.0,
+                  sweeps:int=8)->list[tuple[float, float]]:
+	"""return (x, y) top-left position for each node -
+	layers run left to right, edges always point right except those
+	reversed to break cycles
+	each layer is centred vertically on y = 0"""
+	if not n:
+		return []
+	acyclic = breakCycles(n, edges)
+	layers = assignLayers(n, acyclic)
+	allLayers, layerEdges = insertDummies(layers, acyclic)
+	layerLists = orderLayers(allLayers, layerEdges, sweeps=sweeps)
+
+	def size(node:int)->tuple[float, float]:
+		return sizes[node] if node < n else (0.0, 0.0)
+
+	positions = [(0.0, 0.0)] * n
+	x = 0.0
+	for layer in layerLists:
+		heights = [size(i)[1] for i in layer]
+		total = sum(heights) + nodeSpacing * (len(layer) - 1)
+		y = -total / 2
+		for node, height in zip(layer, heights):
+			if node < n:
+				positions[node] = (x, y)
+			y += height + nodeSpacing
+		x += max((size(i)[0] for i in layer), default=0.0) + layerSpacing
+	return positions
+
+
+# region force relaxation
+def _forceRelaxPython(positions, sizes, edges, iterations, springLength,
+                      step)->list[tuple[float, float]]:
+	"""same as forceRelax, one pair at a time"""
+	n = len(positions)
+	radii = [math.hypot(w, h) / 2 for w, h in sizes]
+	centres = [[x + w / 2, y + h / 2] for (x, y), (w, h) in zip(positions, sizes)]
+	cutoff = springLength * 3
+	for iteration in range(iterations):
+		temperature = step * (1.0 - iteration / iterations)
+		disp = [[0.0, 0.0] for i in range(n)]
+		for i in range(n):
+			for j in range(i + 1, n):
+				dx = centres[i][0] - centres[j][0]
+				dy = centres[i][1] - centres[j][1]
+				dist = math.hypot(dx, dy)
+				gap = max(dist - radii[i] - radii[j], 1.0)
+				if gap > cutoff:
+					continue
+				if dist < 1e-6: # push apart along x, lower index to the left
+					dx, dy, dist = -1.0, 0.0, 1.0
+				force = springLength * springLength / gap / dist
+				disp[i][0] += dx * force
+				disp[i][1] += dy * force
+				disp[j][0] -= dx * force
+				disp[j][1] -= dy * force
+		for src, dst in edges:
+			dx = centres[src][0] - centres[dst][0]
+			dy = centres[src][1] - centres[dst][1]
+			dist = max(math.hypot(dx, dy), 1e-6)
+			force = dist / springLength
+			disp[src][0] -= dx * force
+			disp[src][1] -= dy * force
+			disp[dst][0] += dx * force
+			disp[dst][1] += dy * force
+		for i in range(n):
+			length = math.hypot(*disp[i])
+			if length > temperature:
+				scale = temperature / length
+				disp[i][0] *= scale
+				disp[i][1] *= scale
+			centres[i][0] += disp[i][0]
+			centres[i][1] += disp[i][1]
+	return [(cx - w / 2, cy - h / 2) for (cx, cy), (w, h) in zip(centres, sizes)]
+
+# cells are hashed to one int key as x * stride + y
+_cellStride = 1 << 31
+
+def _nearPairs(cells:np.ndarray, start:int, end:int)->tuple[np.ndarray, np.ndarray]:
+	"""return (i, j) index arrays of every pair with i in range(start, end)
+	and j in the same or a following neighbour grid cell - each unordered
+	pair in neighbouring cells appears once across all blocks"""
+	n = len(cells)
+	keys = cells[:, 0] * _cellStride + cells[:, 1]
+	order = np.argsort(keys, kind="stable")
+	sortedKeys = keys[order]
+	rows = np.arange(start, end)
+	iParts, jParts = [], []
+	# own cell, then half of the ring around it
+	for dx, dy in ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1)):
+		target = keys[rows] + dx * _cellStride + dy
+		lo = np.searchsorted(sortedKeys, target, side="left")
+		counts = np.searchsorted(sortedKeys, target, side="right") - lo
+		total = int(counts.sum())
+		if not total:
+			continue
+		# flatten ranges lo:lo + count for every row
+		offsets = np.repeat(lo - np.cumsum(counts) + counts, counts) + np.arange(total)
+		i = np.repeat(rows, counts)
+		j = order[offsets]
+		if not dx and not dy:
+			keep = i < j
+			i, j = i[keep], j[keep]
+		iParts.append(i)
+		jParts.append(j)
+	if not iParts:
+		return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+	return np.concatenate(iParts), np.concatenate(jParts)
+
+def forceRelax(positions:T.Sequence[tuple[float, float]],
+               sizes:T.Sequence[tuple[float, float]],
+               edges:edgeListType,
+               iterations:int=50,
+               springLength:float=100.0,
+               step:float=20.0,
+               chunkSize:int=4096)->list[tuple[float, float]]:
+	"""force-directed refinement of top-left positions - nodes repel
+	by the gap between their bounding circles, edges pull like springs
+	each step is capped by a temperature that cools to zero
+
+	repulsion only acts within a cutoff, so nodes are binned in a grid
+	of that size and only pairs in neighbouring cells are compared -
+	pairs are built for chunkSize nodes at a time to bound memory"""
+	n = len(positions)
+	if not n or not iterations:
+		return list(positions)
+	if np is None:
+		return _forceRelaxPython(positions, sizes, edges, iterations,
+		                         springLength, step)
+
+	sizeArr = np.asarray(sizes, dtype=float).reshape(n, 2)
+	centres = np.asarray(positions, dtype=float).reshape(n, 2) + sizeArr / 2
+	radii = np.hypot(sizeArr[:, 0], sizeArr[:, 1]) / 2
+	edgeArr = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+	src, dst = edgeArr[:, 0], edgeArr[:, 1]
+	cutoff = springLength * 3
+	k2 = springLength * springLength
+	# centres further apart than this can't repel
+	reach = cutoff + 2 * radii.max()
+
+	for iteration in range(iterations):
+		temperature = step * (1.0 - iteration / iterations)
+		disp = np.zeros((n, 2))
+		cells = np.floor(centres / reach).astype(np.int64)
+		cells -= cells.min(axis=0) - 1
+		for start in range(0, n, chunkSize):
+			i, j = _nearPairs(cells, start, min(start + chunkSize, n))
+			delta = centres[i] - centres[j]
+			dist = np.hypot(delta[:, 0], delta[:, 1])
+			coincident = dist < 1e-6
+			if coincident.any(): # push apart along x, lower index to the left
+				tie = np.sign(i - j).astype(float)
+				delta[:, 0] = np.where(coincident, tie, delta[:, 0])
+				dist = np.where(coincident, 1.0, dist)
+			gap = np.maximum(dist - radii[i] - radii[j], 1.0)
+			force = np.where(gap > cutoff, 0.0, k2 / gap / np.maximum(dist, 1e-6))
+			push = delta * force[:, None]
+			for axis in (0, 1):
+				disp[:, axis] += np.bincount(i, weights=push[:, axis], minlength=n)
+				disp[:, axis] -= np.bincount(j, weights=push[:, axis], minlength=n)
+
+		if len(edgeArr):
+			delta = centres[src] - centres[dst]
+			dist = np.maximum(np.hypot(delta[:, 0], delta[:, 1]), 1e-6)
+			pull = delta * (dist / springLength)[:, None]
+			np.subtract.at(disp, src, pull)
+			np.add.at(disp, dst, pull)
+
+		length = np.hypot(disp[:, 0], disp[:, 1])
+		scale = np.where(length > temperature,
+		                 temperature / np.maximum(length, 1e-12), 1.0)
+		centres += disp * scale[:, None]
+	return [tuple(i) for i in (centres - sizeArr / 2).tolist()]
+# endregion
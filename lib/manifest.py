@@ -0,0 +1,289 @@
+from __future__ import annotations
+"""persisted record of classes found by a class catalogue -
+lets startup resolve node classes by name without importing every module
+
+entries are kept per source file, keyed by that file's mtime, size and hash -
+if a file's stat matches, it is trusted, if not, its hash is checked
+before marking it stale
+
+stale files are parsed statically to find candidate classes, so only
+changed modules that may define catalogue classes need importing
+
+only classes written as top-level class statements are found this way -
+classes made dynamically at module level (type() calls, factories,
+decorators returning new classes) are invisible to the scan, and must be
+added to a catalogue with registerClasses()
+saving is best-effort - an unwritable manifest only costs a rescan
+"""
+
+import os, ast, json, hashlib, pprint
+import typing as T
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
+
+# bump if entry layout changes - older manifests are then discarded
+MANIFEST_VERSION = 1
+
+def qualifiedClassName(cls:type)->str:
+	return f"{cls.__module__}.{cls.__qualname__}"
+
+def fileHash(filePath:str)->str:
+	with open(filePath, "rb") as f:
+		return hashlib.sha1(f.read()).hexdigest()
+
+def moduleFilesInPackagePath(packagePath, rootPackageName="chimaera")->list[tuple[str, str]]:
+	"""return (module name, file path) for every python module below
+	package path - found only by walking directories, nothing is imported
+	directories without an __init__.py are not packages and are skipped"""
+	rootPath = os.path.normpath(str(packagePath))
+	results = []
+	for dirPath, dirNames, fileNames in os.walk(rootPath):
+		if dirPath != rootPath and "__init__.py" not in fileNames:
+			dirNames[:] = []
+			continue
+		dirNames[:] = sorted(i for i in dirNames
+		                     if not i.startswith((".", "__pycache__")))
+		relParts = os.path.relpath(dirPath, rootPath).split(os.sep)
+		packageParts = [rootPackageName] + [i for i in relParts if i != "."]
+		for fileName in sorted(fileNames):
+			if not fileName.endswith(".py"):
+				continue
+			if fileName == "__init__.py":
+				if dirPath == rootPath: # root package is never scanned
+					continue
+				moduleName = ".".join(packageParts)
+			else:
+				moduleName = ".".join(packageParts + [fileName[:-3]])
+			results.append((moduleName, os.path.join(dirPath, fileName)))
+	return results
+
+
+@dataclass
+class ManifestClassEntry:
+	"""single class known to catalogue"""
+	name : str
+	module : str
+	bases : list[str] = field(default_factory=list) # qualified names of direct bases
+
+	@classmethod
+	def fromClass(cls, classObj:type)->ManifestClassEntry:
+		return cls(classObj.__name__, classObj.__module__,
+		           [qualifiedClassName(i) for i in classObj.__bases__])
+
+@dataclass
+class ManifestFileEntry:
+	"""all catalogue classes defined in a single source file"""
+	module : str
+	mtime : int
+	size : int
+	hash : str
+	classes : list[ManifestClassEntry] = field(default_factory=list)
+
+
+@dataclass
+class ScannedFile:
+	"""result of statically parsing one source file - classes here
+	are every top-level class, not yet filtered by base"""
+	module : str
+	path : str
+	mtime : int
+	size : int
+	hash : str
+	classes : list[ManifestClassEntry]
+
+
+def _importAliasMap(tree:ast.Module, moduleName:str, isPackage:bool)->dict[str, str]:
+	"""{ local name : qualified name } for top-level imports in module"""
+	packageParts = moduleName.split(".") if isPackage else moduleName.split(".")[:-1]
+	aliasMap = {}
+	for node in tree.body:
+		if isinstance(node, ast.Import):
+			for alias in node.names:
+				if alias.asname:
+					aliasMap[alias.asname] = alias.name
+				else:
+					rootName = alias.name.split(".")[0]
+					aliasMap[rootName] = rootName
+		elif isinstance(node, ast.ImportFrom):
+			if node.level:
+				baseParts = packageParts[:len(packageParts) - (node.level - 1)]
+				base = ".".join(baseParts + ([node.module] if node.module else []))
+			else:
+				base = node.module or ""
+			for alias in node.names:
+				aliasMap[alias.asname or alias.name] = base + "." + alias.name
+	return aliasMap
+
+def _baseName(expr:ast.expr, aliasMap:dict[str, str], moduleName:str)->(str, None):
+	"""qualified name for a base class expression, None if it isn't
+	a plain name or attribute chain"""
+	parts = []
+	while isinstance(expr, ast.Attribute):
+		parts.insert(0, expr.attr)
+		expr = expr.value
+	if not isinstance(expr, ast.Name):
+		return None
+	head = aliasMap.get(expr.id, moduleName + "." + expr.id)
+	return ".".join([head] + parts)
+
+def scanSourceFile(moduleName:str, filePath:str)->ScannedFile:
+	"""read and parse a single module without importing it"""
+	with open(filePath, "rb") as f:
+		source = f.read()
+	stat = os.stat(filePath)
+	classes = []
+	try:
+		tree = ast.parse(source, filename=filePath)
+	except SyntaxError:
+		tree = ast.Module(body=[], type_ignores=[])
+	aliasMap = _importAliasMap(tree, moduleName,
+	                           os.path.basename(filePath) == "__init__.py")
+	for node in tree.body:
+		if not isinstance(node, ast.ClassDef):
+			continue
+		bases = [_baseName(i, aliasMap, moduleName) for i in node.bases]
+		classes.append(ManifestClassEntry(node.name, moduleName,
+		                                  [i for i in bases if i]))
+	return ScannedFile(moduleName, filePath, stat.st_mtime_ns, stat.st_size,
+	                   hashlib.sha1(source).hexdigest(), classes)
+
+def scanSourceFiles(moduleFiles:T.Sequence[tuple[str, str]])->list[ScannedFile]:
+	"""parse many files at once - reads and parses run on a thread pool,
+	so file access overlaps; small batches are done inline"""
+	if len(moduleFiles) < 4:
+		return [scanSourceFile(*i) for i in moduleFiles]
+	with ThreadPoolExecutor(max_workers=min(16, len(moduleFiles))) as executor:
+		return list(executor.map(lambda i: scanSourceFile(*i), moduleFiles))
+
+def candidateClasses(scannedFiles:T.Sequence[ScannedFile],
+                     knownClassNames:set[str])->dict[str, list[ManifestClassEntry]]:
+	"""return { file path : [entries] } for parsed classes that may inherit
+	from any known class, or may be one of those classes themselves
+	bases are matched on their last name only, since classes are often
+	imported from a different module to the one defining them - extra
+	candidates are harmless, as they are validated on import"""
+	knownNames = set(knownClassNames)
+	result = {}
+	remaining = [(scanned.path, entry) for scanned in scannedFiles for entry in scanned.classes]
+	found = True
+	while found: # repeat until no new subclasses are found between files
+		found = False
+		unmatched = []
+		for path, entry in remaining:
+			if entry.name in knownClassNames or any(
+					i.rsplit(".", 1)[-1] in knownNames for i in entry.bases):
+				result.setdefault(path, []).append(entry)
+				knownNames.add(entry.name)
+				found = True
+			else:
+				unmatched.append((path, entry))
+		remaining = unmatched
+	return result
+
+
+class CatalogueManifest:
+	"""map of { file path : ManifestFileEntry }, loaded from and saved to json
+	if path is None, manifest is kept in memory only"""
+
+	def __init__(self, path:(str, None)=None):
+		self.path = str(path) if path is not None else None
+		self.files : dict[str, ManifestFileEntry] = {}
+		# True if entries changed since load or last save
+		self.modified = False
+
+	@classmethod
+	def load(cls, path)->CatalogueManifest:
+		"""load manifest from path - any missing, unreadable or outdated
+		file gives an empty manifest"""
+		manifest = cls(path)
+		try:
+			with open(manifest.path, "r") as f:
+				data = json.load(f)
+		except (OSError, ValueError, TypeError):
+			return manifest
+		if data.get("version") != MANIFEST_VERSION:
+			return manifest
+		for filePath, fileData in data.get("files", {}).items():
+			classes = [ManifestClassEntry(**i) for i in fileData.pop("classes", ())]
+			manifest.files[filePath] = ManifestFileEntry(classes=classes, **fileData)
+		return manifest
+
+	def save(self):
+		if self.path is None:
+			return
+		data = {"version" : MANIFEST_VERSION,
+		        "files" : {k : asdict(v) for k, v in self.files.items()}}
+		try:
+			os.makedirs(os.path.dirname(self.path), exist_ok=True)
+			with open(self.path, "w") as f:
+				json.dump(data, f, indent="\t")
+		except OSError as e:
+			print("could not save catalogue manifest to", self.path, e)
+			return
+		self.modified = False
+
+	def fileIsCurrent(self, filePath:str, moduleName:str=None)->bool:
+		"""check a single file against its entry -
+		if only mtime differs and content hash is unchanged, entry is updated
+		and still counts as current"""
+		entry = self.files.get(filePath)
+		if entry is None:
+			return False
+		if moduleName is not None and entry.module != moduleName:
+			return False
+		try:
+			stat = os.stat(filePath)
+		except OSError:
+			return False
+		if stat.st_mtime_ns == entry.mtime and stat.st_size == entry.size:
+			return True
+		if stat.st_size != entry.size or fileHash(filePath) != entry.hash:
+			return False
+		entry.mtime = stat.st_mtime_ns
+		self.modified = True
+		return True
+
+	def staleFiles(self, moduleFiles:T.Sequence[tuple[str, str]])->tuple[list[tuple[str, str]], list[str]]:
+		"""return ( [(module name, path) of new or changed files],
+		 [paths of entries with no file any more] )"""
+		changed = [(moduleName, filePath) for moduleName, filePath in moduleFiles
+		           if not self.fileIsCurrent(filePath, moduleName)]
+		currentPaths = {filePath for moduleName, filePath in moduleFiles}
+		removed = [i for i in self.files if i not in currentPaths]
+		return changed, removed
+
+	def setFileEntry(self, filePath:str, moduleName:str,
+	                 classEntries:T.Sequence[ManifestClassEntry]):
+		stat = os.stat(filePath)
+		self.modified = True
+		self.files[filePath] = ManifestFileEntry(
+			module=moduleName,
+			mtime=stat.st_mtime_ns,
+			size=stat.st_size,
+			hash=fileHash(filePath),
+			classes=list(classEntries))
+
+	def setScannedFileEntry(self, scanned:ScannedFile,
+	                        classEntries:T.Sequence[ManifestClassEntry]):
+		"""set entry from a parsed file, reusing its stat and hash"""
+		self.modified = True
+		self.files[scanned.path] = ManifestFileEntry(
+			module=scanned.module,
+			mtime=scanned.mtime,
+			size=scanned.size,
+			hash=scanned.hash,
+			classes=list(classEntries))
+
+	def removeFileEntry(self, filePath:str):
+		if self.files.pop(filePath, None) is not None:
+			self.modified = True
+
+	def classEntries(self)->list[ManifestClassEntry]:
+		return [i for fileEntry in self.files.values() for i in fileEntry.classes]
+
+	def nameEntryMap(self)->dict[str, ManifestClassEntry]:
+		return {i.name : i for i in self.classEntries()}
+
+	def displayStr(self):
+		return "{} : \n".format(self) + pprint.pformat(self.files)
+
@@ -23,14 +23,31 @@ this all has to follow on from the normal tree expressions - we need a unified s
 
 for easier syntax consider using fnmatch by default, and only using regex if necessary
 
+traversal operators are chained onto a seed pattern as method calls -
+each one draws lazily from the one before, so a limit or first at the end
+stops traversal as soon as enough nodes are found
+
+ls( "Apple.outputs(Flow)" ) -> nodes drawing Flow data from Apple
+ls( "Apple.inputs()" ) -> all direct inputs of Apple
+ls( "Cider.ancestors(2)" ) -> history of Cider, at most 2 edges deep
+ls( "Apple.descendants(Params)" ) -> full Params future of Apple
+ls( "Apple.children(B*)" ) -> tree children of Apple named B*
+ls( "*.descendants().first()" ) -> a single node, found without walking the graph
+
 """
 
-import fnmatch
+import fnmatch, re, itertools
+from collections import deque
+from functools import partial
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import typing as T
 
+from tree import Signal
+
+from chimaera.constant import DataUse
 from chimaera.core.node import ChimaeraNode
+from chimaera.lib.delta import GraphNodeDelta, GraphEdgeDelta
 if T.TYPE_CHECKING:
 	from chimaera.core.graph import ChimaeraGraph
 
@@ -39,24 +56,195 @@ class QueryLocals:
 	"""locals passed in to resolve query expression"""
 	pass
 
+@dataclass
+class QueryStage:
+	"""single operator applied to the stream of nodes from the previous stage"""
+	op : str
+	args : tuple = ()
+
 @dataclass
 class QueryAtom:
 	"""atomic part of logical query - can be either string
-	or operation?"""
+	or operation?
+	regex is the seed pattern matched against node names,
+	stages are run on the result in order"""
 	regex:str
+	stages : list[QueryStage] = field(default_factory=list)
+
+	def isLocal(self)->bool:
+		"""True if membership of a node depends only on that node"""
+		return not self.stages
+
+
+stageRegex = re.compile(r"\.(\w+)\(([^()]*)\)")
+
+def _splitArgText(argText:str)->list[str]:
+	return [i for i in (i.strip() for i in argText.split(",")) if i]
+
+def _parseTraversalArgs(args:list[str])->tuple:
+	"""depth as int, and / or DataUse name to follow"""
+	result = []
+	for arg in args:
+		if arg.isdigit():
+			result.append(int(arg))
+		elif arg in (i.name for i in DataUse):
+			result.append(DataUse[arg])
+		else:
+			raise SyntaxError(f"traversal argument {arg} is not a depth or DataUse")
+	return tuple(result)
+
+def _parsePatternArgs(args:list[str])->tuple:
+	"""name patterns stay strings, whatever they look like"""
+	return tuple(args)
+
+def _parseCountArgs(args:list[str])->tuple:
+	if not all(i.isdigit() for i in args):
+		raise SyntaxError(f"count arguments {args} must be ints")
+	return tuple(int(i) for i in args)
 
 def parseExpression(query:str)->T.List[QueryAtom]:
 	"""parse a query string into a logical expression
+	raises SyntaxError on unknown operators
 	"""
-	return [QueryAtom(query)]
-	pass
+	query = query.strip()
+	firstStage = stageRegex.search(query)
+	seed = query if firstStage is None else query[:firstStage.start()]
+	stageText = "" if firstStage is None else query[firstStage.start():]
+
+	# tree path segments become children stages
+	seedParts = seed.split("/")
+	stages = [QueryStage("children", (i,)) for i in seedParts[1:]]
+	seed = seedParts[0] or "*"
+
+	end = 0
+	for match in stageRegex.finditer(stageText):
+		if match.start() != end:
+			raise SyntaxError(f"could not parse query text {stageText[end:match.start()]} in {query}")
+		end = match.end()
+		op = match.group(1)
+		if op not in stageFnMap:
+			raise SyntaxError(f"unknown query operator {op} in {query}; valid are {sorted(stageFnMap)}")
+		stages.append(QueryStage(op, stageArgParserMap[op](_splitArgText(match.group(2)))))
+	if end != len(stageText):
+		raise SyntaxError(f"could not parse query text {stageText[end:]} in {query}")
+	return [QueryAtom(seed, stages)]
+
+
+# region traversal stages
+# each takes graph, incoming node iterator and stage args,
+# and returns a new iterator - nothing is evaluated until it is consumed
+
+def _splitTraversalArgs(args:tuple)->tuple[(int, None), (DataUse, None)]:
+	depth = next((i for i in args if isinstance(i, int)), None)
+	use = next((i for i in args if isinstance(i, DataUse)), None)
+	return depth, use
+
+def _edgeNeighbours(graph:ChimaeraGraph, node:ChimaeraNode,
+                    outputs:bool, use:DataUse=None)->T.Iterator[ChimaeraNode]:
+	"""direct neighbours of node - edge keys are destination uses,
+	so output edges are checked against their fromUse"""
+	if outputs:
+		for src, dst, key, data in graph.out_edges(node, keys=True, data=True):
+			if use is None or data.get("fromUse") == use:
+				yield dst
+	else:
+		for src, dst, key in graph.in_edges(node, keys=True):
+			if use is None or key == use:
+				yield src
+
+def _uniqueNeighbours(graph, nodes:T.Iterator[ChimaeraNode], outputs:bool, args:tuple):
+	depth, use = _splitTraversalArgs(args)
+	seen = set()
+	for node in nodes:
+		for neighbour in _edgeNeighbours(graph, node, outputs, use):
+			if neighbour in seen:
+				continue
+			seen.add(neighbour)
+			yield neighbour
+
+def _walk(graph, nodes:T.Iterator[ChimaeraNode], outputs:bool, args:tuple):
+	"""breadth-first walk from each incoming node, up to depth if given -
+	nodes are yielded as soon as they are reached"""
+	depth, use = _splitTraversalArgs(args)
+	seen = set()
+	for node in nodes:
+		frontier = deque([(node, 0)])
+		while frontier:
+			current, currentDepth = frontier.popleft()
+			if depth is not None and currentDepth >= depth:
+				continue
+			for neighbour in _edgeNeighbours(graph, current, outputs, use):
+				if neighbour in seen:
+					continue
+				seen.add(neighbour)
+				yield neighbour
+				frontier.append((neighbour, currentDepth + 1))
+
+def _children(graph, nodes:T.Iterator[ChimaeraNode], args:tuple):
+	pattern = args[0] if args else "*"
+	for node in nodes:
+		for child in _edgeNeighbours(graph, node, True, DataUse.Tree):
+			if fnmatch.fnmatch(child.name, pattern):
+				yield child
+
+def _nameFilter(graph, nodes:T.Iterator[ChimaeraNode], args:tuple):
+	pattern = args[0] if args else "*"
+	return (i for i in nodes if fnmatch.fnmatch(i.name, pattern))
+
+def _limit(graph, nodes:T.Iterator[ChimaeraNode], args:tuple):
+	return itertools.islice(nodes, args[0] if args else 1)
+
+stageFnMap : dict[str, T.Callable[[ChimaeraGraph, T.Iterator, tuple], T.Iterator]] = {
+	"inputs" : lambda graph, nodes, args: _uniqueNeighbours(graph, nodes, False, args),
+	"outputs" : lambda graph, nodes, args: _uniqueNeighbours(graph, nodes, True, args),
+	"ancestors" : lambda graph, nodes, args: _walk(graph, nodes, False, args),
+	"descendants" : lambda graph, nodes, args: _walk(graph, nodes, True, args),
+	"children" : _children,
+	"name" : _nameFilter,
+	"limit" : _limit,
+	"first" : lambda graph, nodes, args: itertools.islice(nodes, 1),
+}
+
+# arguments in query text are only converted as their stage expects -
+# name(Flow) still matches a node named "Flow"
+stageArgParserMap : dict[str, T.Callable[[list[str]], tuple]] = {
+	"inputs" : _parseTraversalArgs,
+	"outputs" : _parseTraversalArgs,
+	"ancestors" : _parseTraversalArgs,
+	"descendants" : _parseTraversalArgs,
+	"children" : _parsePatternArgs,
+	"name" : _parsePatternArgs,
+	"limit" : _parseCountArgs,
+	"first" : _parseCountArgs,
+}
+# endregion
+
+
+def _recorded(nodes:T.Iterator[ChimaeraNode], reached:set)->T.Iterator[ChimaeraNode]:
+	for node in nodes:
+		reached.add(node)
+		yield node
+
+def iterAtom(graph:ChimaeraGraph, atom:QueryAtom, reached:set=None)->T.Iterator[ChimaeraNode]:
+	"""build lazy generator pipeline for a single atom
+	if reached is given, every node passing between stages is added to it,
+	as it is consumed"""
+	nodes = (i for i in graph.nodes if fnmatch.fnmatch(i.name, atom.regex))
+	if reached is not None:
+		nodes = _recorded(nodes, reached)
+	for stage in atom.stages:
+		nodes = stageFnMap[stage.op](graph, nodes, stage.args)
+		if reached is not None:
+			nodes = _recorded(nodes, reached)
+	return nodes
 
 
 def listNodes(graph:ChimaeraGraph, query:str)->set[ChimaeraNode]:
 	"""query a graph for nodes matching a query string
 	query string is a logical expression of nodes
 	"""
-	return set(filter(map(lambda x: fnmatch.fnmatch(x, query), graph.nodeNames()), graph.nodeNames()))
+	return set(itertools.chain.from_iterable(
+		iterAtom(graph, i) for i in parseExpression(query)))
 
 def resolveQuery(graph:ChimaeraGraph, query:str):
 	"""query a graph for nodes matching a query string
@@ -66,6 +254,10 @@ def resolveQuery(graph:ChimaeraGraph, query:str):
 def queryTextIsValid(query:str)->bool:
 	"""check if a query string is valid
 	"""
+	try:
+		parseExpression(query)
+	except SyntaxError:
+		return False
 	return True
 
 
@@ -77,22 +269,255 @@ class GraphQuery:
 	naming is appropriate (for saving specific views), the query itself
 	will only be one part of the bookmarked display to shift to. Therefore
 	you would name the bookmark, and not the actual query.
+
+	a query may be bound to a single graph - it then listens to graph deltas
+	and node param changes, and keeps its result set up to date incrementally.
+	resultChanged emits GraphNodeDelta / GraphEdgeDelta objects holding only
+	elements that entered or left the result, never the full set
 	"""
 
 	def __init__(self, query:str, name:str=""):
 		self.queryText = query
+		self.atoms = parseExpression(query) if queryTextIsValid(query) else []
+
+		self._graph : ChimaeraGraph = None
+		self.resultNodes : set[ChimaeraNode] = set()
+		self.resultEdges : set[tuple] = set()
+		# result edges per node, so removing a node doesn't need the graph
+		self._nodeResultEdges : dict[ChimaeraNode, set[tuple]] = {}
+		# slots connected to each node's paramsChanged, kept to disconnect later
+		self._nodeParamSlots : dict[ChimaeraNode, T.Callable] = {}
+		# every node a traversal query passed through when last run -
+		# changes away from these can't alter its result
+		self._reachNodes : set[ChimaeraNode] = set()
+
+		self.resultChanged = Signal(name="resultChanged")
 
 	def isValid(self)->bool:
 		"""check if this query is valid
 		"""
-		return True
+		return queryTextIsValid(self.queryText)
+
+	def isLocal(self)->bool:
+		"""True if whether a node is shown depends only on that node -
+		if query traverses graph, any change may affect any node"""
+		return all(i.isLocal() for i in self.atoms)
+
+	def matchesNode(self, node:ChimaeraNode)->bool:
+		"""return True if single node passes the seed patterns of this query -
+		empty query shows everything
+		only meaningful for local queries"""
+		if not self.queryText.strip():
+			return True
+		return any(fnmatch.fnmatch(node.name, atom.regex) for atom in self.atoms)
+
+	def matchesEdge(self, edge:tuple, nodes:set[ChimaeraNode])->bool:
+		"""edges are shown if both their nodes are shown"""
+		return edge[0] in nodes and edge[1] in nodes
+
+	def iterNodes(self, graph:ChimaeraGraph)->T.Iterator[ChimaeraNode]:
+		"""lazily yield nodes shown by this query, without repeats -
+		stop consuming early to avoid traversing the rest of the graph"""
+		if not self.queryText.strip():
+			return iter(graph.nodes)
+		return self._iterUnique(graph)
+
+	def _iterUnique(self, graph:ChimaeraGraph, reached:set=None)->T.Iterator[ChimaeraNode]:
+		seen = set()
+		for atom in self.atoms:
+			for node in iterAtom(graph, atom, reached):
+				if node in seen:
+					continue
+				seen.add(node)
+				yield node
+
+	def first(self, graph:ChimaeraGraph)->(ChimaeraNode, None):
+		return next(self.iterNodes(graph), None)
 
 	def filterGraph(self, graph:ChimaeraGraph)->tuple[set[ChimaeraNode], set[tuple]]:
 		"""return all nodes valid in graph that this query shows,
 		and all edges valid between those nodes
+		if query is bound to this graph, return its maintained result
 		"""
-		pass
+		if graph is self._graph:
+			return set(self.resultNodes), set(self.resultEdges)
+		nodes = set(self.iterNodes(graph))
+		edges = {i for node in nodes for i in graph.out_edges(node, keys=True)
+		         if self.matchesEdge(i, nodes)}
+		return nodes, edges
+
+	# region live binding
+	def graph(self)->ChimaeraGraph:
+		return self._graph
+
+	def bind(self, graph:ChimaeraGraph):
+		"""evaluate query once over given graph, then track
+		its deltas to keep result current"""
+		if graph is self._graph:
+			return
+		self.unbind()
+		self._graph = graph
+		if graph is None:
+			return
+		graph.signalComponent.nodesChanged.connect(self.onGraphNodesChanged)
+		graph.signalComponent.edgesChanged.connect(self.onGraphEdgesChanged)
+		for node in graph.nodes:
+			self._watchNode(node)
+
+		self._addResultNodes(self._runQuery())
+
+	def unbind(self):
+		"""disconnect from current graph and clear result"""
+		if self._graph is None:
+			return
+		self._graph.signalComponent.nodesChanged.disconnect(self.onGraphNodesChanged)
+		self._graph.signalComponent.edgesChanged.disconnect(self.onGraphEdgesChanged)
+		for node in tuple(self._nodeParamSlots):
+			self._unwatchNode(node)
+		self._graph = None
+		self.resultNodes = set()
+		self.resultEdges = set()
+		self._nodeResultEdges = {}
+		self._reachNodes = set()
+
+	def _watchNode(self, node:ChimaeraNode):
+		if node in self._nodeParamSlots:
+			return
+		slot = partial(self.onNodeParamsChanged, node)
+		self._nodeParamSlots[node] = slot
+		node.paramsChanged.connect(slot)
+
+	def _unwatchNode(self, node:ChimaeraNode):
+		slot = self._nodeParamSlots.pop(node, None)
+		if slot is not None:
+			node.paramsChanged.disconnect(slot)
+
+	def _nodeEdges(self, node:ChimaeraNode)->T.Iterator[tuple]:
+		"""all graph edges touching node, as (src, dst, key) tuples"""
+		yield from self._graph.in_edges(node, keys=True)
+		yield from self._graph.out_edges(node, keys=True)
+
+	def _addResultEdges(self, edges:T.Iterable[tuple])->set[tuple]:
+		added = set()
+		for edge in edges:
+			if edge in self.resultEdges:
+				continue
+			self.resultEdges.add(edge)
+			self._nodeResultEdges.setdefault(edge[0], set()).add(edge)
+			self._nodeResultEdges.setdefault(edge[1], set()).add(edge)
+			added.add(edge)
+		return added
+
+	def _removeResultEdges(self, edges:T.Iterable[tuple])->set[tuple]:
+		removed = set()
+		for edge in edges:
+			if edge not in self.resultEdges:
+				continue
+			self.resultEdges.discard(edge)
+			self._nodeResultEdges.get(edge[0], set()).discard(edge)
+			self._nodeResultEdges.get(edge[1], set()).discard(edge)
+			removed.add(edge)
+		return removed
+
+	def _addResultNodes(self, nodes:set[ChimaeraNode])->tuple[set, set]:
+		"""add nodes to result, along with their edges to other result nodes"""
+		nodes = set(nodes) - self.resultNodes
+		self.resultNodes.update(nodes)
+		edges = set()
+		for node in nodes:
+			edges.update(i for i in self._nodeEdges(node)
+			             if self.matchesEdge(i, self.resultNodes))
+		return nodes, self._addResultEdges(edges)
+
+	def _removeResultNodes(self, nodes:set[ChimaeraNode])->tuple[set, set]:
+		"""remove nodes from result, along with any of their result edges"""
+		nodes = set(nodes).intersection(self.resultNodes)
+		self.resultNodes.difference_update(nodes)
+		edges = set()
+		for node in nodes:
+			edges.update(self._nodeResultEdges.pop(node, ()))
+		return nodes, self._removeResultEdges(edges)
+
+	def _emitResultDeltas(self, addedNodes=(), removedNodes=(),
+	                      addedEdges=(), removedEdges=()):
+		"""emit node delta first, so delegates for edges can find their nodes"""
+		if addedNodes or removedNodes:
+			self.resultChanged.emit(GraphNodeDelta(added=set(addedNodes),
+			                                       removed=set(removedNodes)))
+		if addedEdges or removedEdges:
+			self.resultChanged.emit(GraphEdgeDelta(added=set(addedEdges),
+			                                       removed=set(removedEdges)))
+
+	def _runQuery(self)->set[ChimaeraNode]:
+		"""run query over bound graph, noting nodes it passes through"""
+		if self.isLocal():
+			return set(self.iterNodes(self._graph))
+		reached = set()
+		nodes = set(self._iterUnique(self._graph, reached))
+		self._reachNodes = reached
+		return nodes
+
+	def _touchesReach(self, node:ChimaeraNode)->bool:
+		"""True if change to node could change traversal result -
+		it was passed through, is a seed, or neighbours a node passed through
+		(so a renamed child can pass a pattern it failed before)"""
+		if node in self._reachNodes or self.matchesNode(node):
+			return True
+		if node not in self._graph:
+			return False
+		return any(i in self._reachNodes for i in self._graph.pred[node]) or \
+			any(i in self._reachNodes for i in self._graph.succ[node])
+
+	def _refreshResult(self):
+		"""re-run whole query and emit only the difference -
+		used for traversal queries, when a delta touches nodes they reach"""
+		nodes = self._runQuery()
+		removedNodes, removedEdges = self._removeResultNodes(self.resultNodes - nodes)
+		addedNodes, addedEdges = self._addResultNodes(nodes - self.resultNodes)
+		self._emitResultDeltas(addedNodes, removedNodes, addedEdges, removedEdges)
 
+	def onGraphNodesChanged(self, delta:GraphNodeDelta):
+		"""only check nodes named in delta"""
+		for node in delta.removed:
+			self._unwatchNode(node)
+		for node in delta.added:
+			self._watchNode(node)
+		if not self.isLocal():
+			if any(i in self._reachNodes for i in delta.removed) or \
+					any(self.matchesNode(i) for i in delta.added):
+				self._refreshResult()
+			return
+		removedNodes, removedEdges = self._removeResultNodes(delta.removed)
+		addedNodes, addedEdges = self._addResultNodes(
+			{i for i in delta.added if self.matchesNode(i)})
+		self._emitResultDeltas(addedNodes, removedNodes, addedEdges, removedEdges)
 
+	def onGraphEdgesChanged(self, delta:GraphEdgeDelta):
+		removedEdges = self._removeResultEdges(delta.removed)
+		addedEdges = self._addResultEdges(
+			i for i in delta.added if self.matchesEdge(i, self.resultNodes))
+		self._emitResultDeltas(addedEdges=addedEdges, removedEdges=removedEdges)
+		if not self.isLocal() and any(
+				i[0] in self._reachNodes or i[1] in self._reachNodes
+				for i in itertools.chain(delta.added, delta.removed)):
+			self._refreshResult()
 
+	def onNodeParamsChanged(self, node:ChimaeraNode, *args, **kwargs):
+		"""params of a single node changed - check only that node"""
+		if node not in self._graph:
+			return
+		if not self.isLocal():
+			if self._touchesReach(node):
+				self._refreshResult()
+			return
+		matches = self.matchesNode(node)
+		if matches == (node in self.resultNodes):
+			return
+		if matches:
+			addedNodes, addedEdges = self._addResultNodes({node})
+			self._emitResultDeltas(addedNodes=addedNodes, addedEdges=addedEdges)
+		else:
+			removedNodes, removedEdges = self._removeResultNodes({node})
+			self._emitResultDeltas(removedNodes=removedNodes, removedEdges=removedEdges)
+	# endregion
 
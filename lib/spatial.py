@@ -0,0 +1,98 @@
+from __future__ import annotations
+"""simple spatial index for 2d points -
+used by ui to find items near the cursor without scanning every item"""
+
+import math
+import typing as T
+
+
+class SpatialGrid:
+	"""uniform grid of buckets over 2d points
+	items are hashed by the cell containing their position, so a query
+	only looks at cells overlapping its search area
+	cell size should be around the usual query radius"""
+
+	def __init__(self, cellSize:float=100.0):
+		self.cellSize = float(cellSize)
+		self.cells : dict[tuple[int, int], set] = {}
+		self.itemPositions : dict[T.Hashable, tuple[float, float]] = {}
+
+	def _cell(self, x:float, y:float)->tuple[int, int]:
+		return (math.floor(x / self.cellSize), math.floor(y / self.cellSize))
+
+	def insert(self, item:T.Hashable, x:float, y:float):
+		"""add item at position, or move it there if already present"""
+		if item in self.itemPositions:
+			oldCell = self._cell(*self.itemPositions[item])
+			newCell = self._cell(x, y)
+			self.itemPositions[item] = (x, y)
+			if oldCell == newCell:
+				return
+			self._removeFromCell(item, oldCell)
+			self.cells.setdefault(newCell, set()).add(item)
+			return
+		self.itemPositions[item] = (x, y)
+		self.cells.setdefault(self._cell(x, y), set()).add(item)
+
+	move = insert
+
+	def _removeFromCell(self, item, cell):
+		bucket = self.cells[cell]
+		bucket.discard(item)
+		if not bucket:
+			del self.cells[cell]
+
+	def remove(self, item:T.Hashable):
+		"""remove item - no error if not present"""
+		pos = self.itemPositions.pop(item, None)
+		if pos is None:
+			return
+		self._removeFromCell(item, self._cell(*pos))
+
+	def clear(self):
+		self.cells.clear()
+		self.itemPositions.clear()
+
+	def position(self, item:T.Hashable)->tuple[float, float]:
+		return self.itemPositions[item]
+
+	def __contains__(self, item):
+		return item in self.itemPositions
+
+	def __len__(self):
+		return len(self.itemPositions)
+
+	def __iter__(self):
+		return iter(self.itemPositions)
+
+	def itemsInRect(self, left:float, top:float, right:float, bottom:float)->list:
+		"""return all items with positions inside rect, edges included"""
+		minCell = self._cell(left, top)
+		maxCell = self._cell(right, bottom)
+		result = []
+		for cx in range(minCell[0], maxCell[0] + 1):
+			for cy in range(minCell[1], maxCell[1] + 1):
+				for item in self.cells.get((cx, cy), ()):
+					x, y = self.itemPositions[item]
+					if left <= x <= right and top <= y <= bottom:
+						result.append(item)
+		return result
+
+	def itemsNear(self, x:float, y:float, radius:float)->list:
+		"""return items within radius of point, nearest first"""
+		found = []
+		for item in self.itemsInRect(x - radius, y - radius, x + radius, y + radius):
+			ix, iy = self.itemPositions[item]
+			distance = math.hypot(ix - x, iy - y)
+			if distance <= radius:
+				found.append((distance, item))
+		found.sort(key=lambda i: i[0])
+		return [i[1] for i in found]
+
+	def nearest(self, x:float, y:float, radius:float,
+	            predicate:T.Callable[[T.Any], bool]=None):
+		"""return nearest item within radius passing predicate, or None"""
+		for item in self.itemsNear(x, y, radius):
+			if predicate is None or predicate(item):
+				return item
+		return None
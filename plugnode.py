@@ -3,8 +3,15 @@ from __future__ import annotations
 """more complex node defining multiple input and output plugs - 
 all elements of this node are represented as tree nodes"""
 
+import typing as T
+
+try:
+	import numpy as np
+except ImportError:
+	np = None
+
 from chimaera.constant import INPUT_NAME, OUTPUT_NAME
-from chimaera import ChimaeraNode, ChimaeraGraph, GraphTree, GraphData
+from chimaera import ChimaeraNode, ChimaeraGraph, GraphTree, GraphData, DataUse
 from chimaera.plugtree import PlugTree
 
 class PlugNode( GraphTree):
@@ -12,6 +19,12 @@ class PlugNode( GraphTree):
 	inPlug = GraphTree.TreeBranchDescriptor(INPUT_NAME, create=False, useValue=False)
 	outPlug = GraphTree.TreeBranchDescriptor(OUTPUT_NAME, create=False, useValue=False)
 
+	# { output plug name : names of input plugs affecting it }
+	# outputs not listed here are affected by every input
+	# only top-level plugs under inPlug / outPlug are declared,
+	# sub-plugs take the declarations of their top plug
+	plugAffects : dict[str, T.Sequence[str]] = {}
+
 	def __init__(self, name:str, value=None, treeUid=None, graph=None, nodeParams=None):
 		super(PlugNode, self).__init__(name,
 		                               value=value,
@@ -43,6 +56,109 @@ class PlugNode( GraphTree):
 		pass
 
 
+	# region plug dependencies
+	def topPlug(self, plug:PlugTree)->PlugTree:
+		"""return direct child of inPlug or outPlug holding given plug"""
+		while plug.parent is not None and plug.parent is not self \
+				and plug.parent.parent is not self:
+			plug = plug.parent
+		return plug
+
+	def affectedOutputs(self, inputPlug:PlugTree)->list[PlugTree]:
+		"""return output plugs whose value depends on given input plug"""
+		inputName = self.topPlug(inputPlug).name
+		result = []
+		for outputPlug in self.outPlug.branches:
+			inputNames = self.plugAffects.get(outputPlug.name)
+			if inputNames is None or inputName in inputNames:
+				result.append(outputPlug)
+		return result
+
+	def affectingInputs(self, outputPlug:PlugTree)->list[PlugTree]:
+		"""return input plugs that given output plug depends on"""
+		inputNames = self.plugAffects.get(self.topPlug(outputPlug).name)
+		if inputNames is None:
+			return list(self.inPlug.branches)
+		inputMap = self.inPlug.branchMap
+		return [inputMap[i] for i in inputNames if i in inputMap]
+
+	def computePlug(self, outputPlug:PlugTree):
+		"""set value of a single output plug from current input plug values -
+		override in subclasses, only called when the output plug is dirty"""
+		pass
+	# endregion
+
+	# region batch execution
+	# set True on classes overriding executeBatch() - dirty nodes of that
+	# class in the same generation are then evaluated in one call
+	supportsBatchExecute = False
+
+	@classmethod
+	def executeBatch(cls, nodes:list[PlugNode],
+	                 inputColumns:dict[str, T.Sequence])->dict[str, T.Sequence]:
+		"""vectorised compute for many nodes of this class at once -
+		input columns are { input plug name : value per node },
+		return { output plug name : value per node }
+		numeric plug columns are numpy arrays if numpy is available
+
+		base version just sets each node's inputs from columns and runs
+		computePlug() on each of its outputs - override to vectorise"""
+		outputColumns = {}
+		for i, node in enumerate(nodes):
+			inputMap = node.inPlug.branchMap
+			for name, column in inputColumns.items():
+				value = column[i]
+				if np is not None and isinstance(value, np.generic):
+					value = value.item()
+				inputMap[name].value = value
+			for outputPlug in node.outPlug.branches:
+				node.computePlug(outputPlug)
+				outputColumns.setdefault(outputPlug.name, []).append(outputPlug.value)
+		return outputColumns
+
+	def inputPlugValue(self, inputPlug:PlugTree):
+		"""value of connected source plug if any, else plug's own value -
+		compact plug elements take values of their element sources"""
+		for sourcePlug in self.graph().sourceNodesForUse(inputPlug, DataUse.Flow):
+			return sourcePlug.value
+		inputPlug.pullElementSources()
+		return inputPlug.value
+
+	@classmethod
+	def gatherInputColumns(cls, nodes:list[PlugNode])->dict[str, T.Sequence]:
+		"""one column per top-level input plug, in order of nodes"""
+		columns = {}
+		for inputPlug in nodes[0].inPlug.branches:
+			name = inputPlug.name
+			values = [node.inputPlugValue(node.inPlug.branchMap[name]) for node in nodes]
+			columns[name] = cls.inputColumn(inputPlug, values)
+		return columns
+
+	@classmethod
+	def inputColumn(cls, inputPlug:PlugTree, values:list)->T.Sequence:
+		"""numpy array of values if all are numeric - plugs with a data type
+		set are coerced to it, others keep the type numpy infers
+		anything else, or everything without numpy, is left as a list"""
+		if np is None:
+			return values
+		dtype = None
+		if inputPlug.hasExplicitDataType() and inputPlug.dataType.isNumeric:
+			dtype = inputPlug.dataType.dtype
+		try:
+			column = np.asarray(values, dtype=dtype)
+		except (ValueError, TypeError):
+			return values
+		if column.dtype.kind not in "biuf":
+			return values
+		return column
+
+	@classmethod
+	def applyOutputColumns(cls, nodes:list[PlugNode], outputColumns:dict[str, T.Sequence]):
+		for name, column in outputColumns.items():
+			for node, value in zip(nodes, column):
+				node.outPlug.branchMap[name].value = value
+	# endregion
+
 	def containedPlugEdges(self)->list[tuple]:
 		"""return all edges contained between this node and its plugs"""
 		nBunch = self.inPlug.allBranches() + self.outPlug.allBranches() + [self]
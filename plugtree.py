@@ -9,12 +9,25 @@ for further copies
 having each of these plugs be a separate node is a bit overkill, since we're
 PROBABLY not going to reference or instance the attributes of a node,
 but it lets the plugs play nice with graph addressing, lookups, mutators etc 
+
+for big arrays (joint lists, weights) that is far too many nodes -
+compact array plugs keep all elements in a single buffer as the plug's
+value, with element connections held as a map of element index to source
+plug. single elements can be expanded to real plug nodes when needed
 """
 
+import array
 import typing as T
 from chimaera import GraphTree, DataUse, NodeDataKeys, ChimaeraNode
+if T.TYPE_CHECKING:
+	from chimaera.plugnode import PlugNode
 from chimaera.constant import DataType, INPUT_NAME, OUTPUT_NAME
 
+try:
+	import numpy as np
+except ImportError:
+	np = None
+
 
 class PlugTree(GraphTree):
 
@@ -26,21 +39,179 @@ class PlugTree(GraphTree):
 	                                         inherited=False, breakTags=("main", ),
 	                                         desc="Is this plug an array?")
 
-	dataType : DataType = GraphTree.TreePropertyDescriptor("dataType", default=DataType.Int,
+	dataTypeKey = "dataType"
+
+	dataType : DataType = GraphTree.TreePropertyDescriptor(dataTypeKey, default=DataType.Int,
 	                                            inherited=False, breakTags=("main", ),
 	                                            desc="Data type of this plug")
 
+	plugCompactKey = "_plugCompact"
+
+	compact : bool = GraphTree.TreePropertyDescriptor(plugCompactKey, default=False,
+	                                           inherited=False, breakTags=("main", ),
+	                                           desc="Are array elements held in a single buffer?")
+
+	# param key for { element index : (source plug uid, source element index) }
+	elementSourcesKey = "elementSources"
+
 	def isInput(self)->bool:
 		"""if this is an input plug"""
-		return INPUT_NAME in self.address(includeSelf=True)
+		return INPUT_NAME in self.cachedAddress()
 	def isOutput(self)->bool:
 		"""if this is an output plug"""
-		return OUTPUT_NAME in self.address(includeSelf=True)
+		return OUTPUT_NAME in self.cachedAddress()
 	def isInvalid(self)->bool:
 		"""if this is an invalid plug"""
 		return not (self.isInput() or self.isOutput())
 
-	pass
+	def hasExplicitDataType(self)->bool:
+		"""True if dataType was set on this plug, rather than left at default"""
+		return self.dataTypeKey in (self.properties or {})
+
+	def plugNode(self)->(PlugNode, None):
+		"""return plug node owning this plug, if any"""
+		from chimaera.plugnode import PlugNode
+		branch = self.parent
+		while branch is not None and not isinstance(branch, PlugNode):
+			branch = branch.parent
+		return branch
+
+	def _setValue(self, value):
+		"""setting a plug value dirties only plugs it affects
+		an expanded element of a compact array writes through to
+		its parent's buffer"""
+		super(PlugTree, self)._setValue(value)
+		parent = self.parent
+		if isinstance(parent, PlugTree) and parent.compact and self.name.isdigit():
+			parent.value[int(self.name)] = value
+		self.graph().execComponent.onPlugValueChanged(self)
+
+	# region compact arrays
+	def newElementBuffer(self, values:T.Iterable=())->(list, array.array, "np.ndarray"):
+		"""return contiguous buffer for this plug's data type -
+		numpy array if available, array.array without it, list for
+		non-numeric types"""
+		dataType = self.dataType
+		if not dataType.isNumeric:
+			return list(values)
+		if np is not None:
+			return np.array(list(values), dtype=dataType.dtype)
+		return array.array(dataType.typeCode, values)
+
+	def setCompactArray(self, values:T.Iterable):
+		"""make this a compact array plug holding given element values -
+		any existing element nodes are removed from graph"""
+		graph = self.graph()
+		for branch in list(self.branches):
+			elementNodes = branch.allBranches(includeSelf=True)
+			branch.remove()
+			for node in elementNodes:
+				graph.removeNode(node)
+		self.array = True
+		self.compact = True
+		self._setValue(self.newElementBuffer(values))
+		self.setParam(self.elementSourcesKey, {})
+
+	def elementBuffer(self)->(list, array.array, "np.ndarray"):
+		return self.value
+
+	def elementCount(self)->int:
+		if self.compact:
+			return len(self.value)
+		return len(self.branches)
+
+	def elementValue(self, index:int):
+		if self.compact:
+			return self.value[index]
+		return self.branches[index].value
+
+	def setElementValue(self, index:int, value):
+		if not self.compact:
+			self.branches[index].value = value
+			return
+		# any expanded node writes its value back to buffer
+		expanded = self.expandedElement(index)
+		if expanded is not None:
+			expanded.value = value
+			return
+		self.value[index] = value
+		self.graph().execComponent.onPlugValueChanged(self)
+
+	def elementSources(self)->dict[int, tuple[str, (int, None)]]:
+		"""live map of { element index : (source plug uid, source element index) }"""
+		return self.getParam(self.elementSourcesKey, default={}, errorNotFound=False)
+
+	def elementSourcePlugs(self)->dict[int, tuple[PlugTree, (int, None)]]:
+		"""{ element index : (source plug, source element index) } -
+		sources no longer in graph are skipped"""
+		result = {}
+		graph = self.graph()
+		for index, (sourceUid, sourceIndex) in self.elementSources().items():
+			sourcePlug = graph.node(sourceUid)
+			if sourcePlug is not None:
+				result[int(index)] = (sourcePlug, sourceIndex)
+		return result
+
+	def pullElementSources(self):
+		"""copy current value of each element source into this plug's
+		elements - sources are not evaluated here"""
+		for index, (sourcePlug, sourceIndex) in self.elementSourcePlugs().items():
+			if sourceIndex is None:
+				value = sourcePlug.value
+			else:
+				value = sourcePlug.elementValue(sourceIndex)
+			self.setElementValue(index, value)
+
+	def connectElement(self, index:int, sourcePlug:PlugTree, sourceIndex:int=None):
+		"""connect source plug (or one of its elements) to an element of
+		this compact plug - no graph edge is made unless element is expanded"""
+		expanded = self.expandedElement(index)
+		if expanded is not None:
+			self.graph().connectNodes(sourcePlug, expanded,
+			                          fromUse=DataUse.Flow, toUse=DataUse.Flow,
+			                          index=sourceIndex)
+		sources = self.elementSources()
+		sources[index] = (sourcePlug.uid, sourceIndex)
+		self.setParam(self.elementSourcesKey, sources)
+
+	def disconnectElement(self, index:int):
+		sources = self.elementSources()
+		if sources.pop(index, None) is not None:
+			self.setParam(self.elementSourcesKey, sources)
+
+	def expandedElement(self, index:int)->(PlugTree, None):
+		"""return node for element if it has been expanded"""
+		return self.branchMap.get(str(index))
+
+	def expandElement(self, index:int)->PlugTree:
+		"""return a real plug node for a single element of compact plug,
+		creating it if needed - its value is copied from buffer, and any
+		element source is connected as a graph edge"""
+		expanded = self.expandedElement(index)
+		if expanded is not None:
+			return expanded
+		expanded = type(self)(str(index), value=self.value[index], graph=self.graph())
+		expanded.dataType = self.dataType
+		self.addChild(expanded)
+
+		source = self.elementSources().get(index)
+		if source is not None:
+			sourcePlug = self.graph().node(source[0])
+			if sourcePlug is not None:
+				self.graph().connectNodes(sourcePlug, expanded,
+				                          fromUse=DataUse.Flow, toUse=DataUse.Flow,
+				                          index=source[1])
+		return expanded
+
+	def collapseElement(self, index:int):
+		"""write expanded element's value back to buffer and remove its node"""
+		expanded = self.expandedElement(index)
+		if expanded is None:
+			return
+		self.value[index] = expanded.value
+		expanded.remove()
+		self.graph().removeNode(expanded)
+	# endregion
 
 
 
@@ -0,0 +1,103 @@
+
+from __future__ import annotations
+"""startup time benchmark for node class catalogue
+run directly, not collected as a test case
+
+each sample imports chimaera in a fresh interpreter - cold samples
+delete the catalogue manifest first, warm samples reuse it
+
+plugin samples gather a generated package of many node modules,
+with no manifest, a current manifest, and one changed module
+"""
+import os, sys, subprocess, time, statistics, tempfile, shutil
+
+PACKAGE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MANIFEST_PATH = os.path.join(PACKAGE_PATH, "__pycache__", "catalogue.json")
+
+# prints number of loaded chimaera modules after import
+importScript = "import sys, chimaera; print(len([i for i in sys.modules if i.startswith('chimaera')]))"
+
+def timeImport()->tuple[float, int]:
+	"""return (seconds, chimaera modules loaded) for one fresh import"""
+	env = dict(os.environ)
+	env["PYTHONPATH"] = os.pathsep.join(
+		filter(None, [os.path.dirname(PACKAGE_PATH), env.get("PYTHONPATH")]))
+	start = time.perf_counter()
+	result = subprocess.run([sys.executable, "-c", importScript],
+	                        env=env, capture_output=True, text=True, check=True)
+	elapsed = time.perf_counter() - start
+	return elapsed, int(result.stdout.strip().splitlines()[-1])
+
+def bench(cold:bool, repeats:int)->tuple[list[float], int]:
+	times = []
+	nModules = 0
+	for i in range(repeats):
+		if cold and os.path.exists(MANIFEST_PATH):
+			os.remove(MANIFEST_PATH)
+		elapsed, nModules = timeImport()
+		times.append(elapsed)
+	return times, nModules
+
+def report(label:str, times:list[float], nModules:int):
+	print(f"{label:<16} median {statistics.median(times) * 1000:8.1f}ms  "
+	      f"min {min(times) * 1000:8.1f}ms  modules loaded {nModules}")
+
+pluginPackageName = "catalogueBenchPkg"
+pluginModuleText = """
+from chimaera import ChimaeraNode
+class PluginNode{index}(ChimaeraNode):
+	pass
+"""
+
+def benchPlugins(nModules:int, repeats:int):
+	"""time gathering classes from a generated plugin package"""
+	from chimaera import ChimaeraNode
+	from chimaera.lib.catalogue import ClassCatalogue
+
+	tempDir = tempfile.mkdtemp()
+	packageDir = os.path.join(tempDir, pluginPackageName)
+	os.makedirs(packageDir)
+	open(os.path.join(packageDir, "__init__.py"), "w").close()
+	for i in range(nModules):
+		with open(os.path.join(packageDir, f"node{i}.py"), "w") as f:
+			f.write(pluginModuleText.format(index=i))
+	manifestPath = os.path.join(tempDir, "manifest.json")
+	sys.path.insert(0, tempDir)
+
+	def sample()->float:
+		for name in [i for i in sys.modules if i.startswith(pluginPackageName)]:
+			del sys.modules[name]
+		catalogue = ClassCatalogue([packageDir], baseClasses={ChimaeraNode},
+		                           parentPackageNames=[pluginPackageName],
+		                           manifestPath=manifestPath)
+		start = time.perf_counter()
+		catalogue.gatherClasses()
+		return time.perf_counter() - start
+
+	try:
+		times = []
+		for i in range(repeats):
+			if os.path.exists(manifestPath):
+				os.remove(manifestPath)
+			times.append(sample())
+		report("plugin cold", times, nModules)
+		report("plugin warm", [sample() for i in range(repeats)], nModules)
+		times = []
+		for i in range(repeats):
+			with open(os.path.join(packageDir, "node0.py"), "a") as f:
+				f.write("#\n")
+			times.append(sample())
+		report("plugin 1 changed", times, nModules)
+	finally:
+		sys.path.remove(tempDir)
+		shutil.rmtree(tempDir)
+
+
+if __name__ == '__main__':
+	repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+	report("cold", *bench(cold=True, repeats=repeats))
+	# first warm run is made by last cold run
+	report("warm", *bench(cold=False, repeats=repeats))
+	sys.path.insert(0, os.path.dirname(PACKAGE_PATH))
+	benchPlugins(nModules=300, repeats=repeats)
+
@@ -0,0 +1,208 @@
+
+from __future__ import annotations
+"""test cases for node class catalogue and its manifest"""
+import unittest, tempfile, os, sys, shutil
+
+from chimaera import ChimaeraNode, ChimaeraGraph
+from chimaera.lib.catalogue import ClassCatalogue
+from chimaera.lib.manifest import CatalogueManifest, moduleFilesInPackagePath, \
+	ManifestClassEntry, ScannedFile, candidateClasses
+
+nodeModuleText = """
+from chimaera import ChimaeraNode, ChimaeraGraph
+class {name}(ChimaeraNode):
+	pass
+"""
+
+class TestCatalogueManifest(unittest.TestCase):
+	""" test classes are resolved from manifest without importing modules """
+
+	packageName = "catalogueTestPkg"
+
+	def setUp(self) -> None:
+		self.tempDir = tempfile.mkdtemp()
+		self.packageDir = os.path.join(self.tempDir, self.packageName)
+		os.makedirs(self.packageDir)
+		with open(os.path.join(self.packageDir, "__init__.py"), "w") as f:
+			f.write("")
+		self.writeNodeModule("nodeA", "TestNodeA")
+		self.manifestPath = os.path.join(self.tempDir, "manifest.json")
+		sys.path.insert(0, self.tempDir)
+
+	def tearDown(self) -> None:
+		sys.path.remove(self.tempDir)
+		self.clearModules()
+		shutil.rmtree(self.tempDir)
+
+	def writeNodeModule(self, moduleName:str, className:str):
+		with open(os.path.join(self.packageDir, moduleName + ".py"), "w") as f:
+			f.write(nodeModuleText.format(name=className))
+
+	def clearModules(self):
+		for i in [i for i in sys.modules if i.startswith(self.packageName)]:
+			del sys.modules[i]
+
+	def makeCatalogue(self)->ClassCatalogue:
+		return ClassCatalogue([self.packageDir], baseClasses={ChimaeraNode},
+		                      parentPackageNames=[self.packageName],
+		                      manifestPath=self.manifestPath)
+
+	def test_moduleFiles(self):
+		moduleFiles = dict(moduleFilesInPackagePath(self.packageDir, self.packageName))
+		self.assertIn(self.packageName + ".nodeA", moduleFiles)
+		self.assertNotIn(self.packageName, moduleFiles)
+
+	def test_manifestWritten(self):
+		catalogue = self.makeCatalogue()
+		catalogue.gatherClasses()
+		manifest = CatalogueManifest.load(self.manifestPath)
+		self.assertIn("TestNodeA", manifest.nameEntryMap())
+		self.assertEqual(manifest.nameEntryMap()["TestNodeA"].module,
+		                 self.packageName + ".nodeA")
+
+	def test_lazyImport(self):
+		self.makeCatalogue().gatherClasses()
+		self.clearModules()
+
+		catalogue = self.makeCatalogue()
+		catalogue.gatherClasses()
+		self.assertNotIn(self.packageName + ".nodeA", sys.modules)
+		self.assertIn("TestNodeA", catalogue.nameClassMap())
+		self.assertNotIn(self.packageName + ".nodeA", sys.modules)
+
+		nodeCls = catalogue.nameClassMap()["TestNodeA"]
+		self.assertIn(self.packageName + ".nodeA", sys.modules)
+		self.assertTrue(issubclass(nodeCls, ChimaeraNode))
+		self.assertIn(nodeCls, catalogue.classes)
+
+	def test_lazyImportKeepsMap(self):
+		""" importing a manifest class on lookup doesn't rebuild lookup maps """
+		self.makeCatalogue().gatherClasses()
+		self.clearModules()
+
+		catalogue = self.makeCatalogue()
+		catalogue.gatherClasses()
+		nameMap = catalogue.nameClassMap()
+		nodeCls = nameMap["TestNodeA"]
+		self.assertIs(catalogue.nameClassMap(), nameMap)
+		self.assertIs(catalogue.classForName("TestNodeA"), nodeCls)
+
+	def test_warmClassSet(self):
+		""" full class set and registered classes match with or without manifest """
+		catalogue = self.makeCatalogue()
+		catalogue.gatherClasses()
+		coldNames = {i.__name__ for i in catalogue.classes}
+		self.clearModules()
+
+		catalogue = self.makeCatalogue()
+		registered = []
+		catalogue.classesChanged.connect(lambda event: registered.extend(event.newClasses))
+		catalogue.gatherClasses()
+		self.assertEqual({i.__name__ for i in catalogue.classes}, coldNames)
+		self.assertEqual({i.__name__ for i in registered}, coldNames)
+
+	def test_touchedFileSaved(self):
+		""" file touched without changes is re-hashed once, then trusted """
+		self.makeCatalogue().gatherClasses()
+		filePath = os.path.join(self.packageDir, "nodeA.py")
+		stat = os.stat(filePath)
+		os.utime(filePath, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+		self.makeCatalogue().gatherClasses()
+		manifest = CatalogueManifest.load(self.manifestPath)
+		self.assertEqual(manifest.files[filePath].mtime, stat.st_mtime_ns + 10**9)
+
+	def test_staleFile(self):
+		catalogue = self.makeCatalogue()
+		catalogue.gatherClasses()
+		self.writeNodeModule("nodeB", "TestNodeB")
+		manifest = CatalogueManifest.load(self.manifestPath)
+		changed, removed = manifest.staleFiles(catalogue.scanModuleFiles())
+		self.assertEqual([i[0] for i in changed], [self.packageName + ".nodeB"])
+
+		self.clearModules()
+		catalogue = self.makeCatalogue()
+		catalogue.gatherClasses()
+		self.assertIn("TestNodeB", catalogue.nameClassMap())
+
+	def test_incrementalImport(self):
+		""" only changed modules defining node classes are imported """
+		self.makeCatalogue().gatherClasses()
+		self.clearModules()
+		self.writeNodeModule("nodeB", "TestNodeB")
+		with open(os.path.join(self.packageDir, "util.py"), "w") as f:
+			f.write("class Helper(object):\n\tpass\n")
+
+		catalogue = self.makeCatalogue()
+		catalogue.gatherClasses()
+		self.assertIn(self.packageName + ".nodeB", sys.modules)
+		self.assertNotIn(self.packageName + ".nodeA", sys.modules)
+		self.assertNotIn(self.packageName + ".util", sys.modules)
+		self.assertIn("TestNodeA", catalogue.nameClassMap())
+		self.assertNotIn("Helper", catalogue.nameClassMap())
+
+	def test_removedFile(self):
+		self.makeCatalogue().gatherClasses()
+		os.remove(os.path.join(self.packageDir, "nodeA.py"))
+		catalogue = self.makeCatalogue()
+		catalogue.gatherClasses()
+		self.assertNotIn("TestNodeA", catalogue.nameClassMap())
+
+	def test_classForName(self):
+		catalogue = self.makeCatalogue()
+		catalogue.gatherClasses()
+		nodeCls = catalogue.classForName("TestNodeA")
+		self.assertIs(catalogue.classForName(self.packageName + ".nodeA.TestNodeA"), nodeCls)
+		self.assertRaises(KeyError, catalogue.classForName, "NotANode")
+
+		# map is cached until classes change
+		self.assertIs(catalogue.nameClassMap(), catalogue.nameClassMap())
+		nameMap = catalogue.nameClassMap()
+		catalogue.registerClasses({ChimaeraNode})
+		self.assertIsNot(catalogue.nameClassMap(), nameMap)
+
+	def test_reloadMigratesNodes(self):
+		""" live nodes take reloaded class and its new default params """
+		catalogue = self.makeCatalogue()
+		catalogue.gatherClasses()
+		oldCls = catalogue.nameClassMap()["TestNodeA"]
+		graph = ChimaeraGraph()
+		node = graph.createNode(oldCls, name="a")
+		otherNode = graph.createNode(ChimaeraNode, name="b")
+		graph.execComponent.setDirty(node, False)
+		graph.execComponent.setDirty(otherNode, False)
+
+		with open(os.path.join(self.packageDir, "nodeA.py"), "a") as f:
+			f.write("""
+	@classmethod
+	def defaultParamTree(cls, name, uid=None):
+		tree = super().defaultParamTree(name, uid)
+		tree("newParam").value = 3
+		return tree
+""")
+		catalogue.reloadClasses([oldCls])
+		newCls = catalogue.nameClassMap()["TestNodeA"]
+		self.assertIsNot(newCls, oldCls)
+		self.assertIs(type(node), newCls)
+		self.assertEqual(node.getParam("newParam"), 3)
+		self.assertEqual(node.name, "a")
+		self.assertTrue(graph.execComponent.isDirty(node))
+		self.assertFalse(graph.execComponent.isDirty(otherNode))
+		self.assertIn(node, graph.classNodeMap[newCls])
+
+
+class TestSourceScan(unittest.TestCase):
+	""" test candidate classes are found without importing """
+
+	def test_candidateChain(self):
+		scanned = [
+			ScannedFile("pkg.b", "b.py", 0, 0, "", [
+				ManifestClassEntry("B", "pkg.b", ["pkg.a.A"])]),
+			ScannedFile("pkg.a", "a.py", 0, 0, "", [
+				ManifestClassEntry("A", "pkg.a", ["chimaera.ChimaeraNode"]),
+				ManifestClassEntry("Other", "pkg.a", ["builtins.object"])]),
+		]
+		candidates = candidateClasses(scanned, {"ChimaeraNode"})
+		self.assertEqual([i.name for i in candidates["a.py"]], ["A"])
+		self.assertEqual([i.name for i in candidates["b.py"]], ["B"])
+
+
@@ -0,0 +1,42 @@
+
+from __future__ import annotations
+"""test cases for gathering graph deltas"""
+import unittest
+
+from chimaera.lib.delta import GraphNodeDelta, GraphEdgeDelta, GraphDeltaQueue
+
+class TestGraphDeltaQueue(unittest.TestCase):
+	""" test queued deltas merge to their net change """
+
+	def setUp(self) -> None:
+		self.queue = GraphDeltaQueue()
+
+	def test_merge(self):
+		self.queue.push(GraphNodeDelta(added={"a"}))
+		self.queue.push(GraphNodeDelta(added={"b"}, removed={"c"}))
+		self.queue.push(GraphEdgeDelta(added={("a", "b", 0)}))
+		nodeDelta, edgeDelta = self.queue.take()
+		self.assertEqual(nodeDelta.added, {"a", "b"})
+		self.assertEqual(nodeDelta.removed, {"c"})
+		self.assertEqual(edgeDelta.added, {("a", "b", 0)})
+		self.assertFalse(self.queue)
+		self.assertEqual(self.queue.take(), [])
+
+	def test_cancel(self):
+		# added then removed
+		self.queue.push(GraphNodeDelta(added={"a"}))
+		self.queue.push(GraphNodeDelta(removed={"a"}))
+		# removed then added back
+		self.queue.push(GraphEdgeDelta(removed={("b", "c", 0)}))
+		self.queue.push(GraphEdgeDelta(added={("b", "c", 0)}))
+		self.assertFalse(self.queue)
+		self.assertEqual(self.queue.take(), [])
+
+		self.queue.push(GraphNodeDelta(added={"a"}))
+		self.queue.push(GraphNodeDelta(removed={"a"}))
+		self.queue.push(GraphNodeDelta(added={"a"}))
+		deltas = self.queue.take()
+		self.assertEqual(len(deltas), 1)
+		self.assertEqual(deltas[0].added, {"a"})
+		self.assertEqual(deltas[0].removed, set())
+
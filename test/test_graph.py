@@ -4,6 +4,7 @@ from __future__ import annotations
 import unittest, pprint
 import networkx as nx
 from chimaera import ChimaeraGraph, ChimaeraNode, NodeDataTree, DataUse
+from chimaera.lib.delta import GraphTransaction
 
 class TestGraphTree(unittest.TestCase):
 	""" test for graph emulating basic tree """
@@ -62,6 +63,70 @@ class TestGraphTree(unittest.TestCase):
 
 
 
+class TestUidIndex(unittest.TestCase):
+	""" test nodes and their data are found by uid """
+
+	def test_nodeByUid(self):
+		graph = ChimaeraGraph()
+		aNode = graph.createNode(name="A")
+		bNode = graph.createNode(name="B")
+		self.assertIs(graph.node(aNode.uid), aNode)
+		self.assertIs(graph.node(bNode), bNode)
+		graph.removeNode(bNode)
+		self.assertNotIn(bNode.uid, graph.uidNodeIndex)
+
+	def test_dataStoreKeys(self):
+		graph = ChimaeraGraph()
+		aNode = graph.createNode(name="A")
+		graph.execComponent.setDirty(aNode, False)
+		self.assertFalse(graph.execComponent.isDirty(aNode.uid))
+		graph.setNodeData(aNode, None)
+		self.assertIn(aNode.uid, graph.dataStore)
+		self.assertIn(aNode.uid, graph.serialise())
+
+	def test_nodeInTransaction(self):
+		""" nodes made inside a transaction are found before it ends """
+		graph = ChimaeraGraph()
+		with GraphTransaction(graph):
+			aNode = graph.createNode(name="A")
+			self.assertIs(graph.node(aNode.uid), aNode)
+		self.assertIs(graph.node(aNode.uid), aNode)
+
+class TestEvalQueue(unittest.TestCase):
+	""" test evaluation reports progress and can be cancelled """
+
+	def setUp(self) -> None:
+		self.graph = ChimaeraGraph()
+		self.nodes = [self.graph.createNode(name=i) for i in "ABC"]
+		self.graph.connectNodes(self.nodes[0], self.nodes[1])
+		self.graph.connectNodes(self.nodes[1], self.nodes[2])
+		self.execComponent = self.graph.execComponent
+		self.evaluated = []
+		self.execComponent.evalNode = lambda node, markClean=True: self.evaluated.append(node)
+
+	def test_progress(self):
+		finished = []
+		self.execComponent.nodeEvaluated.connect(finished.append)
+		self.assertTrue(self.execComponent.evalNodes({self.nodes[2]}))
+		self.assertEqual(self.evaluated, self.nodes)
+		self.assertEqual(finished, self.nodes)
+		self.assertIsNone(self.execComponent.executingNode)
+
+	def test_cancel(self):
+		self.execComponent.nodeEvaluated.connect(
+			lambda node: self.execComponent.cancelEval())
+		self.assertFalse(self.execComponent.evalNodes({self.nodes[2]}))
+		self.assertEqual(self.evaluated, self.nodes[:1])
+		self.assertFalse(self.execComponent.executingQueue)
+		self.assertFalse(self.execComponent.cancelRequested)
+
+	def test_staleCancel(self):
+		""" cancelling with nothing running doesn't stop the next run """
+		self.execComponent.cancelEval()
+		self.execComponent.cancelRequested = True # cancel landing after last node
+		self.assertTrue(self.execComponent.evalNodes({self.nodes[2]}))
+		self.assertEqual(self.evaluated, self.nodes)
+
 
 if __name__ == '__main__':
 	graph = ChimaeraGraph()
@@ -0,0 +1,66 @@
+
+from __future__ import annotations
+"""test cases for graph data objects"""
+import unittest
+
+from tree import FailToFind
+from chimaera import ChimaeraGraph, GraphData, ColumnarGraphData, NodeDataTree, NodeDataKeys
+
+class TestColumnarGraphData(unittest.TestCase):
+	""" test columnar graph data against tree-based form """
+
+	def setUp(self) -> None:
+		self.graph = ChimaeraGraph()
+		self.nodeA = self.graph.createNode(name="A")
+		self.nodeB = self.graph.createNode(name="B")
+		self.nodeA.baseParams("weight").value = 2.0
+		self.graph.connectNodes(self.nodeA, self.nodeB)
+
+	def test_fromSubgraph(self):
+		data = ColumnarGraphData.fromChimaeraSubgraph(self.graph)
+		self.assertEqual(len(data), 2)
+		names = data.column(NodeDataKeys.nodeName)
+		self.assertEqual(sorted(names), ["A", "B"])
+		weights = dict(zip(data.uids, data.column("weight")))
+		self.assertEqual(weights[self.nodeA.uid], 2.0)
+		self.assertIs(weights[self.nodeB.uid], FailToFind)
+		self.assertEqual(data.edges, {(self.nodeA.uid, self.nodeB.uid)})
+
+	def test_lazyTrees(self):
+		data = ColumnarGraphData.fromChimaeraSubgraph(self.graph)
+		self.assertIsNone(data._nodeDatas)
+		tree = data[self.nodeA.uid]
+		self.assertIsInstance(tree, NodeDataTree)
+		self.assertEqual(tree("weight").value, 2.0)
+
+		graphData = data.toGraphData()
+		self.assertIsInstance(graphData, GraphData)
+		self.assertEqual(graphData.edges, data.edges)
+
+	def test_combine(self):
+		data = ColumnarGraphData.combine(
+			ColumnarGraphData.fromChimaeraSubgraph(self.graph),
+			GraphData([self.nodeA.baseParams]))
+		self.assertEqual(len(data), 2)
+
+	def test_combineFlow(self):
+		""" small tree inputs stay trees, columnar or large inputs become columns """
+		treeData = GraphData([self.nodeA.baseParams])
+		self.assertIsInstance(ColumnarGraphData.combineFlow(treeData), GraphData)
+		columnar = ColumnarGraphData.fromChimaeraSubgraph(self.graph)
+		self.assertIsInstance(ColumnarGraphData.combineFlow(treeData, columnar),
+		                      ColumnarGraphData)
+
+	def test_addUidEdges(self):
+		data = ColumnarGraphData.fromChimaeraSubgraph(self.graph)
+		data.addUidEdges([(self.nodeB.uid, "newUid")])
+		self.assertEqual(len(data), 3)
+		self.assertEqual(data.edges, {(self.nodeA.uid, self.nodeB.uid),
+		                              (self.nodeB.uid, "newUid")})
+
+	def test_transformPassThrough(self):
+		""" base transform passes columnar data on without building trees """
+		data = ColumnarGraphData.fromChimaeraSubgraph(self.graph)
+		result = self.nodeB.transform(data)
+		self.assertIs(result, data)
+		self.assertIsNone(data._nodeDatas)
@@ -3,7 +3,9 @@ from __future__ import annotations
 """show cases for new graph system"""
 import unittest, pprint
 
-from chimaera import ChimaeraGraph, ChimaeraNode, DataUse, GraphTree
+from tree import Tree
+from chimaera.lib.delta import GraphNodeDelta, GraphEdgeDelta
+from chimaera import ChimaeraGraph, ChimaeraNode, DataUse, GraphTree, NodeDataKeys
 
 class TestGraphTree(unittest.TestCase):
 	""" show for graph emulating basic tree """
@@ -32,3 +34,110 @@ class TestGraphTree(unittest.TestCase):
 
 
 
+
+	def test_branchOrder(self):
+		self.tree.lookupCreate = True
+		names = ["c", "a", "b"]
+		for i in names:
+			self.tree(i)
+		self.assertEqual([i.name for i in self.tree.branches], names)
+		self.assertEqual(self.tree("a")._ownIndex(), 1)
+
+		self.tree("a").remove()
+		self.assertEqual([i.name for i in self.tree.branches], ["c", "b"])
+
+		# removing edge directly in graph also drops branch
+		self.tree.graph().remove_edge(self.tree, self.tree("b"), DataUse.Tree)
+		self.assertEqual([i.name for i in self.tree.branches], ["c"])
+
+	def test_directTreeEdges(self):
+		""" tree edges added straight into graph appear as branches """
+		self.tree.lookupCreate = True
+		self.tree("a")
+		graph = self.tree.graph()
+		extra = GraphTree("extra", graph=graph)
+		graph.connectNodes(self.tree, extra, fromUse=DataUse.Tree, toUse=DataUse.Tree,
+		                   index=0)
+		self.assertEqual([i.name for i in self.tree.branches], ["extra", "a"])
+		self.assertEqual(extra._ownIndex(), 0)
+		self.assertEqual(self.tree("a")._ownIndex(), 1)
+
+	def test_parentCache(self):
+		self.tree.lookupCreate = True
+		branch = self.tree("a")("b")
+		self.assertIs(branch.parent, self.tree("a"))
+		self.assertIs(branch.parent.parent, self.tree)
+
+		# reparenting updates cached parent
+		GraphTree.connectTreeNodes(self.tree("c"), branch)
+		self.assertIs(branch.parent, self.tree("c"))
+
+		self.tree.graph().remove_edge(self.tree("c"), branch, DataUse.Tree)
+		self.assertIsNone(branch.parent)
+
+	def test_addressIndex(self):
+		self.tree.lookupCreate = True
+		mesh = self.tree("asset")("body")("mesh")
+		self.assertEqual(mesh.cachedAddress(), ("asset", "body", "mesh"))
+		self.assertIs(self.tree.branchAtAddress(("asset", "body", "mesh")), mesh)
+		self.assertIs(self.tree("asset").branchAtAddress(("body", "mesh")), mesh)
+
+		# renaming invalidates subtree below renamed branch
+		self.tree("asset")("body").name = "torso"
+		self.assertEqual(mesh.cachedAddress(), ("asset", "torso", "mesh"))
+		self.assertIsNone(self.tree.branchAtAddress(("asset", "body", "mesh")))
+		self.assertIs(self.tree.branchAtAddress(("asset", "torso", "mesh")), mesh)
+
+		# renaming through params also invalidates
+		self.tree("asset").setParam(NodeDataKeys.nodeName, "prop")
+		self.assertEqual(mesh.cachedAddress(), ("prop", "torso", "mesh"))
+		self.assertIs(self.tree("prop", "torso", "mesh"), mesh)
+		sep = self.tree.separatorChar
+		self.assertIs(self.tree.getBranch(sep.join(("prop", "torso", "mesh"))), mesh)
+		self.assertIsNone(self.tree.getBranch(sep.join(("asset", "torso", "mesh"))))
+
+		# reparenting
+		GraphTree.connectTreeNodes(self.tree, mesh)
+		self.assertEqual(mesh.cachedAddress(), ("mesh", ))
+		self.assertIs(self.tree.branchAtAddress(("mesh", )), mesh)
+
+	def test_addressIndexGraphEdges(self):
+		""" reparenting through graph edges directly clears whole subtree """
+		self.tree.lookupCreate = True
+		mesh = self.tree("asset")("body")("mesh")
+		body = mesh.parent
+		self.assertIs(self.tree.branchAtAddress(("asset", "body", "mesh")), mesh)
+
+		graph = self.tree.graph()
+		graph.remove_edge(self.tree("asset"), body, DataUse.Tree)
+		graph.connectNodes(self.tree, body, fromUse=DataUse.Tree, toUse=DataUse.Tree)
+		self.assertEqual(mesh.cachedAddress(), ("body", "mesh"))
+		self.assertIsNone(self.tree.branchAtAddress(("asset", "body", "mesh")))
+		self.assertIs(self.tree.branchAtAddress(("body", "mesh")), mesh)
+
+	def test_fromTree(self):
+		plain = Tree("root")
+		plain.lookupCreate = True
+		plain("a")("b").value = 2
+		plain("c")
+		plain("a")("d")
+
+		graph = ChimaeraGraph()
+		deltas = []
+		graph.signalComponent.nodesChanged.connect(deltas.append)
+		graph.signalComponent.edgesChanged.connect(deltas.append)
+		graphTree = GraphTree.fromTree(plain, graph)
+
+		self.assertEqual(len([i for i in deltas if isinstance(i, GraphNodeDelta)]), 1)
+		self.assertEqual(len([i for i in deltas if isinstance(i, GraphEdgeDelta)]), 1)
+		self.assertEqual([i.name for i in graphTree.branches], ["a", "c"])
+		self.assertEqual([i.name for i in graphTree("a").branches], ["b", "d"])
+		self.assertEqual(graphTree("a")("b").value, 2)
+		self.assertEqual(graphTree("a")("b").uid, plain("a")("b").uid)
+		self.assertIs(graphTree("a")("b").parent, graphTree("a"))
+
+		roundTrip = graphTree.toTree()
+		self.assertEqual([i.name for i in roundTrip("a").branches], ["b", "d"])
+		self.assertEqual(roundTrip("a")("b").value, 2)
+		self.assertEqual(roundTrip.uid, plain.uid)
+
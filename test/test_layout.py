@@ -0,0 +1,63 @@
+
+from __future__ import annotations
+"""test cases for automatic graph layout"""
+import unittest
+
+from chimaera.lib import layout
+from chimaera.lib.layout import breakCycles, assignLayers, countCrossings, \
+	orderLayers, layeredLayout, forceRelax
+
+class TestLayeredLayout(unittest.TestCase):
+	""" test layering, crossing reduction and placement """
+
+	def test_breakCycles(self):
+		edges = breakCycles(3, [(0, 1), (1, 2), (2, 0), (1, 1)])
+		self.assertEqual(len(edges), 3)
+		layers = assignLayers(3, edges)
+		for src, dst in edges:
+			self.assertLess(layers[src], layers[dst])
+
+	def test_crossingsRemoved(self):
+		# two layers, edges crossing in initial order
+		layers = [0, 0, 1, 1]
+		edges = [(0, 3), (1, 2)]
+		self.assertEqual(countCrossings([[0, 1], [2, 3]], edges), 1)
+		ordered = orderLayers(layers, edges)
+		self.assertEqual(countCrossings(ordered, edges), 0)
+
+	def test_positions(self):
+		sizes = [(100, 50), (80, 40), (80, 40), (60, 30)]
+		edges = [(0, 1), (0, 2), (1, 3), (2, 3), (0, 3)]
+		positions = layeredLayout(4, edges, sizes, layerSpacing=20, nodeSpacing=10)
+		self.assertEqual(len(positions), 4)
+		for src, dst in edges:
+			self.assertGreaterEqual(positions[dst][0],
+			                        positions[src][0] + sizes[src][0] + 20)
+		# nodes in same layer don't overlap
+		top, bottom = sorted([positions[1], positions[2]], key=lambda i: i[1])
+		self.assertGreaterEqual(bottom[1], top[1] + 40 + 10)
+
+
+class TestForceRelax(unittest.TestCase):
+	""" test force-directed refinement """
+
+	def test_separates(self):
+		sizes = [(40, 20)] * 3
+		positions = forceRelax([(0, 0)] * 3, sizes, [(0, 1)], iterations=30)
+		self.assertEqual(len(positions), 3)
+		xs = sorted(i[0] for i in positions)
+		self.assertGreater(xs[1] - xs[0], 1.0)
+		self.assertGreater(xs[2] - xs[1], 1.0)
+
+	def test_matchesFallback(self):
+		if layout.np is None:
+			self.skipTest("numpy not available")
+		positions = [(0, 0), (30, 10), (200, 40), (-50, 90)]
+		sizes = [(40, 20), (40, 20), (60, 30), (20, 20)]
+		edges = [(0, 1), (1, 2), (3, 0)]
+		fast = forceRelax(positions, sizes, edges, iterations=20, chunkSize=2)
+		slow = layout._forceRelaxPython(positions, sizes, edges, 20, 100.0, 20.0)
+		for a, b in zip(fast, slow):
+			self.assertAlmostEqual(a[0], b[0], places=4)
+			self.assertAlmostEqual(a[1], b[1], places=4)
+
@@ -0,0 +1,147 @@
+
+from __future__ import annotations
+"""test cases for plug nodes"""
+import unittest
+
+from chimaera import ChimaeraGraph
+from chimaera.constant import DataType
+from chimaera.plugnode import PlugNode
+
+class SumNode(PlugNode):
+	"""sum of inputs, and double of input a"""
+	plugAffects = {"twiceA" : ("a", )}
+
+	def __init__(self, name:str, value=None, treeUid=None, graph=None, nodeParams=None):
+		super(SumNode, self).__init__(name, value=value, treeUid=treeUid,
+		                              graph=graph, nodeParams=nodeParams)
+		for i in ("a", "b"):
+			self.inPlug(i, create=True).value = 0
+		for i in ("sum", "twiceA"):
+			self.outPlug(i, create=True)
+
+	def computePlug(self, outputPlug):
+		if outputPlug.name == "sum":
+			outputPlug.value = self.inPlug("a").value + self.inPlug("b").value
+		else:
+			outputPlug.value = self.inPlug("a").value * 2
+
+
+class BatchSumNode(SumNode):
+	"""sum node computing whole generations at once"""
+	supportsBatchExecute = True
+	batchSizes = []
+
+	@classmethod
+	def executeBatch(cls, nodes, inputColumns):
+		cls.batchSizes.append(len(nodes))
+		return {"sum" : inputColumns["a"] + inputColumns["b"],
+		        "twiceA" : inputColumns["a"] * 2}
+
+
+class WeightSumNode(PlugNode):
+	"""total of compact weights input"""
+
+	def __init__(self, name:str, value=None, treeUid=None, graph=None, nodeParams=None):
+		super(WeightSumNode, self).__init__(name, value=value, treeUid=treeUid,
+		                                    graph=graph, nodeParams=nodeParams)
+		weights = self.inPlug("weights", create=True)
+		weights.dataType = DataType.Float
+		weights.setCompactArray([0.0] * 3)
+		self.outPlug("total", create=True)
+
+	def computePlug(self, outputPlug):
+		outputPlug.value = float(sum(self.inPlug("weights").elementBuffer()))
+
+
+class TestPlugDirtiness(unittest.TestCase):
+	""" test dirtiness follows declared plug dependencies """
+
+	def setUp(self) -> None:
+		self.graph = ChimaeraGraph()
+		self.exec = self.graph.execComponent
+		self.nodeA = self.graph.createNode(SumNode, name="nodeA")
+		self.nodeB = self.graph.createNode(SumNode, name="nodeB")
+		self.graph.connectNodes(self.nodeA.outPlug("sum"), self.nodeB.inPlug("b"))
+
+	def test_affects(self):
+		self.assertEqual(self.nodeA.affectedOutputs(self.nodeA.inPlug("b")),
+		                 [self.nodeA.outPlug("sum")])
+		self.assertEqual(self.nodeA.affectingInputs(self.nodeA.outPlug("twiceA")),
+		                 [self.nodeA.inPlug("a")])
+
+	def test_dirtyFollowsPlugs(self):
+		for i in (self.nodeB.outPlug("sum"), self.nodeB.outPlug("twiceA")):
+			self.exec.evalPlug(i)
+			self.assertFalse(self.exec.isDirty(i))
+
+		self.nodeA.inPlug("b").value = 3
+		self.assertTrue(self.exec.isDirty(self.nodeA.outPlug("sum")))
+		self.assertFalse(self.exec.isDirty(self.nodeA.outPlug("twiceA")))
+		self.assertTrue(self.exec.isDirty(self.nodeB.outPlug("sum")))
+		self.assertFalse(self.exec.isDirty(self.nodeB.outPlug("twiceA")))
+
+		self.exec.evalPlug(self.nodeB.outPlug("sum"))
+		self.assertEqual(self.nodeB.outPlug("sum").value, 3)
+
+	def test_evalNodes(self):
+		""" main eval entry point pulls plug nodes through their plugs """
+		self.nodeA.inPlug("a").value = 2
+		self.exec.evalNodes({self.nodeB})
+		self.assertEqual(self.nodeB.outPlug("sum").value, 2)
+		self.assertFalse(self.exec.isDirty(self.nodeA.outPlug("sum")))
+		self.assertFalse(self.exec.isDirty(self.nodeB))
+
+	def test_elementSources(self):
+		""" compact plug elements pull values from their element sources """
+		weightNode = self.graph.createNode(WeightSumNode, name="weights")
+		weightNode.inPlug("weights").connectElement(1, self.nodeA.outPlug("sum"))
+		self.nodeA.inPlug("a").value = 2
+		self.nodeA.inPlug("b").value = 3
+		self.assertIn([self.nodeA], self.exec.plugNodeGenerations([weightNode]))
+
+		self.exec.evalPlug(weightNode.outPlug("total"))
+		self.assertEqual(weightNode.inPlug("weights").elementValue(1), 5)
+		self.assertEqual(weightNode.outPlug("total").value, 5.0)
+		self.assertFalse(self.exec.isDirty(self.nodeA.outPlug("sum")))
+
+
+class TestBatchExecute(unittest.TestCase):
+	""" test nodes of one class in one generation evaluate together """
+
+	def test_batch(self):
+		graph = ChimaeraGraph()
+		roots = [graph.createNode(BatchSumNode, name=f"root{i}") for i in range(4)]
+		for i, node in enumerate(roots):
+			node.inPlug("a").value = i
+		end = graph.createNode(BatchSumNode, name="end")
+		graph.connectNodes(roots[0].outPlug("sum"), end.inPlug("a"))
+		graph.connectNodes(roots[3].outPlug("sum"), end.inPlug("b"))
+
+		BatchSumNode.batchSizes = []
+		graph.execComponent.evalPlugNodes([end] + roots[1:3])
+		self.assertEqual(BatchSumNode.batchSizes, [4, 1])
+		self.assertEqual(end.outPlug("sum").value, 3)
+		self.assertEqual(roots[2].outPlug("twiceA").value, 4)
+		self.assertFalse(graph.execComponent.isDirty(end.outPlug("sum")))
+
+	def test_batchFloatInputs(self):
+		""" float values on untyped plugs are not truncated """
+		graph = ChimaeraGraph()
+		nodes = [graph.createNode(BatchSumNode, name=f"node{i}") for i in range(3)]
+		for i, node in enumerate(nodes):
+			node.inPlug("a").value = i + 0.5
+			node.inPlug("b").value = 0.25
+		columns = BatchSumNode.gatherInputColumns(nodes)
+		self.assertEqual(list(columns["a"]), [0.5, 1.5, 2.5])
+
+		graph.execComponent.evalPlugNodes(nodes)
+		self.assertEqual([i.outPlug("sum").value for i in nodes], [0.75, 1.75, 2.75])
+
+	def test_baseBatchFallback(self):
+		""" base executeBatch runs computePlug per node """
+		graph = ChimaeraGraph()
+		nodes = [graph.createNode(SumNode, name=f"node{i}") for i in range(3)]
+		outputColumns = SumNode.executeBatch(nodes, {"a" : [1, 2, 3], "b" : [1, 1, 1]})
+		self.assertEqual(list(outputColumns["sum"]), [2, 3, 4])
+		self.assertEqual(list(outputColumns["twiceA"]), [2, 4, 6])
+
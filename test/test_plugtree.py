@@ -0,0 +1,67 @@
+
+from __future__ import annotations
+"""test cases for plug trees"""
+import unittest
+
+from chimaera import DataUse
+from chimaera.constant import DataType
+from chimaera.plugtree import PlugTree
+
+class TestCompactArrayPlug(unittest.TestCase):
+	""" test array plug elements held in a single buffer """
+
+	def setUp(self) -> None:
+		self.plug = PlugTree("weights")
+		self.plug.dataType = DataType.Float
+		self.plug.setCompactArray([0.0] * 1000)
+		self.sourcePlug = PlugTree("source", graph=self.plug.graph())
+
+	def test_buffer(self):
+		self.assertEqual(self.plug.elementCount(), 1000)
+		self.assertFalse(self.plug.branches)
+		self.plug.setElementValue(10, 0.5)
+		self.assertEqual(self.plug.elementValue(10), 0.5)
+
+	def test_connectElement(self):
+		nEdges = len(self.plug.graph().edges)
+		self.plug.connectElement(3, self.sourcePlug)
+		self.assertEqual(self.plug.elementSources()[3], (self.sourcePlug.uid, None))
+		# no graph edge for compact element
+		self.assertEqual(len(self.plug.graph().edges), nEdges)
+
+	def test_expandElement(self):
+		self.plug.setElementValue(3, 2.0)
+		self.plug.connectElement(3, self.sourcePlug)
+		element = self.plug.expandElement(3)
+		self.assertIs(element.parent, self.plug)
+		self.assertEqual(element.value, 2.0)
+		self.assertIn(self.sourcePlug,
+		              self.plug.graph().sourceNodesForUse(element, DataUse.Flow))
+
+		# writes to expanded element show in buffer straight away
+		element.value = 4.0
+		self.assertEqual(self.plug.elementValue(3), 4.0)
+		self.assertEqual(self.plug.elementBuffer()[3], 4.0)
+		self.plug.setElementValue(3, 5.0)
+		self.assertEqual(element.value, 5.0)
+
+		element.value = 4.0
+		self.plug.collapseElement(3)
+		self.assertIsNone(self.plug.expandedElement(3))
+		self.assertEqual(self.plug.elementValue(3), 4.0)
+
+	def test_compactRemovesElements(self):
+		""" converting a plug with children removes their nodes and edges """
+		plug = PlugTree("points", graph=self.plug.graph())
+		plug.dataType = DataType.Float
+		plug.lookupCreate = True
+		elements = [plug(str(i)) for i in range(3)]
+		self.plug.graph().connectNodes(self.sourcePlug, elements[0],
+		                               fromUse=DataUse.Flow, toUse=DataUse.Flow)
+		plug.setCompactArray([1.0, 2.0, 3.0])
+		graph = self.plug.graph()
+		for element in elements:
+			self.assertNotIn(element, graph.nodes)
+		self.assertFalse(graph.nodeOutputsFromUse(self.sourcePlug, DataUse.Flow,
+		                                          includeToUse=False))
+		self.assertEqual(plug.elementCount(), 3)
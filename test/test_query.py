@@ -0,0 +1,143 @@
+
+from __future__ import annotations
+"""test cases for graph queries"""
+import unittest
+
+from chimaera import ChimaeraGraph, ChimaeraNode, DataUse
+from chimaera.lib.query import GraphQuery, parseExpression, listNodes, queryTextIsValid
+from chimaera.lib.delta import GraphNodeDelta, GraphEdgeDelta
+
+class TestLiveQuery(unittest.TestCase):
+	""" test query results kept live from graph deltas """
+
+	def setUp(self) -> None:
+		self.graph = ChimaeraGraph()
+		self.appleNode = self.graph.createNode(name="Apple")
+		self.beeNode = self.graph.createNode(name="Bee")
+		self.ciderNode = self.graph.createNode(name="Cider")
+
+		self.query = GraphQuery("*e")
+		self.deltas = []
+		self.query.resultChanged.connect(self.deltas.append)
+
+	def test_filterGraph(self):
+		nodes, edges = self.query.filterGraph(self.graph)
+		self.assertEqual(nodes, {self.appleNode, self.beeNode})
+
+	def test_bindTracksNodes(self):
+		self.query.bind(self.graph)
+		self.assertEqual(self.query.resultNodes, {self.appleNode, self.beeNode})
+
+		newNode = self.graph.createNode(name="Cake")
+		self.assertIn(newNode, self.query.resultNodes)
+		nodeDeltas = [i for i in self.deltas if isinstance(i, GraphNodeDelta)]
+		self.assertEqual(nodeDeltas[-1].added, {newNode})
+
+		# non-matching node emits nothing
+		self.deltas.clear()
+		self.graph.createNode(name="Dog")
+		self.assertFalse(self.deltas)
+
+	def test_bindTracksEdges(self):
+		self.query.bind(self.graph)
+		self.graph.connectNodes(self.appleNode, self.beeNode)
+		self.graph.connectNodes(self.appleNode, self.ciderNode)
+		self.assertEqual(self.query.resultEdges,
+		                 {(self.appleNode, self.beeNode, DataUse.Flow)})
+
+		self.graph.removeNode(self.beeNode)
+		self.assertFalse(self.query.resultEdges)
+		self.assertNotIn(self.beeNode, self.query.resultNodes)
+
+	def test_renameChangesMembership(self):
+		self.query.bind(self.graph)
+		self.ciderNode.name = "Cidre"
+		self.assertIn(self.ciderNode, self.query.resultNodes)
+		self.appleNode.name = "Apples"
+		self.assertNotIn(self.appleNode, self.query.resultNodes)
+
+	def test_unbind(self):
+		self.query.bind(self.graph)
+		self.query.unbind()
+		self.deltas.clear()
+		self.graph.createNode(name="Cake")
+		self.assertFalse(self.deltas)
+		self.assertFalse(self.query.resultNodes)
+
+
+class TestTraversalQuery(unittest.TestCase):
+	""" test traversal operators in query text """
+
+	def setUp(self) -> None:
+		self.graph = ChimaeraGraph()
+		self.appleNode = self.graph.createNode(name="Apple")
+		self.beeNode = self.graph.createNode(name="Bee")
+		self.ciderNode = self.graph.createNode(name="Cider")
+		self.graph.connectNodes(self.appleNode, self.beeNode)
+		self.graph.connectNodes(self.beeNode, self.ciderNode)
+
+	def test_parse(self):
+		atom = parseExpression("Cider.ancestors(2, Flow).first()")[0]
+		self.assertEqual(atom.regex, "Cider")
+		self.assertEqual([i.op for i in atom.stages], ["ancestors", "first"])
+		self.assertEqual(atom.stages[0].args, (2, DataUse.Flow))
+		self.assertFalse(queryTextIsValid("Cider.notAnOperator()"))
+		self.assertFalse(queryTextIsValid("Cider.ancestors(B*)"))
+
+	def test_patternArgs(self):
+		""" pattern arguments are never converted to ints or uses """
+		atom = parseExpression("*.name(Flow).limit(2)")[0]
+		self.assertEqual(atom.stages[0].args, ("Flow", ))
+		self.assertEqual(atom.stages[1].args, (2, ))
+		flowNode = self.graph.createNode(name="Flow")
+		numberNode = self.graph.createNode(name="2")
+		self.assertEqual(listNodes(self.graph, "*.name(Flow)"), {flowNode})
+		self.assertEqual(listNodes(self.graph, "*.name(2)"), {numberNode})
+
+	def test_inputsOutputs(self):
+		self.assertEqual(listNodes(self.graph, "Apple.outputs(Flow)"), {self.beeNode})
+		self.assertEqual(listNodes(self.graph, "Apple.outputs(Params)"), set())
+		self.assertEqual(listNodes(self.graph, "Cider.inputs()"), {self.beeNode})
+
+	def test_depthLimit(self):
+		self.assertEqual(listNodes(self.graph, "Cider.ancestors(1)"), {self.beeNode})
+		self.assertEqual(listNodes(self.graph, "Cider.ancestors()"),
+		                 {self.beeNode, self.appleNode})
+
+	def test_treeChildren(self):
+		childNode = self.graph.createNode(name="Core")
+		self.graph.connectNodes(self.appleNode, childNode,
+		                        fromUse=DataUse.Tree, toUse=DataUse.Tree)
+		self.assertEqual(listNodes(self.graph, "Apple/*"), {childNode})
+		self.assertEqual(listNodes(self.graph, "Apple/B*"), set())
+
+	def test_first(self):
+		query = GraphQuery("Apple.descendants().first()")
+		self.assertFalse(query.isLocal())
+		self.assertEqual(len(set(query.iterNodes(self.graph))), 1)
+
+	def test_boundTraversalQuery(self):
+		query = GraphQuery("Apple.descendants(1)")
+		query.bind(self.graph)
+		self.assertEqual(query.resultNodes, {self.beeNode})
+		self.graph.connectNodes(self.appleNode, self.ciderNode)
+		self.assertEqual(query.resultNodes, {self.beeNode, self.ciderNode})
+
+	def test_boundTraversalReach(self):
+		""" changes away from nodes a traversal passed through don't rerun it """
+		query = GraphQuery("Apple.descendants(1)")
+		query.bind(self.graph)
+		runs = []
+		runQuery = query._runQuery
+		query._runQuery = lambda: runs.append(1) or runQuery()
+		dogNode = self.graph.createNode(name="Dog")
+		eggNode = self.graph.createNode(name="Egg")
+		self.graph.connectNodes(dogNode, eggNode)
+		dogNode.name = "Doge"
+		self.assertFalse(runs)
+
+		self.graph.connectNodes(self.appleNode, dogNode)
+		self.assertTrue(runs)
+		self.assertIn(dogNode, query.resultNodes)
+
+
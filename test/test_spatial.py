@@ -0,0 +1,38 @@
+
+from __future__ import annotations
+"""test cases for spatial grid index"""
+import unittest
+
+from chimaera.lib.spatial import SpatialGrid
+
+class TestSpatialGrid(unittest.TestCase):
+	""" test items are found by position """
+
+	def setUp(self) -> None:
+		self.grid = SpatialGrid(cellSize=10)
+		self.grid.insert("a", 0, 0)
+		self.grid.insert("b", 15, 0)
+		self.grid.insert("c", -25, -25)
+
+	def test_near(self):
+		self.assertEqual(self.grid.itemsNear(1, 0, 20), ["a", "b"])
+		self.assertEqual(self.grid.itemsNear(14, 0, 2), ["b"])
+		self.assertEqual(self.grid.itemsNear(100, 100, 20), [])
+
+	def test_rect(self):
+		self.assertEqual(set(self.grid.itemsInRect(-30, -30, 0, 0)), {"a", "c"})
+
+	def test_move(self):
+		self.grid.move("a", -24, -24)
+		self.assertEqual(self.grid.nearest(-24, -23, 5), "a")
+		self.assertEqual(self.grid.nearest(-25, -24, 5,
+		                                   predicate=lambda i: i != "a"), "c")
+		self.assertNotIn("a", self.grid.itemsNear(0, 0, 5))
+
+	def test_remove(self):
+		self.grid.remove("b")
+		self.grid.remove("b")
+		self.assertNotIn("b", self.grid)
+		self.assertEqual(len(self.grid), 2)
+		self.assertEqual(self.grid.itemsNear(15, 0, 1), [])
+
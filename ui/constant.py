@@ -11,3 +11,38 @@ class SelectionStatus(ExEnum):
 Selected = SelectionStatus("Selected", (250, 220, 0, 255))
 NotSelected = SelectionStatus("NotSelected", (0, 0, 0, 255))
 
+
+@dataclass(frozen=True)
+class DetailLevel(ExEnum):
+	"""how much of each delegate to draw, by view zoom
+	minScale is the lowest view scale at which level is used"""
+	minScale : float
+
+# from farthest to closest
+BlockDetail = DetailLevel("Block", 0.0) # coloured rectangles, straight edges
+OutlineDetail = DetailLevel("Outline", 0.35) # names and knobs
+FullDetail = DetailLevel("Full", 0.7) # everything, with settings widgets
+
+detailLevels = (BlockDetail, OutlineDetail, FullDetail)
+
+def detailLevelForScale(scale:float)->DetailLevel:
+	"""return detail level to draw at given view scale -
+	pass QStyleOptionGraphicsItem.levelOfDetailFromTransform() when painting"""
+	result = detailLevels[0]
+	for i in detailLevels:
+		if scale >= i.minScale:
+			result = i
+	return result
+
+
+@dataclass(frozen=True)
+class EvalStatus(ExEnum):
+	"""where a node is in a running evaluation - drawn as a strip
+	under node header, None colour draws nothing"""
+	colour : (tuple, None)
+
+NotQueued = EvalStatus("NotQueued", None)
+Queued = EvalStatus("Queued", (130, 130, 150, 255))
+Executing = EvalStatus("Executing", (250, 160, 40, 255))
+Evaluated = EvalStatus("Evaluated", (90, 200, 110, 255))
+Failed = EvalStatus("Failed", (220, 60, 60, 255))
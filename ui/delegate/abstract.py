@@ -12,6 +12,7 @@ from tree import Tree
 from tree.lib.object import UidElement
 #from tree.lib.object import ExEnum
 from chimaera import ChimaeraGraph, ChimaeraNode, DataUse, DataType
+from chimaera.lib.spatial import SpatialGrid
 
 import typing as T
 if T.TYPE_CHECKING:
@@ -93,15 +94,52 @@ class ConnectionPointGraphicsItemMixin( # type hinting
 class ConnectionPointSceneMixin(
 	QtWidgets.QGraphicsScene if T.TYPE_CHECKING else object):
 
+	# largest sticky range of any point, used to bound spatial queries
+	connectionPointMaxStickyRange = 50
+
 	def __init__(self):
 		self.connectionPointItemMap : defaultdict[ConnectionPointGraphicsItemMixin, list[QtWidgets.QGraphicsItem]] = defaultdict(list)
+		# registry of connection points, indexed by scene position of
+		# their connection - cell size is around a usual sticky range
+		self.connectionPointGrid = SpatialGrid(cellSize=50)
 
 
 	def connectionPoints(self)->list[ConnectionPointGraphicsItemMixin]:
-		"""likely just iterate over all items in scene and pick out the ones
-		that define connection points"""
-		# duck typing more like suck typing
-		return [i for i in self.items() if isinstance(i, ConnectionPointGraphicsItemMixin)]
+		"""return all registered connection points"""
+		return list(self.connectionPointGrid)
+
+	def connectionPointScenePos(self, point:ConnectionPointGraphicsItemMixin)->QtCore.QPointF:
+		return point.mapToScene(point.connectionPosition())
+
+	def registerConnectionPoint(self, point:ConnectionPointGraphicsItemMixin):
+		"""add point to registry, or update its position if already there"""
+		pos = self.connectionPointScenePos(point)
+		self.connectionPointGrid.insert(point, pos.x(), pos.y())
+
+	def unregisterConnectionPoint(self, point:ConnectionPointGraphicsItemMixin):
+		self.connectionPointGrid.remove(point)
+		self.connectionPointItemMap.pop(point, None)
+
+	def connectionPointsNear(self, pos:QtCore.QPointF, radius:float)->list[ConnectionPointGraphicsItemMixin]:
+		"""return registered points within radius of scene pos, nearest first"""
+		return self.connectionPointGrid.itemsNear(pos.x(), pos.y(), radius)
+
+	def stickyConnectionPoint(self, pos:QtCore.QPointF,
+	                          sourcePoint:ConnectionPointGraphicsItemMixin=None,
+	                          )->(ConnectionPointGraphicsItemMixin, None):
+		"""return nearest point that pos falls within sticky range of -
+		if source point is given, only points accepting a connection from it
+		are considered"""
+		maxRange = max(self.connectionPointMaxStickyRange, 1)
+		for point in self.connectionPointsNear(pos, maxRange):
+			if point is sourcePoint:
+				continue
+			if sourcePoint is not None and not point.acceptsConnection(sourcePoint):
+				continue
+			pointPos = self.connectionPointScenePos(point)
+			if (pointPos - pos).manhattanLength() <= point.stickyRange():
+				return point
+		return None
 
 	def addConnection(self, fromPoint:ConnectionPointGraphicsItemMixin,
 	                  toItem:QtWidgets.QGraphicsItem):
@@ -218,6 +256,8 @@ class GraphItemDelegateAbstract:
 		raise NotImplementedError
 
 	def onSceneItemChange(self, change:GraphicsItemChange):
+		"""override to hear of every item change in scene - only delegates
+		overriding this are connected, since each slot runs on every move"""
 		if change.item is self:
 			return
 
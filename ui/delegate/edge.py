@@ -11,6 +11,7 @@ from chimaera import ChimaeraGraph, ChimaeraNode, DataUse
 from chimaera.ui import graphItemType
 from chimaera.ui.delegate.node import NodeDelegate
 from chimaera.ui.base import GraphicsItemChange#, dataColourMap
+from chimaera.ui.constant import FullDetail, detailLevelForScale
 from chimaera.ui.delegate.abstract import ConnectionPointGraphicsItemMixin, GraphItemDelegateAbstract, AbstractNodeContainer
 
 if T.TYPE_CHECKING:
@@ -43,6 +44,24 @@ def paintGradientPath(path:QtWidgets.QGraphicsPathItem,
 		painter.drawLine(start, end)
 
 
+def edgeEndPoints(scene:ChimaeraGraphScene, edge:tuple[ChimaeraNode, ChimaeraNode, str]
+                  )->(tuple[QtCore.QPointF, QtCore.QPoint, QtCore.QPointF, QtCore.QPoint], None):
+	"""return (start pos, start direction, end pos, end direction)
+	in scene space for graph edge, or None if either end isn't drawn"""
+	startNode, endNode, key = edge
+	startDelegate = scene.itemDelegateMap.get(startNode)
+	endDelegate = scene.itemDelegateMap.get(endNode)
+	if startDelegate is None or endDelegate is None:
+		return None
+	edgeData = scene.graph()[startNode][endNode][key]
+	start = startDelegate.connectionPointForDataUse(edgeData["fromUse"], asOutput=True)
+	end = endDelegate.connectionPointForDataUse(edgeData["toUse"], asOutput=False)
+	if start is None or end is None:
+		return None
+	return (start.mapToScene(start.connectionPosition()), start.connectionDirection(),
+	        end.mapToScene(end.connectionPosition()), end.connectionDirection())
+
+
 class EdgeDelegate(
 
 	QtWidgets.QGraphicsPathItem,
@@ -80,6 +99,8 @@ class EdgeDelegate(
 		self._style = PIPE_STYLE_DEFAULT
 		self._active = False
 		self._highlight = False
+		# straight line between end points, drawn when zoomed out
+		self.line = QtCore.QLineF()
 		#self.pen = None
 		self.setFlags(
 			QtWidgets.QGraphicsItem.ItemIsSelectable
@@ -146,28 +167,44 @@ class EdgeDelegate(
 		# build gradient
 		self.startCol = QtGui.QColor(*self.edgeData()["fromUse"].edgeColour)
 		self.endCol = QtGui.QColor(*self.edgeData()["toUse"].edgeColour)
-		return
-		gradient = QtGui.QLinearGradient(0.0, 0.0, 1.0, 1.0)
-		gradient.setColorAt(0.0, self.startCol)
-		gradient.setColorAt(1.0, self.endCol)
-		gradBrush = QtGui.QBrush(gradient)
-
-		pen = QtGui.QPen(gradBrush, 3.0)
-		self.setPen(pen)
-		self.setPath(self.path())
+		self.setPen(QtGui.QPen(self.startCol, 2.0))
+		self.updatePath()
+
+	def endPoints(self)->(tuple[QtCore.QPointF, QtCore.QPoint, QtCore.QPointF, QtCore.QPoint], None):
+		"""return (start pos, start direction, end pos, end direction)
+		in scene space, or None if either end isn't drawn"""
+		return edgeEndPoints(self.scene(), self.edgeTuple)
+
+	def updatePath(self):
+		"""take curve between end points from scene's geometry cache -
+		run when either end moves"""
+		points = self.endPoints()
+		if points is None:
+			return
+		geometry = self.scene().edgeGeometry.get(self.edgeTuple, points)
+		self.line = geometry.line
+		self.setPath(geometry.curve)
 
 	def setSelected(self, selected):
-		if selected:
-			self.highlight()
-		if not selected:
-			self.reset()
 		super(EdgeDelegate, self).setSelected(selected)
+		self.update()
 
-	def path(self)->QtGui.QPainterPath:
-		path = QtGui.QPainterPath()
-		path.moveTo(self.startConnectPoint().connectionPosition())
-		path.lineTo(self.endConnectPoint().connectionPosition())
-		return path
+	def shape(self)->QtGui.QPainterPath:
+		"""only a thin band along the curve picks this edge, not the
+		area the curve encloses"""
+		stroker = QtGui.QPainterPathStroker()
+		stroker.setWidth(8)
+		return stroker.createStroke(self.path())
+
+	def hoverEnterEvent(self, event):
+		self._highlight = True
+		self.update()
+
+	def hoverLeaveEvent(self, event):
+		self._highlight = False
+		self.update()
+		if self.scene() is not None:
+			self.scene().onEdgeHoverLeft(self.edgeTuple)
 
 	def itemChange(self, change:QtWidgets.QGraphicsItem.GraphicsItemChange, value):
 		"""base QT method for this item changing"""
@@ -175,16 +212,28 @@ class EdgeDelegate(
 			self.scene().itemChanged.emit(GraphicsItemChange(self, change, value))
 		return super(EdgeDelegate, self).itemChange(change, value)
 
-	def onSceneItemChange(self, change:GraphicsItemChange):
-		return
-		if change.item is self:
-			return
-		if change.item in (self.startNodeDelegate, self.endNodeDelegate):
-			self.sync()
-			
 	def paint(self, painter:QtGui.QPainter, option:QtWidgets.QStyleOptionGraphicsItem, widget:QtWidgets.QWidget=...) -> None:
-		return
-		self.setPath(self.path())
+		"""when zoomed out, draw a straight line in a single colour -
+		curves and gradients only at full detail"""
+		level = detailLevelForScale(
+			option.levelOfDetailFromTransform(painter.worldTransform()))
+		if self.isSelected() or self._highlight:
+			pen = QtGui.QPen(self.pen())
+			pen.setColor(QtGui.QColor(*PIPE_HIGHLIGHT_COLOR))
+			painter.save()
+			painter.setPen(pen)
+			if level is FullDetail:
+				painter.drawPath(self.path())
+			else:
+				painter.drawLine(self.line)
+			painter.restore()
+			return
+		if level is not FullDetail:
+			painter.save()
+			painter.setPen(self.pen())
+			painter.drawLine(self.line)
+			painter.restore()
+			return
 		if self.startUse() == self.endUse(): # no colour changing
 			return super(EdgeDelegate, self).paint(painter, option, widget)
 		return paintGradientPath(self,
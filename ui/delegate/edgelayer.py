@@ -0,0 +1,248 @@
+from __future__ import annotations
+"""single item drawing every plain edge in scene
+
+per-item overhead dominates redraws once there are tens of thousands of
+EdgeDelegates - here edges sharing a colour are drawn as one combined
+path, split into buckets so a change only rebuilds a small part"""
+
+import typing as T
+
+from PySide2 import QtCore, QtWidgets, QtGui
+from treegraph.ui.style import Z_VAL_PIPE
+
+from chimaera import ChimaeraNode
+from chimaera.lib.spatial import SpatialGrid
+from chimaera.ui.constant import FullDetail, detailLevelForScale
+from chimaera.ui.delegate.edge import edgeEndPoints
+
+if T.TYPE_CHECKING:
+	from chimaera.ui.scene import ChimaeraGraphScene
+
+edgeType = T.Tuple[ChimaeraNode, ChimaeraNode, str]
+
+
+class EdgeBucket:
+	"""combined paths for a limited number of edges of one colour"""
+
+	def __init__(self, colour:tuple):
+		self.colour = colour
+		self.edges : set[edgeType] = set()
+		self.curves = QtGui.QPainterPath()
+		self.lines = QtGui.QPainterPath()
+		self.rect = QtCore.QRectF()
+		self.dirty = False
+
+	def rebuild(self, layer:EdgeLayer):
+		self.curves = QtGui.QPainterPath()
+		self.lines = QtGui.QPainterPath()
+		for edge in self.edges:
+			self.addEdgePaths(layer, edge)
+		self.rect = self.curves.boundingRect().united(self.lines.boundingRect())
+		self.dirty = False
+
+	def addEdgePaths(self, layer:EdgeLayer, edge:edgeType):
+		curve = layer.edgeCurves.get(edge)
+		if curve is None:
+			return
+		self.curves.addPath(curve)
+		line = layer.edgeLines[edge]
+		self.lines.moveTo(line.p1())
+		self.lines.lineTo(line.p2())
+
+
+class EdgeLayer(QtWidgets.QGraphicsItem):
+	"""draws all edges not needing their own item - one combined path
+	per edge colour (split into buckets), so drawing costs a few calls
+	however many edges there are
+
+	edges are picked through a spatial grid of points sampled along
+	each curve - scene promotes an edge to a full EdgeDelegate while it
+	is hovered or selected, and hands it back here once it is free"""
+
+	bucketSize = 256
+	# spacing of pick samples along curves
+	sampleSpacing = 20.0
+
+	def __init__(self, scene:ChimaeraGraphScene):
+		super(EdgeLayer, self).__init__()
+		self._scene = scene
+		self.setZValue(Z_VAL_PIPE)
+		self.setAcceptHoverEvents(True)
+		self.setFlag(QtWidgets.QGraphicsItem.ItemUsesExtendedStyleOption)
+
+		self.edgeCurves : dict[edgeType, QtGui.QPainterPath] = {}
+		self.edgeLines : dict[edgeType, QtCore.QLineF] = {}
+		self.edgeBuckets : dict[edgeType, EdgeBucket] = {}
+		self.colourBuckets : dict[tuple, list[EdgeBucket]] = {}
+		self.nodeEdges : dict[ChimaeraNode, set[edgeType]] = {}
+		self.pickGrid = SpatialGrid(cellSize=self.sampleSpacing * 2)
+		self._edgeSamples : dict[edgeType, list[tuple]] = {}
+		self._rect = QtCore.QRectF()
+
+	def __contains__(self, edge:edgeType):
+		return edge in self.edgeBuckets
+
+	def __len__(self):
+		return len(self.edgeBuckets)
+
+	def edges(self)->T.KeysView[edgeType]:
+		return self.edgeBuckets.keys()
+
+	def edgesForNodes(self, nodes:T.Iterable[ChimaeraNode])->set[edgeType]:
+		"""return all drawn edges touching any of nodes"""
+		result = set()
+		for node in nodes:
+			result.update(self.nodeEdges.get(node, ()))
+		return result
+
+	# region geometry
+	def _edgeColour(self, edge:edgeType)->tuple:
+		return tuple(self._scene.graph()[edge[0]][edge[1]][edge[2]]["fromUse"].edgeColour)
+
+	def _buildGeometry(self, edges:T.Collection[edgeType]):
+		"""set curve and line for edges from scene's geometry cache,
+		and their pick samples"""
+		edgePoints = {}
+		for edge in edges:
+			for key in self._edgeSamples.pop(edge, ()):
+				self.pickGrid.remove(key)
+			points = edgeEndPoints(self._scene, edge)
+			if points is None: # an end isn't drawn - keep edge, draw nothing
+				self.edgeCurves.pop(edge, None)
+				self.edgeLines.pop(edge, None)
+				continue
+			edgePoints[edge] = points
+
+		for edge, geometry in self._scene.edgeGeometry.getMany(edgePoints).items():
+			curve = geometry.curve
+			self.edgeCurves[edge] = curve
+			self.edgeLines[edge] = geometry.line
+
+			nSamples = max(2, int(curve.length() / self.sampleSpacing) + 1)
+			samples = []
+			for i in range(nSamples):
+				point = curve.pointAtPercent(i / (nSamples - 1))
+				key = (edge, i)
+				self.pickGrid.insert(key, point.x(), point.y())
+				samples.append(key)
+			self._edgeSamples[edge] = samples
+	# endregion
+
+	# region edge set
+	def addEdges(self, edges:T.Iterable[edgeType]):
+		edges = [i for i in set(edges) if i not in self.edgeBuckets]
+		self._buildGeometry(edges)
+		for edge in edges:
+			colour = self._edgeColour(edge)
+			buckets = self.colourBuckets.setdefault(colour, [])
+			if not buckets or len(buckets[-1].edges) >= self.bucketSize:
+				buckets.append(EdgeBucket(colour))
+			bucket = buckets[-1]
+			bucket.edges.add(edge)
+			self.edgeBuckets[edge] = bucket
+			for node in edge[:2]:
+				self.nodeEdges.setdefault(node, set()).add(edge)
+			if not bucket.dirty: # new paths can be appended without rebuild
+				bucket.addEdgePaths(self, edge)
+				bucket.rect = bucket.curves.boundingRect().united(bucket.lines.boundingRect())
+		self._updateRect()
+
+	def removeEdges(self, edges:T.Iterable[edgeType]):
+		for edge in edges:
+			bucket = self.edgeBuckets.pop(edge, None)
+			if bucket is None:
+				continue
+			bucket.edges.discard(edge)
+			bucket.dirty = True
+			if not bucket.edges:
+				self.colourBuckets[bucket.colour].remove(bucket)
+			for node in edge[:2]:
+				nodeSet = self.nodeEdges.get(node)
+				if nodeSet is not None:
+					nodeSet.discard(edge)
+					if not nodeSet:
+						del self.nodeEdges[node]
+			for key in self._edgeSamples.pop(edge, ()):
+				self.pickGrid.remove(key)
+			self.edgeCurves.pop(edge, None)
+			self.edgeLines.pop(edge, None)
+		self._updateRect()
+
+	def updateEdges(self, edges:T.Iterable[edgeType]):
+		"""recompute geometry for edges, after their ends move"""
+		edges = [i for i in edges if i in self.edgeBuckets]
+		self._buildGeometry(edges)
+		for edge in edges:
+			self.edgeBuckets[edge].dirty = True
+		self._updateRect()
+
+	def clear(self):
+		self.removeEdges(tuple(self.edgeBuckets))
+
+	def _updateRect(self):
+		"""rebuild dirty buckets and bounds of whole layer"""
+		rect = QtCore.QRectF()
+		for buckets in self.colourBuckets.values():
+			for bucket in buckets:
+				if bucket.dirty:
+					bucket.rebuild(self)
+				rect = rect.united(bucket.rect)
+		rect.adjust(-2, -2, 2, 2)
+		if rect != self._rect:
+			self.prepareGeometryChange()
+			self._rect = rect
+		self.update()
+	# endregion
+
+	# region picking
+	def edgeAt(self, pos:QtCore.QPointF, radius:float=4.0)->(edgeType, None):
+		"""return edge whose curve passes within radius of scene pos"""
+		candidates = {key[0] for key in self.pickGrid.itemsNear(
+			pos.x(), pos.y(), radius + self.sampleSpacing)}
+		stroker = QtGui.QPainterPathStroker()
+		stroker.setWidth(radius * 2)
+		for edge in candidates:
+			if stroker.createStroke(self.edgeCurves[edge]).contains(pos):
+				return edge
+		return None
+
+	def shape(self)->QtGui.QPainterPath:
+		"""layer itself has no area - picking goes through contains()"""
+		return QtGui.QPainterPath()
+
+	def contains(self, point:QtCore.QPointF)->bool:
+		return self.edgeAt(self.mapToScene(point)) is not None
+
+	def hoverMoveEvent(self, event:QtWidgets.QGraphicsSceneHoverEvent):
+		edge = self.edgeAt(event.scenePos())
+		if edge is not None:
+			self._scene.setHoverEdge(edge)
+
+	def mousePressEvent(self, event:QtWidgets.QGraphicsSceneMouseEvent):
+		edge = self.edgeAt(event.scenePos())
+		if edge is None:
+			event.ignore()
+			return
+		delegate = self._scene.promoteEdge(edge)
+		delegate.setSelected(True)
+		event.accept()
+	# endregion
+
+	def boundingRect(self)->QtCore.QRectF:
+		return self._rect
+
+	def paint(self, painter:QtGui.QPainter, option:QtWidgets.QStyleOptionGraphicsItem, widget:QtWidgets.QWidget=None) -> None:
+		"""draw one path per bucket - curves at full detail, else straight lines"""
+		level = detailLevelForScale(
+			option.levelOfDetailFromTransform(painter.worldTransform()))
+		exposed = option.exposedRect
+		painter.save()
+		painter.setBrush(QtCore.Qt.NoBrush)
+		for colour, buckets in self.colourBuckets.items():
+			painter.setPen(QtGui.QPen(QtGui.QColor(*colour), 2.0))
+			for bucket in buckets:
+				if not bucket.rect.intersects(exposed):
+					continue
+				painter.drawPath(bucket.curves if level is FullDetail else bucket.lines)
+		painter.restore()
+
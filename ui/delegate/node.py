@@ -18,7 +18,8 @@ from chimaera import ChimaeraGraph, ChimaeraNode
 from chimaera.constant import DataUse, NodeDataKeys
 from chimaera.ui import graphItemType
 from chimaera.ui.base import GraphicsItemChange
-from chimaera.ui.constant import SelectionStatus
+from chimaera.ui.constant import SelectionStatus, DetailLevel, FullDetail, OutlineDetail, BlockDetail, detailLevelForScale, \
+	EvalStatus, NotQueued
 from chimaera.ui.delegate.abstract import ConnectionPointGraphicsItemMixin, GraphItemDelegateAbstract, AbstractNodeContainer
 from chimaera.ui.delegate.knob import Knob
 
@@ -29,6 +30,91 @@ class SettingsProxy(QtWidgets.QGraphicsProxyWidget):
 	"""class specific to holding tree widget for node"""
 
 
+class NodeDetail:
+	"""widgets showing full detail of a node - editable name and
+	settings tree
+	kept apart from NodeDelegate so they can be created only for nodes
+	near the viewport, and recycled between nodes as the view moves"""
+
+	def __init__(self):
+		self.delegate : NodeDelegate = None
+
+		self.nameTag = StringWidget(value="")
+		self.nameTagProxy = AtomicProxyWidget(self.nameTag)
+
+		self.settingsProxy = SettingsProxy()
+		self.settingsWidg = TreeWidget(
+			tree=None,
+			scanForWidgets=True,
+		)
+		self.settingsProxy.setWidget(self.settingsWidg)
+		# hide common node params
+		self.settingsWidg.setKeyVisibilityMap({NodeDataKeys.nodeName : False,
+		                                       NodeDataKeys.treeValue : False,
+		                                       NodeDataKeys.treeProperties : False})
+
+	def attach(self, delegate:NodeDelegate):
+		"""show this detail on delegate"""
+		self.delegate = delegate
+		self.nameTag.setAtomValue(delegate.node.name)
+		self.nameTag.atomValueChanged.connect(delegate._onNameTagChanged)
+
+		self.settingsWidg.setTree(delegate.node.params())
+		self.settingsWidg.resizeToTree()
+		self.settingsWidg.expandAll()
+		self.settingsProxy.setGeometry(self.settingsWidg.geometry())
+
+		self.nameTagProxy.setParentItem(delegate)
+		self.settingsProxy.setParentItem(delegate)
+		self.nameTagProxy.setPos(delegate.edgePadding, delegate.edgePadding)
+		# delegate.detail isn't set yet, so place from own name tag
+		self.settingsProxy.setPos(delegate.edgePadding,
+		                          self.heightLevel())
+		scene = delegate.scene()
+		self.setEditable(scene is None or scene.isEditable())
+
+	def setEditable(self, state:bool):
+		"""name and settings can't be changed while graph evaluates"""
+		self.nameTagProxy.setEnabled(state)
+		self.settingsProxy.setEnabled(state)
+
+	def heightLevel(self)->float:
+		"""height below name tag, where settings start"""
+		return self.nameTagProxy.rect().bottom() + 10
+
+	def detach(self):
+		"""remove this detail from its delegate, ready for reuse"""
+		if self.delegate is None:
+			return
+		self.nameTag.atomValueChanged.disconnect(self.delegate._onNameTagChanged)
+		scene = self.delegate.scene()
+		for i in (self.nameTagProxy, self.settingsProxy):
+			i.setParentItem(None)
+			if scene is not None:
+				scene.removeItem(i)
+		self.delegate = None
+
+
+class NodeDetailPool:
+	"""recycles NodeDetail widgets between node delegates -
+	building settings trees is by far the most costly part of drawing
+	a node, so widgets are reused rather than rebuilt as the view moves"""
+
+	def __init__(self, maxSpare:int=64):
+		self.maxSpare = maxSpare
+		self.spare : list[NodeDetail] = []
+
+	def acquire(self, delegate:NodeDelegate)->NodeDetail:
+		detail = self.spare.pop() if self.spare else NodeDetail()
+		detail.attach(delegate)
+		return detail
+
+	def release(self, detail:NodeDetail):
+		detail.detach()
+		if len(self.spare) < self.maxSpare:
+			self.spare.append(detail)
+
+
 class PlugDelegate(QtWidgets.QGraphicsEllipseItem):
 	"""basic circle with description of data use
 	this will NOT represent a full item in chimaera graph"""
@@ -51,6 +137,10 @@ class NodeDelegate(GraphItemDelegateAbstract, AbstractNodeContainer,
 	 """
 	instancesMayCreateDelegates = True
 
+	# size drawn before any detail has been shown
+	headerHeight = 28
+	placeholderWidth = 150
+
 	@classmethod
 	def delegatesForElements(cls, scene:ChimaeraGraphScene, itemPool:set[graphItemType]) ->T.Sequence[GraphItemDelegateAbstract]:
 		"""return basic node delegate for any nodes left over here"""
@@ -68,43 +158,97 @@ class NodeDelegate(GraphItemDelegateAbstract, AbstractNodeContainer,
 		AbstractNodeContainer.__init__(self, [node])
 
 
-		self.settingsProxy :SettingsProxy = None
-		self.settingsWidg : TreeWidget = None
-
+		# full detail widgets are only attached near viewport, see showDetail()
+		self.detail : NodeDetail = None
+		# size of node when detail was last shown, kept once detail is hidden
+		self._detailSize : tuple[float, float] = None
+		# zoom tier set by scene - decides which child items are shown
+		self.detailLevel : DetailLevel = FullDetail
+		# progress of node in a running evaluation, set by scene's eval controller
+		self.evalStatus : EvalStatus = NotQueued
 
-		self.nameTag = StringWidget(value=self.node.name)
-		self.nameTagProxy = AtomicProxyWidget(self.nameTag, parent=self)
 		self.classTag = QtWidgets.QGraphicsTextItem(
 			self.node.__class__.__name__, self)
 
-
-		self.addSettings(self.node.params() )
-		self.settingsWidg.expandAll()
-
 		self.setFlag(QtWidgets.QGraphicsItem.ItemIsMovable)
 		self.setFlag(QtWidgets.QGraphicsItem.ItemIsSelectable)
+		# position changes update scene's connection point index, see itemChange()
+		self.setFlag(QtWidgets.QGraphicsItem.ItemSendsGeometryChanges)
 
 		# appearance
 		self.edgePadding = 2
 		self.colour = (50, 50, 120)
 		self.borderColour = (200,200,250)
-		self.nameTagProxy.setPos(self.edgePadding, self.edgePadding)
 		textColour = QtGui.QColor(200, 200, 200)
 		self.classTag.setDefaultTextColor(textColour)
 		self.classTag.setPos(self.boundingRect().width() + 2, 0)
 
-		#self.settingsProxy.setGeometry(QtCore.QRectF(0, 0, 300, 300))
+		# { "in" / "out" : { data use : knob } } - knobs are only built once
+		# node's full detail is shown near viewport, or an edge needs one
+		self._knobs : dict[str, dict[DataUse, Knob]] = {"in" : {}, "out" : {}}
 
-		self.settingsProxy.setPos(self.edgePadding,
-		                          self.detailHeightLevel())
 
-		self.knobs = self.makeKnobs()
+	def detailHeightLevel(self):
+		if self.detail is None:
+			return self.headerHeight + 10
+		return self.detail.heightLevel()
 
+	# region detail
+	@property
+	def nameTag(self)->(StringWidget, None):
+		return self.detail.nameTag if self.detail is not None else None
 
-		self.makeConnections()
+	@property
+	def settingsWidg(self)->(TreeWidget, None):
+		return self.detail.settingsWidg if self.detail is not None else None
 
-	def detailHeightLevel(self):
-		return self.nameTagProxy.rect().bottom() + 10
+	@property
+	def settingsProxy(self)->(SettingsProxy, None):
+		return self.detail.settingsProxy if self.detail is not None else None
+
+	def showDetail(self, pool:NodeDetailPool):
+		"""attach full detail widgets from pool, building all knobs"""
+		if self.detail is not None:
+			return
+		self.prepareGeometryChange()
+		self.detail = pool.acquire(self)
+		self._detailSize = None
+		self.arrange()
+		self.buildKnobs()
+
+	def setDetailLevel(self, level:DetailLevel):
+		"""show or hide child items for zoom tier -
+		hidden items cost nothing to draw
+		only knobs already built are shown, see showDetail()"""
+		self.detailLevel = level
+		self.classTag.setVisible(level is FullDetail)
+		for v in self._knobs.values():
+			for knob in v.values():
+				knob.setVisible(level is not BlockDetail)
+
+	def hideDetail(self, pool:NodeDetailPool):
+		"""return detail widgets to pool, node keeps its current size"""
+		if self.detail is None:
+			return
+		self._detailSize = self.getSize()
+		self.prepareGeometryChange()
+		pool.release(self.detail)
+		self.detail = None
+		self.arrange()
+	# endregion
+
+	def setEvalStatus(self, status:EvalStatus):
+		if status is self.evalStatus:
+			return
+		self.evalStatus = status
+		self.update()
+
+	def paintEvalStatus(self, painter:QtGui.QPainter, rect:QtCore.QRectF):
+		"""draw strip along bottom of rect in colour of eval status"""
+		if self.evalStatus.colour is None:
+			return
+		painter.fillRect(QtCore.QRectF(rect.left(), rect.bottom() - 3, rect.width(), 3),
+		                 QtGui.QColor(*self.evalStatus.colour))
 
 	@property
 	def node(self)->ChimaeraNode:
@@ -113,30 +257,61 @@ class NodeDelegate(GraphItemDelegateAbstract, AbstractNodeContainer,
 	def scene(self) -> ChimaeraGraphScene:
 		return super(NodeDelegate, self).scene()
 
-	def makeKnobs(self)->dict[str, dict[DataUse, Knob]]:
-		"""return a list of all knobs on this node"""
-		return {
-			"in": {dataUse: Knob(self.node, dataUse, isOutput=False, parent=self) for dataUse in DataUse},
-			"out": {dataUse: Knob(self.node, dataUse, isOutput=True, parent=self) for dataUse in DataUse},
-		}
+	# region knobs
+	def knobUses(self)->dict[str, T.Sequence[DataUse]]:
+		"""data uses to give knobs on each side of node, in order"""
+		return {"in" : tuple(DataUse), "out" : tuple(DataUse)}
 
+	def buildKnobs(self):
+		"""build any knobs not made yet"""
+		for side, uses in self.knobUses().items():
+			for dataUse in uses:
+				self.knob(side, dataUse)
 
-	def arrangeKnobs(self):
-		for i, v in enumerate(self.knobs.values()):
-			# get number of data uses
-			horizontalKnobs = {use : knob for use, knob in v.items() if use.uiPosition == DataUse.UiPlugPosition.LeftRight}
-			verticalKnobs = {use : knob for use, knob in v.items() if use.uiPosition == DataUse.UiPlugPosition.TopBottom}
-
-			heightIncrement = self.boundingRect().height() / (len(horizontalKnobs) + 2)
-			widthIncrement = self.boundingRect().width() / (len(verticalKnobs) + 1)
+	@property
+	def knobs(self)->dict[str, dict[DataUse, Knob]]:
+		"""all knobs on this node, building any not made yet"""
+		self.buildKnobs()
+		return self._knobs
+
+	def knob(self, side:str, dataUse:DataUse)->(Knob, None):
+		"""return knob for use on "in" or "out" side, building it
+		if needed - None if node has no such knob"""
+		knob = self._knobs[side].get(dataUse)
+		if knob is not None:
+			return knob
+		if dataUse not in self.knobUses()[side]:
+			return None
+		knob = Knob(self.node, dataUse, isOutput=side == "out", parent=self)
+		self._knobs[side][dataUse] = knob
+		self.arrangeKnobs()
+		knob.setVisible(self.detailLevel is not BlockDetail)
+		if self.scene() is not None:
+			self.scene().addConnectionPoints(self, [knob])
+		return knob
 
-			for n, (dataUse, knob) in enumerate(horizontalKnobs.items()):
+	def arrangeKnobs(self):
+		"""place built knobs - each keeps the slot of its use, whether
+		other knobs are built or not"""
+		for i, (side, uses) in enumerate(self.knobUses().items()):
+			v = self._knobs[side]
+			horizontalUses = [use for use in uses if use.uiPosition == DataUse.UiPlugPosition.LeftRight]
+			verticalUses = [use for use in uses if use.uiPosition == DataUse.UiPlugPosition.TopBottom]
+			horizontalKnobs = {use : v[use] for use in horizontalUses if use in v}
+			verticalKnobs = {use : v[use] for use in verticalUses if use in v}
+
+			heightIncrement = self.boundingRect().height() / (len(horizontalUses) + 2)
+			widthIncrement = self.boundingRect().width() / (len(verticalUses) + 1)
+
+			for dataUse, knob in horizontalKnobs.items():
+				n = horizontalUses.index(dataUse)
 				if i == 0:
 					knob.setPos(self.boundingRect().left() - knob.childrenBoundingRect().width(), n * heightIncrement)
 				else:
 					knob.setPos(self.boundingRect().right(), n * heightIncrement)
 
-			for n, (dataUse, knob) in enumerate(verticalKnobs.items()):
+			for dataUse, knob in verticalKnobs.items():
+				n = verticalUses.index(dataUse)
 				if i == 0:
 					knob.setPos((1 + n) * widthIncrement,
 					            self.boundingRect().top() - knob.boundingRect().height())
@@ -144,20 +319,14 @@ class NodeDelegate(GraphItemDelegateAbstract, AbstractNodeContainer,
 					knob.setPos((1 + n) * widthIncrement,
 					            self.boundingRect().bottom())
 
-
-	def makeConnections(self):
-		self.nameTag.atomValueChanged.connect(self._onNameTagChanged)
-
-	def _onNameTagChanged(self, text:str):
-		self.node.name = text
-
 	def connectionPointForDataUse(self, dataUse:DataUse, asOutput=False) -> ConnectionPointGraphicsItemMixin:
 		"""return a connectionPoint to use for this data, on this node,
 		as input or output"""
-		if asOutput:
-			return self.knobs["out"][dataUse]
-		else:
-			return self.knobs["in"][dataUse]
+		return self.knob("out" if asOutput else "in", dataUse)
+	# endregion
+
+	def _onNameTagChanged(self, text:str):
+		self.node.name = text
 
 
 	def sync(self, *args, **kwargs):
@@ -166,7 +335,8 @@ class NodeDelegate(GraphItemDelegateAbstract, AbstractNodeContainer,
 
 	def syncFromNode(self):
 		"""reset ui state to match that of node"""
-		self.nameTag.setAtomValue(self.node.name)
+		if self.detail is not None:
+			self.detail.nameTag.setAtomValue(self.node.name)
 
 	def arrange(self):
 		"""place plugs properly on borders of node"""
@@ -179,7 +349,8 @@ class NodeDelegate(GraphItemDelegateAbstract, AbstractNodeContainer,
 
 	def onNodeNameChanged(self, branch, newName, oldName):
 		"""updates from python"""
-		self.nameTag.value = newName
+		if self.detail is not None:
+			self.detail.nameTag.value = newName
 
 	@property
 	def width(self):
@@ -214,19 +385,23 @@ class NodeDelegate(GraphItemDelegateAbstract, AbstractNodeContainer,
 		return pointMap
 
 	def itemChange(self, change:QtWidgets.QGraphicsItem.GraphicsItemChange, value):
-		if self.scene():
-			self.scene().itemChanged.emit(GraphicsItemChange(self, change, value))
+		"""moving node updates only its own points and edges in scene -
+		other delegates hear of it only if they override onSceneItemChange()"""
+		scene = self.scene()
+		if scene:
+			if change == QtWidgets.QGraphicsItem.ItemPositionHasChanged:
+				scene.reindexConnectionPoints(self)
+			scene.itemChanged.emit(GraphicsItemChange(self, change, value))
 		return super(NodeDelegate, self).itemChange(change, value)
 
-
-	def onSceneItemChange(self, change:GraphicsItemChange):
-		if change.item is self:
-			return
-
 	def getSize(self):
 		"""
 		calculate minimum node size.
 		"""
+		if self.detail is None:
+			if self._detailSize is not None:
+				return self._detailSize
+			return self.placeholderWidth, self.headerHeight
 		minRect = self.nameTag.rect()
 		minWidth = minRect.x() + 150
 		#minWidth = minRect.x()
@@ -246,7 +421,22 @@ class NodeDelegate(GraphItemDelegateAbstract, AbstractNodeContainer,
 
 
 	def paint(self, painter, option, widget):
-		"""Paint the main background shape of the node"""
+		"""Paint the main background shape of the node
+		when zoomed out, draw only a flat rectangle"""
+		level = detailLevelForScale(
+			option.levelOfDetailFromTransform(painter.worldTransform()))
+		if level is BlockDetail:
+			painter.save()
+			painter.setPen(QtCore.Qt.NoPen)
+			if self.isSelected():
+				painter.setBrush(QtGui.QColor(*SelectionStatus.Selected.colour))
+			else:
+				painter.setBrush(QtGui.QColor(*self.colour))
+			painter.drawRect(self.boundingRect())
+			self.paintEvalStatus(painter, QtCore.QRectF(self.boundingRect()))
+			painter.restore()
+			return
+
 		painter.save()
 		self.getSize()
 
@@ -278,6 +468,13 @@ class NodeDelegate(GraphItemDelegateAbstract, AbstractNodeContainer,
 		painter.setBrush(QtGui.QColor(0, 0, 0, 50))
 		painter.fillPath(path, painter.brush())
 
+		if self.detail is None: # no name widget, draw name directly
+			painter.setPen(QtGui.QColor(200, 200, 200))
+			painter.drawText(label_rect.adjusted(self.edgePadding + 2, 0, 0, 0),
+			                 QtCore.Qt.AlignLeft | QtCore.Qt.AlignVCenter,
+			                 self.node.name)
+		self.paintEvalStatus(painter, label_rect)
+
 		border_width = 0.8
 		border_color = QtGui.QColor(*self.borderColour)
 		# if self.isSelected():
@@ -303,28 +500,6 @@ class NodeDelegate(GraphItemDelegateAbstract, AbstractNodeContainer,
 
 		painter.restore()
 
-	def addSettings(self, tree):
-		"""create a new abstractTree widget and add it to the bottom of node"""
-		self.settingsProxy = SettingsProxy(self)
-
-		#topWidg = QtWidgets.QApplication.topLevelWidgets()[0]
-		self.settingsWidg = TreeWidget(
-			tree=tree,
-			scanForWidgets=True,
-		                               )
-		self.settingsProxy.setWidget(self.settingsWidg)
-		self.settingsWidg.resizeToTree()
-
-		self.settingsProxy.setGeometry(self.settingsWidg.geometry())
-
-		# hide common node params
-		self.settingsWidg.setKeyVisibilityMap({NodeDataKeys.nodeName : False,
-		                                       NodeDataKeys.treeValue : False,
-		                                       NodeDataKeys.treeProperties : False})
-		print("settings vis", self.settingsWidg.keyVisibilityPresetMap)
-
-		return self.settingsWidg
-
 	# def getActions(self)->List[Action]:
 	# 	return self.node.getAllActions()
 
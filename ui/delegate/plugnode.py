@@ -12,7 +12,7 @@ from chimaera.constant import INPUT_NAME, OUTPUT_NAME, DataUse, DataType
 from PySide2 import QtCore, QtWidgets, QtGui
 from chimaera.ui.delegate.plugtree import PlugTreeDelegate
 from chimaera.ui.delegate.node import NodeDelegate
-from chimaera.ui.delegate.knob import Knob
+from chimaera.ui.constant import BlockDetail
 from chimaera.ui.delegate.abstract import GraphItemDelegateAbstract, AbstractNodeContainer, ConnectionPointGraphicsItemMixin
 
 if T.TYPE_CHECKING:
@@ -58,18 +58,14 @@ class PlugNodeDelegate(NodeDelegate):
 		self.sync()
 
 
-	def makeKnobs(self) ->dict[str, dict[DataUse, Knob]]:
+	def knobUses(self) ->dict[str, T.Sequence[DataUse]]:
 		"""leave only tree hierarchy plugs"""
-		return {
-			"in": {
-				DataUse.Tree : Knob(self.node, DataUse.Tree, isOutput=False,
-				                    parent=self),
-				},
-			"out": {
-				DataUse.Tree: Knob(self.node, DataUse.Tree, isOutput=True,
-				                   parent=self),
-			}
-		}
+		return {"in" : (DataUse.Tree, ), "out" : (DataUse.Tree, )}
+
+	def setDetailLevel(self, level):
+		super(PlugNodeDelegate, self).setDetailLevel(level)
+		for i in (self.inPlugDelegate, self.outPlugDelegate):
+			i.setVisible(level is not BlockDetail)
 
 	def arrange(self):
 
@@ -4,7 +4,12 @@ from __future__ import annotations
 graph"""
 
 import typing as T
+from dataclasses import dataclass
 
+try:
+	import numpy as np
+except ImportError:
+	np = None
 
 from PySide2 import QtCore, QtWidgets, QtGui
 if T.TYPE_CHECKING:
@@ -29,3 +34,92 @@ def curvedPoints(posA, dirA:QtCore.QPoint, posB,  dirB, scene:ChimaeraGraphScene
 
 
 
+
+
+def curvedControlPointsArray(posA, dirA, posB, dirB):
+	"""vectorised curvedPoints for many connections at once -
+	all arguments are (n, 2) float arrays, returns (midA, midB)"""
+	dirA = dirA / np.abs(dirA).sum(axis=1, keepdims=True)
+	dirB = dirB / np.abs(dirB).sum(axis=1, keepdims=True)
+	halfSpan = np.abs(posB - posA).sum(axis=1, keepdims=True) / 2
+	return posA + dirA * halfSpan, posB + dirB * halfSpan
+
+
+pointsType = T.Tuple[QtCore.QPointF, QtCore.QPoint, QtCore.QPointF, QtCore.QPoint]
+
+@dataclass
+class EdgeGeometry:
+	"""drawn shapes for one edge - key is the end positions and directions
+	they were built from"""
+	key : tuple
+	curve : QtGui.QPainterPath
+	line : QtCore.QLineF
+
+
+class EdgeGeometryCache:
+	"""curve and straight line for each edge, rebuilt only when the edge's
+	end positions or directions change
+	asking for many edges at once builds their curves in one vectorised
+	pass, when numpy is available"""
+
+	# below this many stale edges, numpy setup costs more than it saves
+	bulkThreshold = 32
+
+	def __init__(self):
+		self.entries : dict[tuple, EdgeGeometry] = {}
+
+	@staticmethod
+	def pointsKey(points:pointsType)->tuple:
+		posA, dirA, posB, dirB = points
+		return (posA.x(), posA.y(), dirA.x(), dirA.y(),
+		        posB.x(), posB.y(), dirB.x(), dirB.y())
+
+	@staticmethod
+	def _buildGeometry(key:tuple, midA:tuple, midB:tuple)->EdgeGeometry:
+		posA = QtCore.QPointF(key[0], key[1])
+		posB = QtCore.QPointF(key[4], key[5])
+		curve = QtGui.QPainterPath(posA)
+		curve.cubicTo(QtCore.QPointF(*midA), QtCore.QPointF(*midB), posB)
+		return EdgeGeometry(key, curve, QtCore.QLineF(posA, posB))
+
+	def get(self, edge:tuple, points:pointsType)->EdgeGeometry:
+		"""return geometry for edge with given end points"""
+		key = self.pointsKey(points)
+		entry = self.entries.get(edge)
+		if entry is not None and entry.key == key:
+			return entry
+		posA, midA, posB, midB = curvedPoints(*points, None)
+		entry = self._buildGeometry(key, (midA.x(), midA.y()), (midB.x(), midB.y()))
+		self.entries[edge] = entry
+		return entry
+
+	def getMany(self, edgePoints:dict[tuple, pointsType])->dict[tuple, EdgeGeometry]:
+		"""return geometry for many edges - stale ones are rebuilt together"""
+		result = {}
+		stale = []
+		for edge, points in edgePoints.items():
+			key = self.pointsKey(points)
+			entry = self.entries.get(edge)
+			if entry is not None and entry.key == key:
+				result[edge] = entry
+			else:
+				stale.append((edge, key, points))
+		if np is None or len(stale) < self.bulkThreshold:
+			for edge, key, points in stale:
+				result[edge] = self.get(edge, points)
+			return result
+
+		keys = np.array([i[1] for i in stale], dtype=float)
+		midA, midB = curvedControlPointsArray(
+			keys[:, 0:2], keys[:, 2:4], keys[:, 4:6], keys[:, 6:8])
+		for (edge, key, points), a, b in zip(stale, midA.tolist(), midB.tolist()):
+			entry = self.entries[edge] = self._buildGeometry(key, a, b)
+			result[edge] = entry
+		return result
+
+	def discard(self, edges:T.Iterable[tuple]):
+		for edge in edges:
+			self.entries.pop(edge, None)
+
+	def clear(self):
+		self.entries.clear()
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+"""running graph evaluation from ui without blocking it -
+evaluation runs on a worker thread, its progress comes back to gui
+thread as queued qt signals and is drawn on node delegates
+
+scene blocks its own graph edits while an evaluation runs -
+scripts must not edit graph until finished is emitted"""
+
+import traceback, logging
+import typing as T
+
+from PySide2 import QtCore
+
+from chimaera import ChimaeraGraph, ChimaeraNode
+from chimaera.ui.constant import EvalStatus, NotQueued, Queued, Executing, Evaluated, Failed
+from chimaera.ui.delegate import NodeDelegate
+
+if T.TYPE_CHECKING:
+	from chimaera.ui.scene import ChimaeraGraphScene
+
+log = logging.getLogger(__name__)
+
+class EvalThread(QtCore.QThread):
+	"""runs a single evalNodes() call - execution component's signals
+	fired during it are passed on as qt signals, so receivers on gui
+	thread get them queued"""
+
+	queueChanged = QtCore.Signal(object) # list of nodes
+	executingNodeChanged = QtCore.Signal(object)
+	nodeEvaluated = QtCore.Signal(object)
+	evalFailed = QtCore.Signal(object, str) # node, traceback text
+
+	def __init__(self, graph:ChimaeraGraph, nodes:set[ChimaeraNode], parent:QtCore.QObject=None):
+		super(EvalThread, self).__init__(parent)
+		self.graph = graph
+		self.nodes = set(nodes)
+		# True once whole queue has run, without cancellation or error
+		self.completed = False
+		self.lastNode : ChimaeraNode = None
+
+	def _onQueueChanged(self, queue:list[ChimaeraNode]):
+		self.queueChanged.emit(queue)
+
+	def _onExecutingNodeChanged(self, node:(ChimaeraNode, None)):
+		if node is not None:
+			self.lastNode = node
+		self.executingNodeChanged.emit(node)
+
+	def _onNodeEvaluated(self, node:ChimaeraNode):
+		self.nodeEvaluated.emit(node)
+
+	def run(self):
+		execComponent = self.graph.execComponent
+		connections = ((execComponent.evalQueueChanged, self._onQueueChanged),
+		               (execComponent.executingNodeChanged, self._onExecutingNodeChanged),
+		               (execComponent.nodeEvaluated, self._onNodeEvaluated))
+		for signal, slot in connections:
+			signal.connect(slot)
+		try:
+			self.completed = execComponent.evalNodes(self.nodes)
+		except Exception:
+			self.evalFailed.emit(self.lastNode, traceback.format_exc())
+		finally:
+			for signal, slot in connections:
+				signal.disconnect(slot)
+
+
+class EvalController(QtCore.QObject):
+	"""ui-facing evaluation - one evaluation at a time, run on an
+	EvalThread, with eval status shown on scene's node delegates
+	cancelling stops evaluation between nodes, never during one"""
+
+	started = QtCore.Signal()
+	progressChanged = QtCore.Signal(int, int) # nodes done, nodes in queue
+	finished = QtCore.Signal(bool) # True if whole queue ran
+	evalFailed = QtCore.Signal(object, str) # node, traceback text
+
+	def __init__(self, scene:ChimaeraGraphScene, parent:QtCore.QObject=None):
+		super(EvalController, self).__init__(parent)
+		self.scene = scene
+		self._thread : EvalThread = None
+		self.queue : list[ChimaeraNode] = []
+		self.doneNodes : set[ChimaeraNode] = set()
+		# nodes with a status drawn, to reset on next evaluation
+		self._statusNodes : set[ChimaeraNode] = set()
+
+	def isRunning(self)->bool:
+		return self._thread is not None
+
+	def evaluate(self, nodes:T.Iterable[ChimaeraNode])->bool:
+		"""start evaluating nodes and their history on worker thread -
+		returns False if an evaluation is already running"""
+		if self.isRunning():
+			return False
+		self.clearStatus()
+		self.queue = []
+		self.doneNodes = set()
+		thread = EvalThread(self.scene.graph(), set(nodes), parent=self)
+		thread.queueChanged.connect(self._onQueueChanged)
+		thread.executingNodeChanged.connect(self._onExecutingNodeChanged)
+		thread.nodeEvaluated.connect(self._onNodeEvaluated)
+		thread.evalFailed.connect(self._onEvalFailed)
+		thread.finished.connect(self._onThreadFinished)
+		self._thread = thread
+		thread.start()
+		self.started.emit()
+		return True
+
+	def cancel(self):
+		"""stop running evaluation once its current node is done"""
+		if self.isRunning():
+			self._thread.graph.execComponent.cancelEval()
+
+	# region status
+	def setNodeStatus(self, node:ChimaeraNode, status:EvalStatus):
+		delegate = self.scene.delegateForNode(node, errorNotFound=False)
+		if not isinstance(delegate, NodeDelegate):
+			return
+		delegate.setEvalStatus(status)
+		if status is NotQueued:
+			self._statusNodes.discard(node)
+		else:
+			self._statusNodes.add(node)
+
+	def clearStatus(self):
+		for node in tuple(self._statusNodes):
+			self.setNodeStatus(node, NotQueued)
+	# endregion
+
+	# region thread signals
+	def _onQueueChanged(self, queue:list[ChimaeraNode]):
+		self.queue = queue
+		for node in queue:
+			if node not in self.doneNodes:
+				self.setNodeStatus(node, Queued)
+		self.progressChanged.emit(len(self.doneNodes), len(set(queue) | self.doneNodes))
+
+	def _onExecutingNodeChanged(self, node:(ChimaeraNode, None)):
+		if node is not None:
+			self.setNodeStatus(node, Executing)
+
+	def _onNodeEvaluated(self, node:ChimaeraNode):
+		self.doneNodes.add(node)
+		self.setNodeStatus(node, Evaluated)
+		self.progressChanged.emit(len(self.doneNodes), len(set(self.queue) | self.doneNodes))
+
+	def _onEvalFailed(self, node:(ChimaeraNode, None), text:str):
+		log.error("evaluation failed on node %s\n%s", node, text)
+		if node is not None:
+			self.setNodeStatus(node, Failed)
+		self.evalFailed.emit(node, text)
+
+	def _onThreadFinished(self):
+		thread, self._thread = self._thread, None
+		# nodes never reached, or cut off by cancelling, go back to plain drawing
+		for node in tuple(self._statusNodes):
+			delegate = self.scene.delegateForNode(node, errorNotFound=False)
+			if isinstance(delegate, NodeDelegate) and delegate.evalStatus in (Queued, Executing):
+				self.setNodeStatus(node, NotQueued)
+		thread.deleteLater()
+		self.finished.emit(thread.completed)
+	# endregion
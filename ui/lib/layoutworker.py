@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+"""running automatic layout away from gui thread -
+scene takes a snapshot of tile sizes, positions and connections as
+plain data, layout runs on that, and finished positions come back
+to be applied all at once"""
+
+import typing as T
+from dataclasses import dataclass
+
+from PySide2 import QtCore
+
+from chimaera.lib.layout import layeredLayout, forceRelax
+
+if T.TYPE_CHECKING:
+	from chimaera.ui.delegate import NodeDelegate
+
+
+@dataclass
+class LayoutSnapshot:
+	"""tiles to lay out, and their geometry as plain tuples -
+	edges are index pairs into tiles"""
+	tiles : list[NodeDelegate]
+	sizes : list[tuple[float, float]]
+	positions : list[tuple[float, float]]
+	edges : list[tuple[int, int]]
+	# run layered layout, or only relax from current positions
+	layered : bool = True
+	relaxIterations : int = 0
+
+	def __len__(self):
+		return len(self.tiles)
+
+
+def runLayout(snapshot:LayoutSnapshot)->list[tuple[float, float]]:
+	"""return new top-left position for each tile in snapshot -
+	layered result is moved to start where tiles' bounds started,
+	so laying out part of a graph doesn't throw it back to origin
+	touches nothing but the snapshot, safe to run on any thread"""
+	n = len(snapshot)
+	positions = snapshot.positions
+	if snapshot.layered:
+		positions = layeredLayout(n, snapshot.edges, snapshot.sizes)
+		if n:
+			dx = min(i[0] for i in snapshot.positions) - min(i[0] for i in positions)
+			dy = min(i[1] for i in snapshot.positions) - min(i[1] for i in positions)
+			positions = [(x + dx, y + dy) for x, y in positions]
+	if snapshot.relaxIterations:
+		positions = forceRelax(positions, snapshot.sizes, snapshot.edges,
+		                       iterations=snapshot.relaxIterations)
+	return positions
+
+
+class LayoutThread(QtCore.QThread):
+	"""runs layout of a single snapshot, emits positions when done -
+	signal is queued back to receivers on gui thread"""
+
+	laidOut = QtCore.Signal(object, object) # snapshot, positions
+
+	def __init__(self, snapshot:LayoutSnapshot, parent:QtCore.QObject=None):
+		super(LayoutThread, self).__init__(parent)
+		self.snapshot = snapshot
+
+	def run(self):
+		positions = runLayout(self.snapshot)
+		if not self.isInterruptionRequested():
+			self.laidOut.emit(self.snapshot, positions)
@@ -19,25 +19,26 @@ if TYPE_CHECKING:
 from treegraph.ui.style import (VIEWER_BG_COLOR,
                                       VIEWER_GRID_COLOR,
                                       VIEWER_GRID_OVERLAY)
-from treegraph.ui import relax
 from tree.ui.lib import KeyState, keyDict
 from tree.ui.graphics.lib import allGraphicsSceneItems, allGraphicsChildItems
 from tree.lib.inheritance import superClassLookup, containsSuperClass
 from tree.ui.libwidget.draggraphicsscene import MouseDragScene
 
 
-import networkx as nx
 from chimaera import ChimaeraGraph, ChimaeraNode
-from chimaera.lib.delta import GraphEdgeDelta, GraphNodeDelta
+from chimaera.lib.delta import GraphEdgeDelta, GraphNodeDelta, GraphDeltaQueue
 from chimaera.lib.query import GraphQuery
 from chimaera.ui.base import GraphicsItemChange
 from chimaera.ui.delegate import NodeDelegate, EdgeDelegate, PlugNodeDelegate, PlugTreeDelegate, PointPath
-from chimaera.lib.topology import orderNodes
+from chimaera.ui.delegate.node import NodeDetailPool
+from chimaera.ui.delegate.edgelayer import EdgeLayer
 from chimaera.ui.delegate.abstract import ConnectionPointGraphicsItemMixin, ConnectionPointSceneMixin, GraphItemDelegateAbstract, AbstractNodeContainer
 
 from chimaera.ui import graphItemType
-from chimaera.ui.constant import SelectionStatus
-from chimaera.ui.lib.connection import curvedPoints
+from chimaera.ui.constant import SelectionStatus, DetailLevel, FullDetail
+from chimaera.ui.lib.connection import curvedPoints, EdgeGeometryCache
+from chimaera.ui.lib.layoutworker import LayoutSnapshot, LayoutThread, runLayout
+from chimaera.ui.lib.evalcontroller import EvalController
 
 debugEvents = False
 
@@ -64,8 +65,10 @@ class ChimaeraGraphScene(MouseDragScene, ConnectionPointSceneMixin):
 	#delegateMap = {ChimaeraNode : NodeDelegate} #type:T.Dict[T.Type[GraphItemDelegateAbstract] : T.Type[NodeDelegate]]
 
 	# set of delegate types that this particular scene or view may show
+	# plain edges left over are drawn by the edge layer, and only get an
+	# EdgeDelegate while hovered or selected
 	validDelegates : set[T.Type[GraphItemDelegateAbstract]] = {
-		NodeDelegate, EdgeDelegate, PlugNodeDelegate
+		NodeDelegate, PlugNodeDelegate
 	}
 
 	# region plugin stuff
@@ -79,6 +82,8 @@ class ChimaeraGraphScene(MouseDragScene, ConnectionPointSceneMixin):
 	# endregion
 
 	itemChanged = QtCore.Signal(GraphicsItemChange)
+	# graph may change on an evaluation thread - deltas cross to gui thread through this
+	elementDeltaReceived = QtCore.Signal(object)
 
 
 
@@ -86,23 +91,80 @@ class ChimaeraGraphScene(MouseDragScene, ConnectionPointSceneMixin):
 	def __init__(self, parent:ChimaeraGraphWidget=None
 	             ):
 		super(ChimaeraGraphScene, self).__init__(parent)
+		ConnectionPointSceneMixin.__init__(self)
 
 		self.graphDelegateItems : set[GraphItemDelegateAbstract] = set()
 		self.itemDelegateMap : dict[ChimaeraNode, NodeDelegate] = {}
 
+		# persistent indexes, kept up to date as delegates are added and removed
+		self._elementDelegateMap : dict[graphItemType, GraphItemDelegateAbstract] = {}
+		self._mainElementDelegateMap : dict[graphItemType, GraphItemDelegateAbstract] = {}
+		self._tileMap : dict[ChimaeraNode, NodeDelegate] = {}
+		self._pipeMap : dict[tuple, EdgeDelegate] = {}
+		# nodes drawn by each top-level delegate, including nested containers
+		self._delegateNodes : dict[GraphItemDelegateAbstract, list[ChimaeraNode]] = {}
+		# connection points found below each top-level delegate
+		self._delegateConnectionPoints : dict[GraphItemDelegateAbstract, list[ConnectionPointGraphicsItemMixin]] = {}
+
+		# full detail widgets are only attached to tiles near viewport
+		self.detailPool = NodeDetailPool()
+		self.detailTiles : set[NodeDelegate] = set()
+		self.detailRect : QtCore.QRectF = None
+		# past this many tiles in view, they're too small for widgets to be useful
+		self.maxDetailTiles = 150
+		# zoom tier set by view
+		self.detailLevel : DetailLevel = FullDetail
+
 		self.grid = VIEWER_GRID_OVERLAY
 
 		self.graphQuery : GraphQuery = None
+		self._boundGraph : ChimaeraGraph = None
 
 		self.rubberBand = self.makeRubberBand()
 		self.addItem(self.rubberBand)
 
+		# draws all plain edges in combined paths
+		self.edgeLayer = EdgeLayer(self)
+		self.addItem(self.edgeLayer)
+		# edge under cursor, promoted to its own delegate
+		self.hoverEdge : tuple = None
+		# edge curves, rebuilt only for edges whose ends have moved -
+		# moved edges are gathered and updated together once per event loop pass
+		self.edgeGeometry = EdgeGeometryCache()
+		self._staleEdges : set[tuple] = set()
+		self._edgeFlushTimer = QtCore.QTimer(self)
+		self._edgeFlushTimer.setSingleShot(True)
+		self._edgeFlushTimer.setInterval(0)
+		self._edgeFlushTimer.timeout.connect(self.flushEdgeGeometry)
+
+		# graph changes are gathered and applied together once per event loop pass
+		self._pendingDeltas = GraphDeltaQueue()
+		self._deltaFlushTimer = QtCore.QTimer(self)
+		self._deltaFlushTimer.setSingleShot(True)
+		self._deltaFlushTimer.setInterval(0)
+		self._deltaFlushTimer.timeout.connect(self.flushElementDeltas)
+		self.elementDeltaReceived.connect(self.queueElementDelta)
+
+		# evaluation runs on a worker thread, progress drawn on tiles -
+		# graph can't be edited from scene until it finishes
+		self.evalController = EvalController(self, parent=self)
+		self.evalController.started.connect(self.syncEditable)
+		self.evalController.finished.connect(self.syncEditable)
+
+		# layouts of this many tiles or more run on a worker thread
+		self.threadedLayoutMin = 300
+		self._layoutThread : LayoutThread = None
+
 		# element visibility rules - absolutely no idea how to set this up properly
 		# self.knobVisibilityOverrides : dict[ConnectionPointSceneMixin, (bool, None)] = WeakKeyDictionary()
 
 		# viewer states
 		# if draggingEdgeSource is not None, then we are dragging an edge
 		self.draggingEdgeSource : ConnectionPointGraphicsItemMixin = None
+		# point currently snapped to while dragging edge
+		self.stickyPoint : ConnectionPointGraphicsItemMixin = None
+		# points hidden while dragging edge, shown again once it ends
+		self.hiddenConnectionPoints : list[ConnectionPointGraphicsItemMixin] = []
 		#self.draggingEdgePath : QtWidgets.QGraphicsPathItem = QtWidgets.QGraphicsPathItem()
 		self.draggingEdgePath : PointPath = PointPath(self)
 		self.addItem(self.draggingEdgePath)
@@ -128,13 +190,29 @@ class ChimaeraGraphScene(MouseDragScene, ConnectionPointSceneMixin):
 
 	#region core
 	def setGraph(self, graph:ChimaeraGraph):
-		"""connect signals"""
-		graph.signalComponent.nodesChanged.connect(self.onGraphElementsChanged)
-		graph.signalComponent.edgesChanged.connect(self.onGraphElementsChanged)
+		"""connect signals - any previous graph is disconnected,
+		and sync removes its delegates"""
+		if graph is not self._boundGraph:
+			if self._boundGraph is not None:
+				self._boundGraph.signalComponent.nodesChanged.disconnect(self.onGraphElementsChanged)
+				self._boundGraph.signalComponent.edgesChanged.disconnect(self.onGraphElementsChanged)
+			self._boundGraph = graph
+			graph.signalComponent.nodesChanged.connect(self.onGraphElementsChanged)
+			graph.signalComponent.edgesChanged.connect(self.onGraphElementsChanged)
+		if self.graphQuery is not None:
+			self.graphQuery.bind(graph)
 		self.sync()
 
 	def setQuery(self, nodeQuery:GraphQuery):
+		"""bind query to graph - from then on the query tells
+		scene which elements enter or leave its result"""
+		if self.graphQuery is not None:
+			self.graphQuery.resultChanged.disconnect(self.onQueryResultChanged)
+			self.graphQuery.unbind()
 		self.graphQuery = nodeQuery
+		if nodeQuery is not None:
+			nodeQuery.bind(self.graph())
+			nodeQuery.resultChanged.connect(self.onQueryResultChanged)
 		self.onQueryChanged()
 		pass
 
@@ -155,26 +233,20 @@ class ChimaeraGraphScene(MouseDragScene, ConnectionPointSceneMixin):
 	def elementDelegateMap(self)->dict[graphItemType, GraphItemDelegateAbstract]:
 		"""return map of {graph element : drawing delegate}
 		for every singular thing in chimaera graph
-		multiple graph elements may map to the same delegate"""
-		itemMap = {}
-		for delegate in self.graphDelegateItems:
-			itemMap.update({subItem : delegate for subItem in delegate.graphItems})
-		return itemMap
+		multiple graph elements may map to the same delegate
+		map is live, don't modify it"""
+		return self._elementDelegateMap
 
 	def mainElementDelegateMap(self)->dict[graphItemType, GraphItemDelegateAbstract]:
 		"""return map of {graph element : drawing delegate}
-		for every singular thing in chimaera graph"""
-		itemMap = {}
-		for delegate in self.graphDelegateItems:
-			itemMap[delegate.mainGraphElement()] = delegate
-		return itemMap
+		for every singular thing in chimaera graph
+		map is live, don't modify it"""
+		return self._mainElementDelegateMap
 
 	def tiles(self)->dict[ChimaeraNode, NodeDelegate]:
-		return {element : delegate for element, delegate in self.elementDelegateMap().items() if isinstance(delegate, NodeDelegate)}
+		return self._tileMap
 	def pipes(self)->dict[tuple, EdgeDelegate]:
-		return {edge : delegate for edge, delegate in self.elementDelegateMap().items() if isinstance(delegate, EdgeDelegate)}
-	def connectionPoints(self) ->list[ConnectionPointGraphicsItemMixin]:
-		return [item for item in self.items() if isinstance(item, ConnectionPointGraphicsItemMixin)]
+		return self._pipeMap
 
 
 
@@ -240,6 +312,12 @@ class ChimaeraGraphScene(MouseDragScene, ConnectionPointSceneMixin):
 
 			result.extend(newItems)
 
+		# remaining plain edges are drawn together by edge layer
+		edges = {i for i in elementSet if isinstance(i, tuple)}
+		if edges:
+			self.edgeLayer.addEdges(edges)
+			elementSet.difference_update(edges)
+
 		# check if any left over
 		if elementSet:
 			raise TypeError(f"no delegate found for graph elements {elementSet}")
@@ -247,27 +325,88 @@ class ChimaeraGraphScene(MouseDragScene, ConnectionPointSceneMixin):
 		return result
 
 
-	def delegateForNode(self, node:ChimaeraNode)->NodeDelegate:
-		"""return the delegate for a node - may not be top level, or visible"""
-		return self.itemDelegateMap[node]
+	def delegateForNode(self, node:ChimaeraNode, default=None, errorNotFound=True)->NodeDelegate:
+		"""return the delegate for a node - may not be top level, or visible
+		graph deltas are applied to scene on next event loop pass - if node
+		has no delegate yet, any queued deltas are applied first, so this
+		works straight after creating a node"""
+		delegate = self.itemDelegateMap.get(node)
+		if delegate is None and self._pendingDeltas:
+			self.flushElementDeltas()
+			delegate = self.itemDelegateMap.get(node)
+		if delegate is None:
+			if errorNotFound:
+				raise KeyError(f"no delegate for node {node}")
+			return default
+		return delegate
+
+	def _indexDelegate(self, delegate:GraphItemDelegateAbstract):
+		"""add delegate to element maps"""
+		self._mainElementDelegateMap[delegate.mainGraphElement()] = delegate
+		for element in delegate.graphItems:
+			self._elementDelegateMap[element] = delegate
+			if isinstance(delegate, NodeDelegate):
+				self._tileMap[element] = delegate
+			elif isinstance(delegate, EdgeDelegate):
+				self._pipeMap[element] = delegate
+
+	def _unindexDelegate(self, delegate:GraphItemDelegateAbstract):
+		"""remove delegate from element maps - elements since claimed
+		by another delegate are left alone"""
+		for indexMap in (self._mainElementDelegateMap, self._elementDelegateMap,
+		                 self._tileMap, self._pipeMap):
+			for element in delegate.graphItems:
+				if indexMap.get(element) is delegate:
+					del indexMap[element]
+		for i in allGraphicsChildItems(delegate, includeSelf=True):
+			if isinstance(i, NodeDelegate):
+				nodes = (i.node, )
+			elif isinstance(i, AbstractNodeContainer):
+				nodes = i.nodes
+			else:
+				continue
+			for n in nodes:
+				if self.itemDelegateMap.get(n) is i:
+					del self.itemDelegateMap[n]
+
+	@staticmethod
+	def listensToItemChanges(delegate:GraphItemDelegateAbstract)->bool:
+		"""True if delegate overrides base onSceneItemChange()"""
+		return type(delegate).onSceneItemChange is not GraphItemDelegateAbstract.onSceneItemChange
 
 	def addGraphItemDelegate(self, delegate:GraphItemDelegateAbstract):
 		"""add a uniform delegate type, connect its signals"""
 		self.graphDelegateItems.add(delegate)
-		self.itemChanged.connect(delegate.onSceneItemChange)
+		self._indexDelegate(delegate)
+		# every connected slot runs on every item move - only delegates
+		# that actually react to other items' changes are connected
+		if self.listensToItemChanges(delegate):
+			self.itemChanged.connect(delegate.onSceneItemChange)
 
 		self.addItem(delegate)
 
-		# iterate over all children to find nodes
-		for i in allGraphicsChildItems(delegate):
+		# iterate over all children to find nodes and connection points
+		points = []
+		nodes = []
+		for i in allGraphicsChildItems(delegate, includeSelf=True):
 			if isinstance(i, NodeDelegate):
 				self.itemDelegateMap[i.node] = i
+				nodes.append(i.node)
 			elif isinstance(i, AbstractNodeContainer):
 				for n in i.nodes:
 					self.itemDelegateMap[n] = i
+				nodes.extend(i.nodes)
+			if isinstance(i, ConnectionPointGraphicsItemMixin):
+				points.append(i)
+		self._delegateNodes[delegate] = nodes
+		self._delegateConnectionPoints[delegate] = points
 		delegate.sync()
-		for i in self.connectionPoints():
+		# only this delegate's own points are registered and shown
+		self.reindexConnectionPoints(delegate)
+		for i in points:
 			i.show()
+		if isinstance(delegate, NodeDelegate):
+			delegate.setDetailLevel(self.detailLevel)
 
 		# print("scene post add")
 		# print(allGraphicsChildItems(delegate, includeSelf=True))
@@ -277,15 +416,122 @@ class ChimaeraGraphScene(MouseDragScene, ConnectionPointSceneMixin):
 		return {node : container for node, container in allGraphicsSceneItems(self) if isinstance(container, AbstractNodeContainer)}
 
 	def removeGraphItemDelegate(self, delegate:GraphItemDelegateAbstract):
+		if delegate in self.detailTiles:
+			self.detailTiles.discard(delegate)
+			delegate.hideDetail(self.detailPool)
 		self.graphDelegateItems.remove(delegate)
+		self._unindexDelegate(delegate)
+		for i in self._delegateConnectionPoints.pop(delegate, ()):
+			self.unregisterConnectionPoint(i)
+			if i is self.stickyPoint:
+				self.stickyPoint = None
+		# edges to removed nodes are kept, but no longer drawn
+		self.invalidateEdgeGeometry(self._delegateNodes.pop(delegate, ()))
+		if self.listensToItemChanges(delegate):
+			self.itemChanged.disconnect(delegate.onSceneItemChange)
 		self.removeItem(delegate)
 
+	def addConnectionPoints(self, item:QtWidgets.QGraphicsItem,
+	                        points:T.Sequence[ConnectionPointGraphicsItemMixin]):
+		"""register points made after item's delegate was added,
+		as for knobs built lazily"""
+		delegate = item
+		while delegate is not None and delegate not in self._delegateConnectionPoints:
+			delegate = delegate.parentItem()
+		if delegate is None:
+			return
+		self._delegateConnectionPoints[delegate].extend(points)
+		for i in points:
+			self.registerConnectionPoint(i)
+
+	def reindexConnectionPoints(self, delegate:GraphItemDelegateAbstract):
+		"""update registered positions of connection points below delegate,
+		and layer edges attached to them -
+		run when delegate moves or rearranges"""
+		for i in self._delegateConnectionPoints.get(delegate, ()):
+			self.registerConnectionPoint(i)
+		self.invalidateEdgeGeometry(self._delegateNodes.get(delegate, ()))
+
+	# region edge geometry
+	def edgesForNodes(self, nodes:T.Iterable[ChimaeraNode])->set[tuple]:
+		"""return drawn edges touching any of nodes, in layer or as delegates"""
+		nodes = tuple(nodes)
+		result = self.edgeLayer.edgesForNodes(nodes)
+		if self._pipeMap:
+			graph = self.graph()
+			for node in nodes:
+				if not graph.has_node(node):
+					continue
+				for edge in graph.in_edges(node, keys=True):
+					if edge in self._pipeMap:
+						result.add(edge)
+				for edge in graph.out_edges(node, keys=True):
+					if edge in self._pipeMap:
+						result.add(edge)
+		return result
+
+	def invalidateEdgeGeometry(self, nodes:T.Iterable[ChimaeraNode]):
+		"""mark edges attached to nodes for update - all edges moved in
+		one pass, as in a multi-node drag, are rebuilt together"""
+		edges = self.edgesForNodes(nodes)
+		if not edges:
+			return
+		self._staleEdges.update(edges)
+		self._edgeFlushTimer.start()
+
+	def flushEdgeGeometry(self):
+		"""rebuild geometry for all stale edges"""
+		edges, self._staleEdges = self._staleEdges, set()
+		graph = self.graph()
+		edges = [i for i in edges if graph.has_edge(*i)]
+		self.edgeLayer.updateEdges(edges)
+		for edge in edges:
+			pipe = self._pipeMap.get(edge)
+			if pipe is not None:
+				pipe.updatePath()
+	# endregion
+
+	# region edge promotion
+	def promoteEdge(self, edge:tuple)->EdgeDelegate:
+		"""give edge its own delegate for interaction, taking it out of
+		edge layer"""
+		delegate = self.pipes().get(edge)
+		if delegate is not None:
+			return delegate
+		self.edgeLayer.removeEdges((edge, ))
+		delegate = EdgeDelegate(edge)
+		self.addGraphItemDelegate(delegate)
+		return delegate
+
+	def demoteEdge(self, edge:tuple):
+		"""hand edge back to layer, unless it is still in use"""
+		delegate = self.pipes().get(edge)
+		if delegate is None or delegate.isSelected() or edge == self.hoverEdge:
+			return
+		self.removeGraphItemDelegate(delegate)
+		self.edgeLayer.addEdges((edge, ))
+
+	def setHoverEdge(self, edge:(tuple, None)):
+		if edge == self.hoverEdge:
+			return
+		oldEdge, self.hoverEdge = self.hoverEdge, edge
+		if oldEdge is not None:
+			self.demoteEdge(oldEdge)
+		if edge is not None:
+			self.promoteEdge(edge)
+
+	def onEdgeHoverLeft(self, edge:tuple):
+		if edge == self.hoverEdge:
+			self.setHoverEdge(None)
+	# endregion
+
 	def tryAddEdge(self,
 	               sourcePoint:ConnectionPointGraphicsItemMixin,
 	               destPoint:ConnectionPointGraphicsItemMixin,
 	               ):
 		"""delegate adding edge to connectionPointDelegates"""
-
+		if not self.isEditable():
+			return
 		try:
 			sourcePoint.addConnectionToPoint(destPoint)
 		except Exception as e:
@@ -300,59 +546,154 @@ class ChimaeraGraphScene(MouseDragScene, ConnectionPointSceneMixin):
 		"""called when graph nodes or edges changed, updates visual
 		elements
 
-		query by query first
+		if a query is active, it filters graph deltas itself and
+		passes on only changes to its result
 		"""
-		print("graph elements changed", delta)
-		if self.graphQuery is None:
-			nodes, edges = set(self.graph().nodes), set(self.graph().edges)
-		else:
-			nodes, edges = self.graphQuery.filterGraph(self.graph())
-
-		combinedElements = nodes.union(edges)
-
-		# query added elements by query
-		added = delta.added.intersection(combinedElements)
-
+		if self.graphQuery is not None:
+			return
+		self.elementDeltaReceived.emit(delta)
+
+	def onQueryResultChanged(self, delta:(GraphNodeDelta, GraphEdgeDelta)):
+		"""elements entered or left the active query result"""
+		self.elementDeltaReceived.emit(delta)
+
+	def queueElementDelta(self, delta:(GraphNodeDelta, GraphEdgeDelta)):
+		"""gather delta to apply on next pass of event loop -
+		a script changing graph in a loop only updates scene once
+		delegates for new nodes only exist after flush - look them up
+		through delegateForNode(), or call flushElementDeltas() first"""
+		self._pendingDeltas.push(delta)
+		if not self._deltaFlushTimer.isActive():
+			self._deltaFlushTimer.start()
+
+	def flushElementDeltas(self):
+		"""apply all deltas gathered since last flush, as one net change -
+		call directly where delegates must match graph straight away"""
+		self._deltaFlushTimer.stop()
+		for delta in self._pendingDeltas.take():
+			self.applyElementDelta(delta)
+
+	def applyElementDelta(self, delta:(GraphNodeDelta, GraphEdgeDelta)):
+		"""add and remove delegates for exactly the elements in delta -
+		no filtering is done here"""
 		# add any new elements
-		items = self.generateItemsForGraphElements(added)
+		items = self.generateItemsForGraphElements(delta.added)
 
 		for i in items:
 			self.addGraphItemDelegate(i)
 			#raise
+		if items:
+			self.updateDetailTiles()
 
 		# query any removed elements to delete delegates
+		mainMap = self.mainElementDelegateMap()
 		for i in delta.removed:
+			if i == self.hoverEdge:
+				self.hoverEdge = None
 			# check if removed graph element is a main one for any delegates
-			if i in self.mainElementDelegateMap():
+			delegate = mainMap.get(i)
+			if delegate is not None:
 				# if so, remove it
-				self.removeGraphItemDelegate(
-					self.mainElementDelegateMap()[i])
+				self.removeGraphItemDelegate(delegate)
+		removedEdges = [i for i in delta.removed if isinstance(i, tuple)]
+		self.edgeLayer.removeEdges(removedEdges)
+		self.edgeGeometry.discard(removedEdges)
 
 	def volatileItems(self)->list[QtWidgets.QGraphicsItem]:
 		"""return list of items that are not persistent"""
 		return [i for i in self.items() if i not in
-		        (self.rubberBand, self.draggingEdgePath)]
+		        (self.rubberBand, self.draggingEdgePath, self.edgeLayer)]
 
 	def redraw(self):
 		self.update(self.sceneRect())
 
+	def targetElements(self)->tuple[set[ChimaeraNode], set[tuple]]:
+		"""return (nodes, edges) that scene should currently show -
+		whole graph, or result of active query"""
+		if self.graphQuery is None:
+			return set(self.graph().nodes), set(self.graph().edges)
+		return self.graphQuery.filterGraph(self.graph())
+
 	def sync(self):
-		"""fully clears and resets scene - may be costly
-		use until we need more targeted processing"""
-		#self.clear()
-		for i in self.volatileItems():
-			self.removeItem(i)
-		# add node delegates
-		nodeDelta = GraphNodeDelta(added=set(self.graph().nodes))
-		self.onGraphElementsChanged(nodeDelta)
-
-		# add edge delegates
-		edgeDelta = GraphEdgeDelta(added=set(self.graph().edges))
-		self.onGraphElementsChanged(edgeDelta)
-
-		self.layoutTiles()
+		"""bring delegates in line with graph or query result -
+		existing delegates are kept where their main element is still
+		shown, so they keep their positions
+		only stale delegates are removed, and only elements with no
+		delegate get new ones"""
+		# sync covers anything still queued
+		self._pendingDeltas.clear()
+		self._deltaFlushTimer.stop()
+		nodes, edges = self.targetElements()
+		targets = nodes | edges
+
+		# remove delegates whose element is no longer shown
+		for element, delegate in tuple(self.mainElementDelegateMap().items()):
+			if element not in targets:
+				self.removeGraphItemDelegate(delegate)
+		staleEdges = [i for i in self.edgeLayer.edges() if i not in targets]
+		self.edgeLayer.removeEdges(staleEdges)
+		self.edgeGeometry.discard(staleEdges)
+		if self.hoverEdge not in targets:
+			self.hoverEdge = None
+
+		# kept delegates claim their own sub-elements first (plugs of plug nodes
+		# and so on), then only what is left gets new delegates
+		drawn = self.elementDelegateMap()
+		pool = {i for i in targets if i not in drawn and i not in self.edgeLayer}
+		before = set(self.graphDelegateItems)
+		newItems = []
+		for delegate in tuple(self.graphDelegateItems):
+			if not pool:
+				break
+			newItems.extend(delegate.instanceDelegatesForElements(scene=self, itemPool=pool))
+		if pool:
+			newItems.extend(self.generateItemsForGraphElements(pool))
+		# add node delegates before edges that attach to them
+		for i in sorted(newItems, key=lambda x: isinstance(x, EdgeDelegate)):
+			self.addGraphItemDelegate(i)
+
+		# only lay out tiles that were just created
+		newTiles = [i for i in self.graphDelegateItems - before
+		            if isinstance(i, NodeDelegate)]
+		if newTiles:
+			self.layoutTiles(newTiles)
+		self.updateDetailTiles()
 		self.redraw()
 
+	# region viewport detail
+	def setDetailRect(self, rect:QtCore.QRectF):
+		"""set scene area around viewport - tiles inside it get full
+		detail widgets, tiles outside it return theirs to the pool"""
+		self.detailRect = QtCore.QRectF(rect)
+		self.updateDetailTiles()
+
+	def setDetailLevel(self, level:DetailLevel):
+		"""set zoom tier for all tiles - only run when view crosses
+		from one tier to another"""
+		if level is self.detailLevel:
+			return
+		self.detailLevel = level
+		for i in self.graphDelegateItems:
+			if isinstance(i, NodeDelegate):
+				i.setDetailLevel(level)
+		self.updateDetailTiles()
+
+	def updateDetailTiles(self):
+		if self.detailRect is None:
+			return
+		inRect = {i for i in self.items(self.detailRect)
+		          if isinstance(i, NodeDelegate) and i in self.graphDelegateItems}
+		if len(inRect) > self.maxDetailTiles or self.detailLevel is not FullDetail:
+			inRect = set()
+		for i in self.detailTiles - inRect:
+			i.hideDetail(self.detailPool)
+			self.reindexConnectionPoints(i)
+		for i in inRect - self.detailTiles:
+			i.showDetail(self.detailPool)
+			self.reindexConnectionPoints(i)
+		self.detailTiles = inRect
+	# endregion
+
 
 	# endregion
 
@@ -366,8 +707,12 @@ class ChimaeraGraphScene(MouseDragScene, ConnectionPointSceneMixin):
 	def onSceneSelectionChanged(self, *args, **kwargs):
 		"""passed no arguments, just fires every change
 		iterate through nodes - call the selected signal on each"""
-		for i in self.tiles().values():
+		for i in set(self.tiles().values()):
 			i.onSceneSelectionChanged()
+		# edges no longer selected go back to edge layer
+		for edge, delegate in tuple(self.pipes().items()):
+			if not delegate.isSelected():
+				self.demoteEdge(edge)
 
 	def processSelectionAction(self, newNodes:list[NodeDelegate]):
 		ctrl = self.keyState.ctrl
@@ -422,8 +767,9 @@ class ChimaeraGraphScene(MouseDragScene, ConnectionPointSceneMixin):
 		for i in self.connectionPoints():
 			if i is sourcePoint:
 				continue
-			if not i.acceptsConnection(sourcePoint):
+			if i.isVisible() and not i.acceptsConnection(sourcePoint):
 				i.hide()
+				self.hiddenConnectionPoints.append(i)
 
 		self.draggingEdgePath.show()
 
@@ -432,11 +778,15 @@ class ChimaeraGraphScene(MouseDragScene, ConnectionPointSceneMixin):
 		empty space - just leave it
 		if point is passed, create edge between source and target"""
 
-		# show connections
-		for i in self.connectionPoints():
+		# show connections hidden when drag began
+		for i in self.hiddenConnectionPoints:
 			i.show()
+		self.hiddenConnectionPoints = []
 
 		self.draggingEdgeSource = None
+		if self.stickyPoint is not None:
+			self.stickyPoint.mouseOverStickyRange(False)
+			self.stickyPoint = None
 		self.draggingEdgePath.hide()
 
 
@@ -462,7 +812,7 @@ class ChimaeraGraphScene(MouseDragScene, ConnectionPointSceneMixin):
 
 			# check if we need to start dragging a new edge
 			points = [i for i in items if isinstance(i, ConnectionPointGraphicsItemMixin)]
-			if points:
+			if points and self.isEditable():
 				self.beginDrawingEdge(points[0])
 		self.redraw()
 		#print("end scene mousePress sel", self.selectedTiles())
@@ -480,19 +830,25 @@ class ChimaeraGraphScene(MouseDragScene, ConnectionPointSceneMixin):
 		else:
 			self.rubberBand.hide()
 
-		items = self.items(event.scenePos())
-
 		if self.draggingEdgeSource is not None:
-			hoverConnectPoints = [i for i in items if isinstance(i, ConnectionPointGraphicsItemMixin)]
+			# only points near cursor are checked, through spatial index
+			stickyPoint = self.stickyConnectionPoint(event.scenePos(),
+			                                         self.draggingEdgeSource)
+			if stickyPoint is not self.stickyPoint:
+				if self.stickyPoint is not None:
+					self.stickyPoint.mouseOverStickyRange(False)
+				if stickyPoint is not None:
+					stickyPoint.mouseOverStickyRange(True)
+				self.stickyPoint = stickyPoint
 
 			# stick to connection points when you hover over them
 			posA =  self.draggingEdgeSource.mapToScene(
 				self.draggingEdgeSource.connectionPosition())
 
 			dirA = self.draggingEdgeSource.connectionDirection()
-			if hoverConnectPoints: # stick to connection point
-				posB = hoverConnectPoints[0].mapToScene(hoverConnectPoints[0].connectionPosition())
-				dirB = hoverConnectPoints[0].connectionDirection()
+			if stickyPoint is not None: # stick to connection point
+				posB = self.connectionPointScenePos(stickyPoint)
+				dirB = stickyPoint.connectionDirection()
 				self.draggingEdgePath.setPoints(
 					*curvedPoints(posA, dirA, posB, dirB, self))
 
@@ -547,8 +903,14 @@ class ChimaeraGraphScene(MouseDragScene, ConnectionPointSceneMixin):
 	def onTabPressed(self, event: QtGui.QKeyEvent, pressed=True):
 		""""""
 
+	def onEscapePressed(self, event:QtGui.QKeyEvent, pressed=True):
+		"""cancel running evaluation"""
+		self.evalController.cancel()
+
 	def onDeletePressed(self, event:QtGui.QKeyEvent, pressed=True):
 		"""delete selected tiles and pipes"""
+		if not self.isEditable():
+			return
 		print("on delete called")
 		# print("edges", self.graph().edges)
 		# print("nodes", self.graph().edges)
@@ -576,27 +938,25 @@ class ChimaeraGraphScene(MouseDragScene, ConnectionPointSceneMixin):
 	def deleteTile(self, tile:(NodeDelegate, ChimaeraNode)):
 		# check if tile has a visual item - if not, return
 		if isinstance(tile, ChimaeraNode):
-			if tile not in self.tiles().keys():
+			if tile not in self.tiles():
 				return
 			tile = self.tiles()[tile]
 
 		# delete any necessary edges
-		for k, v in self.pipes().items():
-			if tile.node in k:
+		for k, v in tuple(self.pipes().items()):
+			if tile.node in k[:2]:
 				self.deletePipe(v)
-		self.tiles().pop(tile.node)
-		self.removeItem(tile)
+		self.removeGraphItemDelegate(tile)
 		self.update()
 
 
 	def deletePipe(self, pipe:(EdgeDelegate, tuple[ChimaeraNode, ChimaeraNode, str])):
 		if not isinstance(pipe, EdgeDelegate):
-			if not pipe in self.pipes().keys():
+			if not pipe in self.pipes():
 				return
 			pipe = self.pipes()[pipe]
 		if debugEvents: print("scene deletePipe")
-		self.pipes().pop(pipe.edgeTuple)
-		self.removeItem(pipe)
+		self.removeGraphItemDelegate(pipe)
 		self.update()
 		# i never want to tipe pipe
 
@@ -608,42 +968,95 @@ class ChimaeraGraphScene(MouseDragScene, ConnectionPointSceneMixin):
 				nodes.append(item)
 		return nodes
 
+	def isEditable(self)->bool:
+		"""graph is being evaluated on worker thread - scene must not
+		change it until evaluation finishes"""
+		return not self.evalController.isRunning()
+
+	def syncEditable(self, *args):
+		"""enable or disable detail widgets of all tiles for current state"""
+		editable = self.isEditable()
+		for tile in set(self.tiles().values()):
+			if tile.detail is not None:
+				tile.detail.setEditable(editable)
+
+	def evaluateSelected(self)->bool:
+		"""evaluate selected nodes and their history, without blocking ui"""
+		return self.evalController.evaluate(i.node for i in self.selectedTiles())
+
 	def selectedPipes(self):
 		return [i for i in self.selectedItems()
 		        if isinstance(i, EdgeDelegate)]
 
-	def relaxItems(self, items, iterations=1):
-		for n in range(iterations):
-			for i in items:
-				force = relax.getForce(i)
-				i.setPos(i.pos() + force.toPointF())
+	# region layout
+	def layoutSnapshot(self, tiles:T.Iterable[NodeDelegate],
+	                   layered=True, relaxIterations=0)->LayoutSnapshot:
+		"""copy geometry of tiles and graph edges between them,
+		for layout to run on without touching scene"""
+		tiles = list(tiles)
+		tileIndex = {}
+		for index, tile in enumerate(tiles):
+			for node in self._delegateNodes.get(tile, (tile.node, )):
+				tileIndex[node] = index
+		edges = set()
+		for src, dst in self.graph().out_edges(tuple(tileIndex)):
+			if dst in tileIndex:
+				edges.add((tileIndex[src], tileIndex[dst]))
+		sizes, positions = [], []
+		for tile in tiles:
+			rect = tile.sceneBoundingRect()
+			sizes.append((rect.width(), rect.height()))
+			positions.append((tile.pos().x(), tile.pos().y()))
+		return LayoutSnapshot(tiles, sizes, positions, sorted(edges),
+		                      layered=layered, relaxIterations=relaxIterations)
+
+	def runLayout(self, snapshot:LayoutSnapshot):
+		"""lay out snapshot - small ones directly, larger ones on a
+		worker thread, applied when it finishes
+		starting a new layout discards any still running"""
+		if self._layoutThread is not None:
+			self._layoutThread.requestInterruption()
+			self._layoutThread = None
+		if len(snapshot) < self.threadedLayoutMin:
+			self.applyLayout(snapshot, runLayout(snapshot))
+			return
+		thread = LayoutThread(snapshot, parent=self)
+		thread.laidOut.connect(self._onLaidOut)
+		thread.finished.connect(thread.deleteLater)
+		self._layoutThread = thread
+		thread.start()
+
+	def _onLaidOut(self, snapshot:LayoutSnapshot, positions:list[tuple[float, float]]):
+		if self._layoutThread is None or snapshot is not self._layoutThread.snapshot:
+			return # superseded
+		self._layoutThread = None
+		self.applyLayout(snapshot, positions)
+
+	def applyLayout(self, snapshot:LayoutSnapshot, positions:list[tuple[float, float]]):
+		"""move tiles to positions in one pass - tiles removed while
+		layout ran are skipped
+		moved edges are gathered and rebuilt together afterwards"""
+		for tile, (x, y) in zip(snapshot.tiles, positions):
+			if tile in self.graphDelegateItems:
+				tile.setPos(x, y)
+		self.updateDetailTiles()
+
+	def relaxItems(self, items:T.Iterable[NodeDelegate], iterations=1):
+		"""push overlapping tiles apart and pull connected ones together,
+		from their current positions"""
+		self.runLayout(self.layoutSnapshot(items, layered=False,
+		                                   relaxIterations=iterations))
 
 	def layoutTiles(self, tiles:List[NodeDelegate]=None):
-		"""single shot layout of all given nodes
-		seed nodes are only arranged vertically
-		Longest critical path taken as the baseline,
-		other nodes laid out relative to it
-
-
-		"""
+		"""layered layout of given tiles, or all tiles -
+		connected tiles flow left to right, ordered in each column to
+		cross as few edges as possible
+		only given tiles move, laid out from where their bounds start"""
 		tiles = tiles or set(self.tiles().values())
-		nodes = set(i.node for i in tiles)
-		islands = nx.strongly_connected_components(self.graph())
-		for index, island in enumerate(islands):
-			ordered = orderNodes(self.graph(), island)
-			# only x for now
-
-			baseTile = self.tiles()[ordered[0]]
-			separation = 75
-			baseX = baseTile.pos().x() + baseTile.sceneBoundingRect().width() + separation
-			x = baseX
-			for i in ordered[1:]:
-				tile = self.tiles()[i]
-				tile.setX(x)
-				x += tile.sceneBoundingRect().width() + separation
-		#self.updatePipePaths(tiles)
-
-
+		tiles = [i for i in tiles if isinstance(i, NodeDelegate)]
+		if tiles:
+			self.runLayout(self.layoutSnapshot(tiles))
+	# endregion
 
 	### region drawing
 
@@ -16,6 +16,7 @@ if T.TYPE_CHECKING:
 	from chimaera.ui.scene import ChimaeraGraphScene
 	from chimaera.ui.widget import ChimaeraGraphWidget
 from chimaera import ChimaeraGraph, ChimaeraNode
+from chimaera.ui.constant import detailLevelForScale
 
 ZOOM_MIN = -0.95
 ZOOM_MAX = 2.0
@@ -80,7 +81,19 @@ class ChimaeraGraphView(MouseDragView):
 		#self.setBackgroundBrush(BackgroundGridPixmap.drawPattern(10))
 
 		self.setMouseTracking(True)
-	
+
+		# scene only builds node detail widgets near viewport -
+		# updated once view has settled after a pan or zoom
+		self.detailTimer = QtCore.QTimer(self)
+		self.detailTimer.setSingleShot(True)
+		self.detailTimer.setInterval(50)
+		self.detailTimer.timeout.connect(self.updateSceneDetail)
+		self._lastVisibleRect : QtCore.QRectF = None
+		# extra fraction of view size around viewport to build detail for
+		self.detailMargin = 0.25
+		# zoom tier last pushed to scene
+		self._detailLevel = None
+
 	def parent(self) -> ChimaeraGraphWidget:
 		return super(ChimaeraGraphView, self).parent()
 
@@ -91,6 +104,53 @@ class ChimaeraGraphView(MouseDragView):
 		"""view only follows scene on sync"""
 		pass
 
+	def visibleSceneRect(self)->QtCore.QRectF:
+		return self.mapToScene(self.viewport().rect()).boundingRect()
+
+	def updateSceneDetail(self):
+		if self.scene() is None:
+			return
+		rect = self.visibleSceneRect()
+		margin = self.detailMargin * max(rect.width(), rect.height())
+		self.scene().setDetailRect(rect.adjusted(-margin, -margin, margin, margin))
+
+	def updateDetailLevel(self):
+		"""push zoom tier to scene if it has changed -
+		run whenever view transform is set, so next paint already uses it"""
+		if self.scene() is None:
+			return
+		level = detailLevelForScale(self.transform().m11())
+		if level is self._detailLevel:
+			return
+		self._detailLevel = level
+		self.scene().setDetailLevel(level)
+
+	# transform changes all pass through here from python
+	def scale(self, sx:float, sy:float):
+		super(ChimaeraGraphView, self).scale(sx, sy)
+		self.updateDetailLevel()
+
+	def setTransform(self, matrix:QtGui.QTransform, combine=False):
+		super(ChimaeraGraphView, self).setTransform(matrix, combine)
+		self.updateDetailLevel()
+
+	def resetTransform(self):
+		super(ChimaeraGraphView, self).resetTransform()
+		self.updateDetailLevel()
+
+	def setScene(self, scene:QtWidgets.QGraphicsScene):
+		super(ChimaeraGraphView, self).setScene(scene)
+		self._detailLevel = None
+		self.updateDetailLevel()
+
+	def paintEvent(self, event:QtGui.QPaintEvent):
+		"""catch any change to visible area, however it was moved"""
+		rect = self.visibleSceneRect()
+		if rect != self._lastVisibleRect:
+			self._lastVisibleRect = rect
+			self.detailTimer.start()
+		return super(ChimaeraGraphView, self).paintEvent(event)
+
 
 class ChimaeraGraphASDAFView(QtWidgets.QGraphicsView):
 	"""simple class to view an graph's contents"""